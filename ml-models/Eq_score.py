@@ -78,6 +78,33 @@ QUESTIONS = {
     }
 }
 
+# Question order used by the dense scoring tensor and batch answer matrices
+QUESTION_KEYS = list(SCORING_MATRIX)
+CHOICE_COUNT = 5
+
+# SCORING_MATRIX compiled to a dense (questions x choices x parameters) array
+SCORING_TENSOR = np.array(
+    [[SCORING_MATRIX[q][choice] for choice in range(1, CHOICE_COUNT + 1)] for q in QUESTION_KEYS],
+    dtype=np.float64
+)
+
+# Normalized value given to every parameter when all raw parameter scores are equal
+DEGENERATE_NORMALIZED_SCORE = 50.0
+
+def normalize_parameter_scores(parameter_scores):
+    """
+    Row-wise min-max normalization of raw parameter scores to 0-100.
+    Rows where every parameter has the same raw score (max == min) have no spread to normalize;
+    they are defined as DEGENERATE_NORMALIZED_SCORE for every parameter instead of dividing by zero.
+    """
+    parameter_scores = np.asarray(parameter_scores, dtype=np.float64)
+    min_score = parameter_scores.min(axis=-1, keepdims=True)
+    max_score = parameter_scores.max(axis=-1, keepdims=True)
+    spread = max_score - min_score
+    degenerate = spread == 0
+    normalized_scores = ((parameter_scores - min_score) / np.where(degenerate, 1, spread)) * 100
+    return np.where(degenerate, DEGENERATE_NORMALIZED_SCORE, normalized_scores)
+
 def calculate_eq_score(responses):
     """
     Calculate EQ score based on user responses (1-5) for each question.
@@ -90,14 +117,55 @@ def calculate_eq_score(responses):
         parameter_scores += np.array(SCORING_MATRIX[q][response])
 
     # Normalize scores between 0-100
-    min_score, max_score = np.min(parameter_scores), np.max(parameter_scores)
-    normalized_scores = ((parameter_scores - min_score) / (max_score - min_score)) * 100
+    normalized_scores = normalize_parameter_scores(parameter_scores)
 
     # Compute final EQ score (average of all parameters)
     final_eq_score = np.mean(normalized_scores)
 
     return {PARAMETERS[i]: round(normalized_scores[i], 2) for i in range(6)}, round(final_eq_score, 2)
 
+def require_whole_answers(answers) -> np.ndarray:
+    """
+    Returns answers as an int64 array, raising ValueError for anything that is not a whole number.
+    A plain cast would silently truncate 2.7 to 2, where calculate_eq_score raises KeyError.
+    """
+    answers = np.asarray(answers)
+    if answers.dtype.kind not in "iu":
+        if answers.dtype.kind != "f" or not np.all(np.isfinite(answers)) or not np.array_equal(answers, np.floor(answers)):
+            raise ValueError("Answers must be whole numbers")
+    return answers.astype(np.int64)
+
+def calculate_eq_scores_batch(answers, scoring_tensor=None):
+    """
+    Batch version of calculate_eq_score.
+    answers: (N x questions) integer matrix of choices 1-5, columns in QUESTION_KEYS order.
+    scoring_tensor: optional (questions x choices x parameters) array for another questionnaire
+    (see questionnaire_registry); defaults to SCORING_TENSOR.
+    Returns (N x parameters) normalized parameter breakdowns and (N,) final EQ scores, both rounded to 2 decimals.
+    """
+    scoring_tensor = SCORING_TENSOR if scoring_tensor is None else scoring_tensor
+    question_count, choice_count = scoring_tensor.shape[:2]
+    answers = np.asarray(answers)
+    if answers.ndim != 2 or answers.shape[1] != question_count:
+        raise ValueError(f"answers must have shape (N, {question_count})")
+    answers = require_whole_answers(answers)
+    if answers.size and (answers.min() < 1 or answers.max() > choice_count):
+        raise ValueError(f"Answers must be between 1 and {choice_count}")
+
+    # Gather each answer's parameter row: (N, questions, parameters), then sum over questions
+    parameter_scores = scoring_tensor[np.arange(question_count), answers - 1].sum(axis=1)
+
+    normalized_scores = normalize_parameter_scores(parameter_scores)
+    final_eq_scores = normalized_scores.mean(axis=1)
+
+    return np.round(normalized_scores, 2), np.round(final_eq_scores, 2)
+
+def responses_to_answer_matrix(responses_list):
+    """
+    Converts a list of {"Q1": 3, ...} response dicts into an (N x questions) answer matrix.
+    """
+    return np.array([[responses[q] for q in QUESTION_KEYS] for responses in responses_list], dtype=np.int64).reshape(-1, len(QUESTION_KEYS))
+
 def get_user_responses():
     responses = {}
     for q_key, q_content in QUESTIONS.items():
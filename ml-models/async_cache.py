@@ -0,0 +1,117 @@
+# async_cache.py
+import time
+import functools
+from collections import OrderedDict
+from single_flight import SingleFlight
+
+
+def is_none(value) -> bool:
+    return value is None
+
+
+class AsyncTTLCache:
+    """
+    In-memory memoization for async lookups against upstream services.
+      - Results are kept for ttl seconds; past max_size the least recently used keys are evicted.
+      - Failures (exceptions, and results for which is_failure(result) is true) are cached for the
+        shorter negative_ttl, so a down upstream is not hammered but recovers quickly. Cached
+        exceptions are re-raised to every caller until they expire.
+      - Concurrent misses for one key share a single load (see SingleFlight).
+    Unlike functools.lru_cache on a coroutine function, this caches the awaited result rather
+    than the coroutine object, and the key is chosen by the caller.
+    """
+
+    def __init__(self, name: str, ttl: float = 3600.0, negative_ttl: float = 60.0, max_size: int = 1024,
+                 is_failure=is_none):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.is_failure = is_failure
+        self._entries = OrderedDict()
+        self._flight = SingleFlight(name)
+        self.counts = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "failures": 0, "evictions": 0}
+
+    async def get_or_load(self, key, loader):
+        """
+        Returns the cached value for key, or awaits loader() (a zero-argument function returning an
+        awaitable) and caches its outcome.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value, error = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                if error is not None or self.is_failure(value):
+                    self.counts["negative_hits"] += 1
+                else:
+                    self.counts["hits"] += 1
+                if error is not None:
+                    raise error
+                return value
+            del self._entries[key]
+            self.counts["expired"] += 1
+
+        self.counts["misses"] += 1
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key, loader):
+        try:
+            value = await loader()
+        except Exception as e:
+            self.counts["failures"] += 1
+            self._store(key, None, e, self.negative_ttl)
+            raise
+        if self.is_failure(value):
+            self.counts["failures"] += 1
+            self._store(key, value, None, self.negative_ttl)
+        else:
+            self._store(key, value, None, self.ttl)
+        return value
+
+    def _store(self, key, value, error, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value, error)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counts["evictions"] += 1
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        flight = self._flight.stats(top=0)
+        lookups = self.counts["hits"] + self.counts["negative_hits"] + self.counts["misses"]
+        return dict(
+            self.counts,
+            name=self.name,
+            entries=len(self._entries),
+            max_size=self.max_size,
+            ttl_seconds=self.ttl,
+            negative_ttl_seconds=self.negative_ttl,
+            merged_loads=flight["merged"],
+            in_flight=flight["in_flight"],
+            hit_rate=round((self.counts["hits"] + self.counts["negative_hits"]) / lookups, 4) if lookups else None
+        )
+
+
+def async_ttl_cache(name: str, key, ttl: float = 3600.0, negative_ttl: float = 60.0, max_size: int = 1024,
+                    is_failure=is_none):
+    """
+    Decorator memoizing an async function in an AsyncTTLCache. key(*args, **kwargs) picks the cache
+    key, so per-call arguments such as an HTTP session can be left out of it. The cache is
+    available as the wrapper's .cache attribute.
+    """
+    def decorator(function):
+        cache = AsyncTTLCache(name, ttl=ttl, negative_ttl=negative_ttl, max_size=max_size, is_failure=is_failure)
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_load(key(*args, **kwargs), lambda: function(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
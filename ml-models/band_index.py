@@ -0,0 +1,238 @@
+# band_index.py
+import heapq
+import numpy as np
+from match_score import MatchScoreCalculator, scores_to_arrays
+
+
+class BandCell:
+    """
+    Candidates sharing one (frontend band, backend band) cell. Rows are kept sorted by frontend
+    score; backend and EQ values are also kept in their own sorted arrays so the cell's score
+    ranges are available in O(1) when bounding a query.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.frontend = np.empty(0, dtype=np.float64)
+        self.backend = np.empty(0, dtype=np.float64)
+        self.eq = np.empty(0, dtype=np.float64)
+        self.sorted_backend = np.empty(0, dtype=np.float64)
+        self.sorted_eq = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_arrays(cls, ids: list, frontend: np.ndarray, backend: np.ndarray, eq: np.ndarray):
+        """
+        Builds a cell from unsorted rows with one sort per array, instead of one insert per row.
+        Rows with equal frontend scores keep their input order, as repeated inserts would.
+        """
+        cell = cls()
+        order = np.argsort(frontend, kind="stable")
+        cell.ids = [ids[position] for position in order.tolist()]
+        cell.frontend = np.asarray(frontend, dtype=np.float64)[order]
+        cell.backend = np.asarray(backend, dtype=np.float64)[order]
+        cell.eq = np.asarray(eq, dtype=np.float64)[order]
+        cell.sorted_backend = np.sort(cell.backend)
+        cell.sorted_eq = np.sort(cell.eq)
+        return cell
+
+    def insert(self, candidate_id, frontend: float, backend: float, eq: float):
+        position = int(np.searchsorted(self.frontend, frontend, side="right"))
+        self.ids.insert(position, candidate_id)
+        self.frontend = np.insert(self.frontend, position, frontend)
+        self.backend = np.insert(self.backend, position, backend)
+        self.eq = np.insert(self.eq, position, eq)
+        self.sorted_backend = np.insert(self.sorted_backend, np.searchsorted(self.sorted_backend, backend), backend)
+        self.sorted_eq = np.insert(self.sorted_eq, np.searchsorted(self.sorted_eq, eq), eq)
+
+    def delete(self, candidate_id):
+        position = self.ids.index(candidate_id)
+        backend, eq = self.backend[position], self.eq[position]
+        del self.ids[position]
+        self.frontend = np.delete(self.frontend, position)
+        self.backend = np.delete(self.backend, position)
+        self.eq = np.delete(self.eq, position)
+        self.sorted_backend = np.delete(self.sorted_backend, np.searchsorted(self.sorted_backend, backend))
+        self.sorted_eq = np.delete(self.sorted_eq, np.searchsorted(self.sorted_eq, eq))
+
+
+class BandIndex:
+    """
+    In-memory candidate index bucketed by the 4 x 4 (frontend band, backend band) grid.
+
+    Within a cell the weighted skill base of the match formula is constant for a given anchor,
+    and the complementary bonus and EQ term are bounded by the cell's score ranges. A top-k query
+    visits cells in order of their upper bound and stops as soon as no remaining cell can beat
+    the current k-th score, so only promising cells are scored.
+    """
+
+    def __init__(self, calculator: MatchScoreCalculator = None):
+        self.calculator = calculator or MatchScoreCalculator()
+        self.cells = {}
+        self.cell_of = {}
+        self.last_query_stats = {}
+
+    @classmethod
+    def build(cls, candidates, calculator: MatchScoreCalculator = None):
+        """
+        Bulk-loads an index from (candidate_id, scores) pairs. Bands are computed in one vectorized
+        pass and each cell is sorted once, so loading N candidates is O(N log N) where N calls to
+        insert() would be O(N^2). Candidate IDs must be unique.
+        """
+        index = cls(calculator)
+        candidates = list(candidates)
+        ids = [candidate_id for candidate_id, _ in candidates]
+        frontend, backend, eq = scores_to_arrays([scores for _, scores in candidates])
+        if len(set(ids)) != len(ids):
+            raise ValueError("Candidate IDs must be unique")
+
+        # Bands run 1-4, so frontend_band * 5 + backend_band is a unique code per cell
+        cell_keys = MatchScoreCalculator.get_band_array(frontend).astype(np.int64) * 5 + MatchScoreCalculator.get_band_array(backend)
+        order = np.argsort(cell_keys, kind="stable")
+        keys, starts = np.unique(cell_keys[order], return_index=True)
+        for cell_key, rows in zip(keys.tolist(), np.split(order, starts[1:])):
+            key = divmod(cell_key, 5)
+            cell_ids = [ids[row] for row in rows.tolist()]
+            index.cells[key] = BandCell.from_arrays(cell_ids, frontend[rows], backend[rows], eq[rows])
+            index.cell_of.update(dict.fromkeys(cell_ids, key))
+        return index
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self.cell_of
+
+    def insert(self, candidate_id, scores: dict):
+        """
+        Adds a candidate, or updates them if the ID is already indexed.
+        """
+        if candidate_id in self.cell_of:
+            self.delete(candidate_id)
+        frontend = scores.get("frontend", 0)
+        backend = scores.get("backend", 0)
+        eq = scores.get("eq", 50)
+        key = (MatchScoreCalculator.get_band(frontend), MatchScoreCalculator.get_band(backend))
+        self.cells.setdefault(key, BandCell()).insert(candidate_id, frontend, backend, eq)
+        self.cell_of[candidate_id] = key
+
+    def update(self, candidate_id, scores: dict):
+        if candidate_id not in self.cell_of:
+            raise KeyError(candidate_id)
+        self.insert(candidate_id, scores)
+
+    def delete(self, candidate_id):
+        key = self.cell_of.pop(candidate_id)
+        cell = self.cells[key]
+        cell.delete(candidate_id)
+        if not cell:
+            del self.cells[key]
+
+    def _cell_upper_bound(self, key, cell: BandCell, frontend: float, backend: float, eq: float,
+                          frontend_band: int, backend_band: int) -> float:
+        calculator = self.calculator
+        w_front = calculator.weights.get("frontend", 0.5)
+        w_back = calculator.weights.get("backend", 0.5)
+        frontend_contrib = MatchScoreCalculator.contribution_from_bands(np.int8(frontend_band), np.int8(key[0]))
+        backend_contrib = MatchScoreCalculator.contribution_from_bands(np.int8(backend_band), np.int8(key[1]))
+        overall_fb_base = (frontend_contrib * w_front + backend_contrib * w_back) / (w_front + w_back)
+
+        frontend_min, frontend_max = cell.frontend[0], cell.frontend[-1]
+        backend_min, backend_max = cell.sorted_backend[0], cell.sorted_backend[-1]
+        max_diff_frontend = max(frontend - frontend_min, frontend_max - frontend)
+        max_diff_backend = max(backend - backend_min, backend_max - backend)
+
+        # The bonus needs frontend and backend differences of opposite sign. Feeding the largest
+        # possible differences with opposite signs gives the largest bonus the cell could reach.
+        complementary_possible = (frontend > frontend_min and backend < backend_max) or \
+                                 (frontend < frontend_max and backend > backend_min)
+        diff_backend = -max_diff_backend if complementary_possible else max_diff_backend
+
+        bound = calculator.finish_scores_array(overall_fb_base, max_diff_frontend, diff_backend, eq + cell.sorted_eq[-1])
+        return float(bound)
+
+    def top_k(self, anchor_scores: dict, k: int, exclude_id=None) -> list:
+        """
+        Returns up to k (candidate_id, score) pairs sorted by descending score, ties broken by ID.
+        Matches brute_force_top_k exactly.
+        """
+        frontend = anchor_scores.get("frontend", 0)
+        backend = anchor_scores.get("backend", 0)
+        eq = anchor_scores.get("eq", 50)
+        frontend_band = MatchScoreCalculator.get_band(frontend)
+        backend_band = MatchScoreCalculator.get_band(backend)
+
+        bounds = sorted(
+            ((self._cell_upper_bound(key, cell, frontend, backend, eq, frontend_band, backend_band), key)
+             for key, cell in self.cells.items()),
+            reverse=True
+        )
+
+        # Min-heap of the best k so far, ordered so the worst entry (lowest score, highest ID) pops first
+        best = []
+        cells_scored = candidates_scored = 0
+        for bound, key in bounds:
+            if k <= 0 or (len(best) == k and bound < best[0][0]):
+                break
+            cell = self.cells[key]
+            scores = self.calculator.calculate_combined_scores_array(
+                frontend, backend, eq, cell.frontend, cell.backend, cell.eq
+            )
+            cells_scored += 1
+            candidates_scored += len(cell)
+            rows = range(len(cell))
+            if len(best) == k:
+                # Only rows reaching the current k-th score can enter the heap (ties may, on ID)
+                rows = np.flatnonzero(scores >= best[0][0]).tolist()
+            for row in rows:
+                candidate_id, score = cell.ids[row], float(scores[row])
+                if candidate_id == exclude_id:
+                    continue
+                entry = (score, _ReverseOrder(candidate_id))
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+
+        self.last_query_stats = {
+            "cells_total": len(self.cells),
+            "cells_scored": cells_scored,
+            "candidates_total": len(self.cell_of),
+            "candidates_scored": candidates_scored
+        }
+        return [(entry[1].value, entry[0]) for entry in sorted(best, reverse=True)]
+
+    def brute_force_top_k(self, anchor_scores: dict, k: int, exclude_id=None) -> list:
+        """
+        Reference top-k that scores every indexed candidate with the scalar calculator.
+        """
+        results = []
+        for key, cell in self.cells.items():
+            for position, candidate_id in enumerate(cell.ids):
+                if candidate_id == exclude_id:
+                    continue
+                candidate = {"frontend": cell.frontend[position], "backend": cell.backend[position], "eq": cell.eq[position]}
+                results.append((candidate_id, self.calculator.calculate_combined_score(anchor_scores, candidate)))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:max(k, 0)]
+
+
+class _ReverseOrder:
+    """
+    Wraps an ID so that larger IDs compare as smaller, letting the heap evict the highest ID on ties.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __gt__(self, other):
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
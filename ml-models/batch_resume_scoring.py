@@ -0,0 +1,240 @@
+# batch_resume_scoring.py
+# Offline scoring for a whole cohort of resumes.
+#
+#   python batch_resume_scoring.py --input resumes/ --output scores.jsonl
+#   python batch_resume_scoring.py --manifest cohort.txt --output scores.jsonl --concurrency 8 --parquet scores.parquet
+#
+# Text extraction runs in a process pool and Gemini scoring in a bounded async window. Every result
+# is appended to the JSONL output as soon as it is ready, so the output doubles as the checkpoint:
+# a rerun skips files whose content hash (with the current prompt version and model) already has
+# an "ok" record, and retries the ones that failed.
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from document_extraction import extract_document
+from executors import PARSE_EXECUTOR, LLM_EXECUTOR, run_blocking
+from resume_cache import content_hash, cache_key
+import resume_analysis
+from resume_analysis import score_resume_text, store_resume_scores, PROMPT_VERSION, GEMINI_MODEL
+
+load_dotenv()
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+DEFAULT_CONCURRENCY = 8
+
+
+def find_resumes(directory: str) -> list:
+    """
+    Lists PDF and DOCX files under a directory (recursively), as {"id", "path"} entries.
+    """
+    entries = []
+    for root, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(RESUME_EXTENSIONS):
+                path = os.path.join(root, filename)
+                entries.append({"id": os.path.relpath(path, directory), "path": path})
+    return sorted(entries, key=lambda entry: entry["id"])
+
+
+def read_manifest(manifest_path: str) -> list:
+    """
+    Reads a manifest with one resume per line: either a plain path or a JSON object with "path"
+    and an optional "id". Relative paths are resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    entries = []
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"path": line}
+            entry["path"] = os.path.join(base, entry["path"])
+            entry.setdefault("id", entry["path"])
+            entries.append(entry)
+    return entries
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    Cache keys that already have an "ok" record in the output file.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a partial last line; that file is simply redone
+                continue
+            if record.get("status") == "ok":
+                done.add(record["cache_key"])
+    return done
+
+
+def extract_file(path: str) -> (str, dict):
+    """
+    Process-pool task: extracts one resume sequentially (files are the unit of parallelism here).
+    """
+    return extract_document(path)
+
+
+class BatchResumeScorer:
+    """
+    Scores a list of {"id", "path"} resume entries, appending one JSON record per file to output_path.
+    """
+
+    def __init__(self, output_path: str, concurrency: int = DEFAULT_CONCURRENCY, processes: int = None):
+        self.output_path = output_path
+        self.concurrency = max(1, concurrency)
+        self.processes = processes or os.cpu_count() or 1
+        self.counts = {"ok": 0, "error": 0, "skipped": 0, "duplicate": 0, "cache_hits": 0}
+        self._output = None
+
+    def _write(self, record: dict):
+        record["scored_at"] = datetime.now(timezone.utc).isoformat()
+        self._output.write(json.dumps(record) + "\n")
+        self._output.flush()
+
+    async def _score_entry(self, entry: dict, key: str, digest: str, process_pool, semaphore, loop):
+        record = {"id": entry["id"], "path": entry["path"], "content_hash": digest, "cache_key": key}
+        try:
+            cached = await run_blocking(PARSE_EXECUTOR, resume_analysis.resume_cache.get, key)
+            if cached:
+                self.counts["cache_hits"] += 1
+                record.update(status="ok", source="cache", frontend_score=cached["frontend_score"],
+                              backend_score=cached["backend_score"], extraction=None, error=None)
+                return record
+
+            text, stats = await loop.run_in_executor(process_pool, extract_file, entry["path"])
+            if stats.get("error") or not text.strip():
+                record.update(status="error", extraction=stats, error=stats.get("error") or "No text extracted")
+                return record
+
+            async with semaphore:
+                scores = await run_blocking(LLM_EXECUTOR, score_resume_text, text)
+            if scores is None:
+                record.update(status="error", extraction=stats, error="Scoring failed")
+                return record
+
+            await run_blocking(PARSE_EXECUTOR, store_resume_scores, key, text, scores)
+            record.update(status="ok", source="model", frontend_score=scores[0], backend_score=scores[1],
+                          extraction=stats, error=None)
+            return record
+        except Exception as e:
+            record.update(status="error", error=str(e))
+            return record
+
+    async def run(self, entries: list) -> dict:
+        start = time.perf_counter()
+        done = load_checkpoint(self.output_path)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        in_flight = {}
+        tasks = []
+
+        # Spawned, not forked: the executor threads are already running (the cache lookups use them)
+        # and a forked child could inherit a lock one of them holds
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")) as process_pool, \
+                open(self.output_path, "a", encoding="utf-8") as self._output:
+            for entry in entries:
+                try:
+                    with open(entry["path"], "rb") as f:
+                        digest = content_hash(f.read())
+                except OSError as e:
+                    self.counts["error"] += 1
+                    self._write({"id": entry["id"], "path": entry["path"], "status": "error", "error": str(e),
+                                 "content_hash": None, "cache_key": None})
+                    continue
+
+                key = cache_key(digest, PROMPT_VERSION, GEMINI_MODEL)
+                if key in done:
+                    self.counts["skipped"] += 1
+                    continue
+                if key in in_flight:
+                    # Same bytes under another name: scored once, recorded for both entries
+                    self.counts["duplicate"] += 1
+                    tasks.append(asyncio.ensure_future(self._copy_result(entry, in_flight[key])))
+                    continue
+
+                task = asyncio.ensure_future(self._score_entry(entry, key, digest, process_pool, semaphore, loop))
+                in_flight[key] = task
+                tasks.append(task)
+
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                self.counts[record["status"]] += 1
+                self._write(record)
+                print(f"[DEBUG] {record['status']:<5} {record['id']} "
+                      f"{record.get('frontend_score', '-')}/{record.get('backend_score', '-')} {record.get('error') or ''}")
+
+        elapsed = time.perf_counter() - start
+        scored = self.counts["ok"] + self.counts["error"]
+        return dict(self.counts, files=len(entries), seconds=round(elapsed, 2),
+                    files_per_second=round(scored / elapsed, 2) if elapsed else None)
+
+    @staticmethod
+    async def _copy_result(entry: dict, original: asyncio.Future) -> dict:
+        record = dict(await original)
+        record.update(id=entry["id"], path=entry["path"], duplicate_of=record["id"])
+        return record
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> bool:
+    """
+    Converts the latest record per file in the JSONL output to Parquet when pyarrow is installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("[ERROR] pyarrow is not installed; skipping Parquet output")
+        return False
+
+    latest = {}
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            record["extraction"] = json.dumps(record.get("extraction"))
+            latest[record["id"]] = record
+    pq.write_table(pa.Table.from_pylist(list(latest.values())), parquet_path)
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score a directory or manifest of resumes offline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Directory of PDF/DOCX resumes (searched recursively)")
+    source.add_argument("--manifest", help="File with one path or {\"path\", \"id\"} JSON object per line")
+    parser.add_argument("--output", default="resume_scores.jsonl", help="JSONL results file, also the checkpoint")
+    parser.add_argument("--parquet", help="Also write the results to this Parquet file (needs pyarrow)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent Gemini calls")
+    parser.add_argument("--processes", type=int, default=None, help="Extraction worker processes")
+    args = parser.parse_args(argv)
+
+    entries = find_resumes(args.input) if args.input else read_manifest(args.manifest)
+    print(f"Found {len(entries)} resumes")
+
+    scorer = BatchResumeScorer(args.output, concurrency=args.concurrency, processes=args.processes)
+    summary = asyncio.run(scorer.run(entries))
+    print(f"\nSummary: {json.dumps(summary)}")
+
+    if args.parquet and write_parquet(args.output, args.parquet):
+        print(f"Parquet written to {args.parquet}")
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
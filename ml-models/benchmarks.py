@@ -0,0 +1,223 @@
+# benchmarks.py
+# Microbenchmarks for the scoring kernels. Correctness checks (golden match cases, stores,
+# concurrency) live in tests/ and run with `python -m pytest tests`.
+#
+#   python benchmarks.py                           # run the benchmarks and print a table
+#   python benchmarks.py --save-baseline           # ...and store results in benchmarks_baseline.json
+#   python benchmarks.py --compare --threshold 0.2 # ...and exit 1 if ops/sec dropped more than 20%
+#   python benchmarks.py --only match_score --sizes 1000 10000
+#
+# The github_analysis benchmarks import that module, which needs GEMINI_API_KEY (.env) like the app.
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from match_score import MatchScoreCalculator, CompiledMatchScoreCalculator
+from Eq_score import calculate_eq_score, SCORING_MATRIX
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE_FILE = os.path.join(BASE_DIR, "benchmarks_baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Vectorized kernels are timed per call over the whole input, repeated this many times
+BATCH_REPEATS = 20
+
+
+# Synthetic inputs
+
+def random_candidate(rng: random.Random) -> dict:
+    return {
+        "frontend": rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)]),
+        "backend": rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)]),
+        "eq": round(rng.uniform(0, 100), 2)
+    }
+
+
+def random_eq_responses(rng: random.Random) -> dict:
+    return {question: rng.randint(1, 5) for question in SCORING_MATRIX}
+
+
+def random_repo(rng: random.Random) -> dict:
+    languages = rng.sample(["JavaScript", "TypeScript", "HTML", "CSS", "Python", "Go", "Java", "Rust", "Shell"], rng.randint(0, 4))
+    pushed = datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 900))
+    return {
+        "name": rng.choice(["portfolio", "api-server", "react-dashboard", "ml-notebooks", "django-blog", "dotfiles"]),
+        "description": rng.choice(["", "A frontend built with react and tailwind", "REST api with express and mongodb", None]),
+        "languages": {language: rng.randint(100, 200000) for language in languages},
+        "commit_count": rng.randint(0, 500),
+        "last_pushed": pushed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "stargazerCount": rng.randint(0, 120)
+    }
+
+
+# Benchmarks: each builder returns (function, list of argument tuples, items per call)
+
+def bench_match_scalar(rng, size):
+    calculator = MatchScoreCalculator()
+    return calculator.calculate_combined_score, [(random_candidate(rng), random_candidate(rng)) for _ in range(size)], 1
+
+
+def bench_match_compiled(rng, size):
+    calculator = CompiledMatchScoreCalculator()
+    return calculator.calculate_combined_score, [(random_candidate(rng), random_candidate(rng)) for _ in range(size)], 1
+
+
+def bench_match_batch(rng, size):
+    calculator = MatchScoreCalculator()
+    candidates = [random_candidate(rng) for _ in range(size)]
+    return calculator.calculate_batch_scores, [(random_candidate(rng), candidates)] * BATCH_REPEATS, size
+
+
+def bench_match_batch_compiled(rng, size):
+    calculator = CompiledMatchScoreCalculator()
+    candidates = [random_candidate(rng) for _ in range(size)]
+    return calculator.calculate_batch_scores, [(random_candidate(rng), candidates)] * BATCH_REPEATS, size
+
+
+def bench_eq_score(rng, size):
+    return calculate_eq_score, [(random_eq_responses(rng),) for _ in range(size)], 1
+
+
+def bench_normalize_score(rng, size):
+    from github_analysis import normalize_score
+    return normalize_score, [(rng.uniform(0, 20000), 5000) for _ in range(size)], 1
+
+
+def bench_recency_weight(rng, size):
+    from github_analysis import recency_weight
+    now = datetime.now(timezone.utc)
+    return recency_weight, [(now - timedelta(days=rng.randint(0, 900)),) for _ in range(size)], 1
+
+
+def bench_score_repo(rng, size):
+    from github_analysis import score_repo
+    return score_repo, [(random_repo(rng), "octocat") for _ in range(size)], 1
+
+
+def bench_classify_repo(rng, size):
+    from github_analysis import classify_repo_with_package_json
+    args = []
+    for _ in range(size):
+        repo = random_repo(rng)
+        args.append((list(repo["languages"]), repo["name"], repo["description"] or "", "octocat"))
+    return classify_repo_with_package_json, args, 1
+
+
+BENCHMARKS = {
+    "match_score.calculate_combined_score": bench_match_scalar,
+    "match_score.compiled.calculate_combined_score": bench_match_compiled,
+    "match_score.calculate_batch_scores": bench_match_batch,
+    "match_score.compiled.calculate_batch_scores": bench_match_batch_compiled,
+    "Eq_score.calculate_eq_score": bench_eq_score,
+    "github_analysis.normalize_score": bench_normalize_score,
+    "github_analysis.recency_weight": bench_recency_weight,
+    "github_analysis.score_repo": bench_score_repo,
+    "github_analysis.classify_repo_with_package_json": bench_classify_repo,
+}
+
+
+def run_benchmark(builder, size: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    function, calls, items_per_call = builder(rng, size)
+
+    # Warm up caches, lazy tables and the allocator before timing
+    for args in calls[:min(len(calls), 100)]:
+        function(*args)
+
+    latencies = np.empty(len(calls), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for index, args in enumerate(calls):
+        start = clock()
+        function(*args)
+        latencies[index] = clock() - start
+
+    total_seconds = latencies.sum() / 1e9
+    return {
+        "ops_per_sec": round(len(calls) * items_per_call / total_seconds, 1) if total_seconds else None,
+        "p50_us": round(float(np.percentile(latencies, 50)) / 1000, 3),
+        "p99_us": round(float(np.percentile(latencies, 99)) / 1000, 3),
+        "calls": len(calls),
+        "items_per_call": items_per_call
+    }
+
+
+def run_all(sizes: list, only: str = None) -> dict:
+    results = {}
+    for name, builder in BENCHMARKS.items():
+        if only and not name.startswith(only):
+            continue
+        results[name] = {}
+        for size in sizes:
+            result = run_benchmark(builder, size)
+            results[name][str(size)] = result
+            print(f"{name:<50} n={size:<8} {result['ops_per_sec']:>14,.0f} ops/s   "
+                  f"p50 {result['p50_us']:>10.3f} us   p99 {result['p99_us']:>10.3f} us")
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Lists benchmarks whose ops/sec fell more than `threshold` (a fraction) below the baseline.
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            reference = baseline.get("results", {}).get(name, {}).get(size)
+            if not reference or not reference.get("ops_per_sec") or not result.get("ops_per_sec"):
+                continue
+            ratio = result["ops_per_sec"] / reference["ops_per_sec"]
+            if ratio < 1 - threshold:
+                regressions.append(f"{name} n={size}: {result['ops_per_sec']:,.0f} ops/s vs baseline "
+                                   f"{reference['ops_per_sec']:,.0f} ({(1 - ratio) * 100:.1f}% slower)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scoring kernel microbenchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", help="Only run benchmarks whose name starts with this prefix")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_FILE, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="Fail if results regress past the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed ops/sec drop as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.sizes, args.only)
+    exit_code = 0
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\n[ERROR] Baseline not found: {args.baseline}")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[ERROR] {len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            exit_code = 1
+        else:
+            print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "results": results
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# calculator_registry.py
+import threading
+from collections import OrderedDict
+from match_score import create_calculator
+
+
+class UnknownProfileError(KeyError):
+    pass
+
+
+class CalculatorRegistry:
+    """
+    Bounded LRU cache of match calculators keyed by their (frontend, backend) weights.
+    A calculator owns its precompiled tables, so reusing it also reuses those tables.
+    Named weight profiles can be registered once and referenced by ID afterwards.
+    """
+
+    def __init__(self, mode: str = "compiled", max_size: int = 32):
+        self.mode = mode
+        self.max_size = max_size
+        self._calculators = OrderedDict()
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def match_weights(weights: dict = None) -> dict:
+        """
+        The caller's {"frontend", "backend"} weights, as MatchScoreCalculator keeps them: other keys
+        (e.g. "eq") do not affect the match score and are dropped, missing keys default to 0.5.
+        """
+        weights = weights or {}
+        match_weights = {
+            "frontend": weights.get("frontend", 0.5),
+            "backend": weights.get("backend", 0.5)
+        }
+        for value in match_weights.values():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("Weights must be numbers")
+        return match_weights
+
+    @classmethod
+    def cache_key(cls, weights: dict = None) -> tuple:
+        """
+        Returns the validated (frontend, backend) weights, used as the cache key as given: the same
+        ratio spelled differently ({1, 2} vs {0.25, 0.5}) gets its own calculator, since the last
+        float bits of a score can differ between the two.
+        """
+        match_weights = cls.match_weights(weights)
+        w_front = float(match_weights["frontend"])
+        w_back = float(match_weights["backend"])
+        if w_front < 0 or w_back < 0 or w_front + w_back <= 0:
+            raise ValueError("Weights must be non-negative and must not sum to zero")
+        return w_front, w_back
+
+    def get(self, weights: dict = None):
+        """
+        Calculator for the given weights, built from the caller's own weights, so scores (and
+        calculator.weights) are exactly those of MatchScoreCalculator(weights).
+        """
+        key = self.cache_key(weights)
+        with self._lock:
+            calculator = self._calculators.get(key)
+            if calculator is not None:
+                self._calculators.move_to_end(key)
+                self.hits += 1
+                return calculator
+            self.misses += 1
+
+        calculator = create_calculator(self.match_weights(weights), mode=self.mode)
+
+        with self._lock:
+            # Another caller may have built the same calculator meanwhile; keep the first one
+            calculator = self._calculators.setdefault(key, calculator)
+            self._calculators.move_to_end(key)
+            while len(self._calculators) > self.max_size:
+                self._calculators.popitem(last=False)
+                self.evictions += 1
+        return calculator
+
+    def register_profile(self, profile_id: str, weights: dict) -> dict:
+        self.cache_key(weights)
+        with self._lock:
+            self._profiles[profile_id] = self.match_weights(weights)
+        return dict(self._profiles[profile_id])
+
+    def get_profile(self, profile_id: str) -> dict:
+        with self._lock:
+            if profile_id not in self._profiles:
+                raise UnknownProfileError(f"Unknown weight profile: {profile_id}")
+            return dict(self._profiles[profile_id])
+
+    def list_profiles(self) -> dict:
+        with self._lock:
+            return {profile_id: dict(weights) for profile_id, weights in self._profiles.items()}
+
+    def resolve(self, weights: dict = None, profile_id: str = None):
+        """
+        Calculator for a request: a registered profile takes precedence over inline weights.
+        """
+        if profile_id is not None:
+            return self.get(self.get_profile(profile_id))
+        return self.get(weights)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "size": len(self._calculators),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "profiles": len(self._profiles)
+            }
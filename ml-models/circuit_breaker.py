@@ -0,0 +1,66 @@
+# circuit_breaker.py
+import time
+import threading
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker around an unreliable upstream.
+      - closed: calls go through; failure_threshold consecutive failures open the breaker
+      - open: calls are refused until reset_timeout seconds have passed
+      - half_open: one trial call is let through; success closes the breaker, failure re-opens it
+    Timeouts should be recorded as failures by the caller.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.counts = {"allowed": 0, "rejected": 0, "successes": 0, "failures": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self.trial_in_flight = False
+            if self.state == "closed" or (self.state == "half_open" and not self.trial_in_flight):
+                if self.state == "half_open":
+                    self.trial_in_flight = True
+                self.counts["allowed"] += 1
+                return True
+            self.counts["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.counts["successes"] += 1
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.counts["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.counts["opened"] += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self.counts,
+                name=self.name,
+                state=self.state,
+                consecutive_failures=self.consecutive_failures,
+                failure_threshold=self.failure_threshold,
+                reset_timeout=self.reset_timeout
+            )
@@ -0,0 +1,199 @@
+# document_extraction.py
+# Budgeted text extraction for resumes. Kept free of API clients and caches so process-pool
+# workers can import it cheaply.
+import io
+import os
+import time
+import zipfile
+import PyPDF2
+import docx
+
+# Stop reading once either budget is reached; the prompt only ever sees this much text
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", 20))
+MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", 40000))
+
+# PDFs with at least this many pages (within the page budget) are split across the process pool.
+# Each task is sent the whole file and parses it again before reading its pages, so short
+# documents are always cheaper to read in place.
+PARALLEL_MIN_PAGES = int(os.getenv("RESUME_PARALLEL_MIN_PAGES", 16))
+PAGES_PER_TASK = int(os.getenv("RESUME_PAGES_PER_TASK", 8))
+
+# Leading bytes of each supported (and one rejected) container format
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# PDF readers accept junk before the header, so look for it in the first KB rather than at offset 0
+PDF_HEADER_SEARCH_BYTES = 1024
+
+
+def open_resume(source):
+    """
+    Returns a seekable binary stream positioned at the start, for a file path, raw bytes
+    or an already-open binary file object (BytesIO, SpooledTemporaryFile, ...).
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return io.BytesIO(file.read())
+    source.seek(0)
+    return source
+
+
+def detect_format(stream):
+    """
+    Sniffs the document format from its content instead of trusting the file name.
+    Returns "pdf" or "docx"; raises ValueError for anything else.
+    """
+    stream.seek(0)
+    head = stream.read(PDF_HEADER_SEARCH_BYTES)
+    stream.seek(0)
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(stream) as archive:
+                is_docx = "word/document.xml" in archive.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        finally:
+            stream.seek(0)
+        if is_docx:
+            return "docx"
+        raise ValueError("Unsupported file format. ZIP file is not a Word document.")
+    if head.startswith(OLE_MAGIC):
+        raise ValueError("Legacy .doc files are not supported. Please save the resume as PDF or DOCX.")
+    if PDF_MAGIC in head:
+        return "pdf"
+    raise ValueError("Unsupported file format. Please use PDF or DOCX.")
+
+
+def extract_pdf_page_range(data: bytes, start: int, stop: int, max_chars: int) -> (list, int):
+    """
+    Process-pool task: text of pages [start, stop), stopping early once max_chars have been read.
+    Returns (texts, pages_read). The PDF bytes are pickled into every task and the document is
+    parsed again here (xref table, page tree), a fixed cost per task on top of the pages themselves.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    texts = []
+    chars = 0
+    pages_read = 0
+    for page_number in range(start, stop):
+        page_text = reader.pages[page_number].extract_text()
+        pages_read += 1
+        if page_text:
+            texts.append(page_text)
+            chars += len(page_text) + 1
+            if chars >= max_chars:
+                break
+    return texts, pages_read
+
+
+def _read_bytes(stream) -> bytes:
+    stream.seek(0)
+    data = stream.read()
+    stream.seek(0)
+    return data
+
+
+def extract_pdf(stream, max_pages: int = MAX_PAGES, max_chars: int = MAX_CHARS, process_pool=None,
+                parallel_min_pages: int = PARALLEL_MIN_PAGES, pages_per_task: int = PAGES_PER_TASK) -> (str, dict):
+    """
+    Extracts up to max_pages pages / max_chars characters of text from a PDF stream.
+    When a process pool is given and the document has at least parallel_min_pages pages to read,
+    page ranges are extracted in parallel; results are joined in page order and the ranges past
+    the character budget are cancelled. Every range re-parses the document in its worker, so the
+    threshold should stay well above the page count of a typical resume. Returns (text, stats).
+    """
+    start_time = time.perf_counter()
+    reader = PyPDF2.PdfReader(stream)
+    pages_total = len(reader.pages)
+    pages_to_read = min(pages_total, max_pages)
+    texts = []
+    chars = 0
+    pages_read = 0
+    mode = "sequential"
+
+    if process_pool is not None and pages_to_read >= parallel_min_pages:
+        mode = "parallel"
+        data = _read_bytes(stream)
+        futures = [
+            process_pool.submit(extract_pdf_page_range, data, start, min(start + pages_per_task, pages_to_read), max_chars)
+            for start in range(0, pages_to_read, pages_per_task)
+        ]
+        for index, future in enumerate(futures):
+            range_texts, range_pages = future.result()
+            texts.extend(range_texts)
+            chars += sum(len(text) + 1 for text in range_texts)
+            pages_read += range_pages
+            if chars >= max_chars:
+                for pending in futures[index + 1:]:
+                    pending.cancel()
+                break
+    else:
+        for page in reader.pages[:pages_to_read]:
+            page_text = page.extract_text()
+            pages_read += 1
+            if page_text:
+                texts.append(page_text)
+                chars += len(page_text) + 1
+                if chars >= max_chars:
+                    break
+
+    text = "\n".join(texts) + "\n" if texts else ""
+    truncated = len(text) > max_chars or pages_total > pages_read
+    return text[:max_chars], {
+        "format": "pdf",
+        "mode": mode,
+        "pages_total": pages_total,
+        "pages_read": pages_read,
+        "chars": min(len(text), max_chars),
+        "truncated": truncated,
+        "seconds": round(time.perf_counter() - start_time, 4)
+    }
+
+
+def extract_docx(stream, max_chars: int = MAX_CHARS) -> (str, dict):
+    """
+    Extracts paragraph text from a DOCX stream up to max_chars characters. Returns (text, stats).
+    """
+    start_time = time.perf_counter()
+    document = docx.Document(stream)
+    texts = []
+    chars = 0
+    truncated = False
+    for paragraph in document.paragraphs:
+        if chars >= max_chars:
+            truncated = True
+            break
+        texts.append(paragraph.text)
+        chars += len(paragraph.text) + 1
+
+    text = "\n".join(texts) + "\n" if texts else ""
+    truncated = truncated or len(text) > max_chars
+    return text[:max_chars], {
+        "format": "docx",
+        "mode": "sequential",
+        "paragraphs": len(texts),
+        "chars": min(len(text), max_chars),
+        "truncated": truncated,
+        "seconds": round(time.perf_counter() - start_time, 4)
+    }
+
+
+def extract_document(source, document_format: str = None, process_pool=None) -> (str, dict):
+    """
+    Sniffs (unless document_format is given) and extracts a PDF or DOCX from a path, bytes or
+    binary stream. Unsupported formats raise ValueError; parse failures return empty text with
+    the error recorded in stats["error"].
+    """
+    stream = open_resume(source)
+    document_format = document_format or detect_format(stream)
+    try:
+        if document_format == "pdf":
+            text, stats = extract_pdf(stream, process_pool=process_pool)
+        else:
+            text, stats = extract_docx(stream)
+        stats["error"] = None
+    except Exception as e:
+        text, stats = "", {"format": document_format, "error": str(e), "seconds": 0}
+    return text, stats
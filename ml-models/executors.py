@@ -0,0 +1,87 @@
+# executors.py
+import os
+import asyncio
+import threading
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Blocking work is kept off the event loop in two bounded pools so one kind of load cannot
+# starve the other: document parsing / CPU scoring, and synchronous LLM SDK calls (mostly waiting).
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", min(4, os.cpu_count() or 1)))
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", 16))
+
+PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+LLM_EXECUTOR = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm")
+
+# LLM calls allowed to wait for a thread on top of the LLM_WORKERS running ones. A caller that gives
+# up on its latency budget cannot stop a running SDK call, so during an outage the pool fills with
+# abandoned calls; past this limit new calls are refused and callers fall back at once.
+LLM_MAX_QUEUED = int(os.getenv("LLM_MAX_QUEUED", LLM_WORKERS))
+# Client-side timeout for one Gemini HTTP call: how long an abandoned call can keep its thread
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", 10.0))
+
+_llm_lock = threading.Lock()
+_llm_pending = 0
+llm_counts = {"submitted": 0, "rejected": 0, "max_pending": 0}
+
+# Worker processes for splitting large PDFs by page range (0 or 1 disables parallel extraction).
+# Kept small: every task re-parses the whole PDF, so more workers mostly multiply that overhead.
+EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", min(2, os.cpu_count() or 1)))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Returns the shared extraction process pool, started on first use, or None when disabled.
+    Workers are spawned rather than forked: the server process runs threads (uvicorn, the
+    executors above, SDK clients), and forking it could copy a lock held by one of them.
+    """
+    global _process_pool
+    if EXTRACTION_PROCESSES <= 1:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=EXTRACTION_PROCESSES,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+async def run_blocking(executor, function, *args, **kwargs):
+    """
+    Runs a blocking function on the given executor and awaits its result without blocking the loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+
+def _release_llm_slot(_):
+    global _llm_pending
+    with _llm_lock:
+        _llm_pending -= 1
+
+
+def submit_llm(function, *args, **kwargs):
+    """
+    Submits a blocking LLM call to LLM_EXECUTOR and returns its concurrent.futures.Future, or
+    None when LLM_WORKERS + LLM_MAX_QUEUED calls are already pending.
+    """
+    global _llm_pending
+    with _llm_lock:
+        if _llm_pending >= LLM_WORKERS + LLM_MAX_QUEUED:
+            llm_counts["rejected"] += 1
+            return None
+        _llm_pending += 1
+        llm_counts["submitted"] += 1
+        llm_counts["max_pending"] = max(llm_counts["max_pending"], _llm_pending)
+    future = LLM_EXECUTOR.submit(functools.partial(function, *args, **kwargs))
+    future.add_done_callback(_release_llm_slot)
+    return future
+
+
+def llm_stats() -> dict:
+    with _llm_lock:
+        return dict(llm_counts, pending=_llm_pending, workers=LLM_WORKERS, max_queued=LLM_MAX_QUEUED,
+                    call_timeout_seconds=LLM_CALL_TIMEOUT)
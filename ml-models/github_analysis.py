@@ -1,6 +1,7 @@
 import os
 import re
 import math
+import time
 import json
 import requests
 import asyncio
@@ -8,26 +9,48 @@ import aiohttp
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 from google import genai
-from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
+from google.genai import types
 import nest_asyncio
+from executors import PARSE_EXECUTOR, run_blocking, submit_llm, LLM_CALL_TIMEOUT
+from single_flight import SingleFlight
+from async_cache import async_ttl_cache
+from http_client import session_scope
+from github_scheduler import GitHubScheduler
+from github_cache import GitHubCache, graphql_key, DEFAULT_CACHE_PATH, DEFAULT_GRAPHQL_TTL_SECONDS, DEFAULT_REST_MAX_AGE_SECONDS, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+# Keywords lists for repository classification (shared with local_skill_scorer)
+from skill_vocabulary import FRONTEND_KEYWORDS, BACKEND_KEYWORDS
 
 # Load environment variables
 load_dotenv()
 
-# Get GitHub token from environment variables
-GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-HEADERS = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
-GRAPHQL_URL = 'https://api.github.com/graphql'
+# Every GitHub API request goes through the scheduler, which rotates the tokens from GITHUB_TOKENS
+# (or the single GITHUB_TOKEN) and paces requests against their rate limit budgets
+github_scheduler = GitHubScheduler(
+    reserve=int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", 20)),
+    max_wait=float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", 60)),
+    max_retries=int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", 3))
+)
+# Overridable so the analysis can run against a local fake GitHub server
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+# REST responses are revalidated by ETag, GraphQL pages reused until the TTL runs out
+github_cache = GitHubCache(
+    path=os.getenv("GITHUB_CACHE_PATH", DEFAULT_CACHE_PATH),
+    graphql_ttl=float(os.getenv("GITHUB_CACHE_GRAPHQL_TTL", DEFAULT_GRAPHQL_TTL_SECONDS)),
+    rest_max_age=float(os.getenv("GITHUB_CACHE_REST_MAX_AGE", DEFAULT_REST_MAX_AGE_SECONDS)),
+    max_entries=int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    max_bytes=int(os.getenv("GITHUB_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+)
 
 # Configure Gemini API
 api_key = os.getenv("GEMINI_API_KEY")
 BACKEND_API_URL = os.getenv("BACKEND_API_URL")
-client = genai.Client(api_key=api_key)
+# The client-side timeout bounds how long a stalled Gemini call holds an LLM thread
+client = genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=int(LLM_CALL_TIMEOUT * 1000)))
 
-# Define keywords lists for repository classification
-FRONTEND_KEYWORDS = ["react", "vue", "angular", "css", "html", "sass", "less", "bootstrap", "tailwind", "webpack", "vite", "ui", "frontend", "jsx"]
-BACKEND_KEYWORDS = ["node", "express", "django", "flask", "spring", "api", "server", "database", "sql", "nosql", "mongodb", "postgres", "mysql", "backend", "microservice"]
+# Concurrent analyses of the same GitHub user share one round of API paging and one Gemini call
+github_flight = SingleFlight("github")
 
 # Define language mappings for byte-based evaluation
 FRONTEND_LANGUAGES = {"html", "css", "typescript"}
@@ -52,18 +75,68 @@ def extract_username(github_url: str) -> str:
         return match.group(1)
     raise ValueError("Invalid GitHub URL provided.")
 
+async def github_rest_get(session, url: str):
+    """
+    GET a GitHub REST resource through github_cache. A stored response is revalidated with
+    If-None-Match and reused on 304. Returns (status, JSON body or None); a 304 is reported as 200.
+    """
+    cached = await run_blocking(PARSE_EXECUTOR, github_cache.get_rest, url)
+    headers = {}
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+
+    async with github_scheduler.request(session, "GET", url, resource="core", headers=headers) as (response, _):
+        if response.status == 304 and cached:
+            github_cache.record("rest_not_modified")
+            return 200, cached["body"]
+        if response.status != 200:
+            return response.status, None
+        body = await response.json()
+        etag = response.headers.get("ETag")
+
+    if etag:
+        github_cache.record("rest_refreshed" if cached else "rest_misses")
+        await run_blocking(PARSE_EXECUTOR, github_cache.put_rest, url, etag, body)
+    else:
+        github_cache.record("rest_uncacheable")
+    return 200, body
+
+async def github_graphql(session, query: str, variables: dict) -> dict:
+    """
+    POST a GraphQL query through github_cache (keyed by query and variables, reused until the TTL).
+    Returns the response's "data"; failed requests and GraphQL errors raise and are not cached.
+    """
+    key = graphql_key(query, variables)
+    cached = await run_blocking(PARSE_EXECUTOR, github_cache.get_graphql, key)
+    if cached is not None:
+        return cached
+
+    request = github_scheduler.request(session, "POST", GRAPHQL_URL, resource="graphql", json={'query': query, 'variables': variables})
+    async with request as (response, token):
+        if response.status != 200:
+            raise Exception(f"GitHub query failed with code {response.status}: {await response.text()}")
+        data = await response.json()
+
+    if 'errors' in data:
+        raise Exception(f"GraphQL query error: {data['errors']}")
+    result = data.get('data') or {}
+    github_scheduler.record_graphql(token, result.get('rateLimit'))
+    # Rate limit data describes this request only, so it is not stored with the cached page
+    stored = {field: value for field, value in result.items() if field != 'rateLimit'}
+    await run_blocking(PARSE_EXECUTOR, github_cache.put_graphql, key, stored)
+    return result
+
 async def get_all_repo_languages_batch(session, owner: str, repos: list) -> dict:
     """
     Fetches languages for multiple repositories in parallel
     """
     async def fetch_languages(repo):
-        url = f"https://api.github.com/repos/{owner}/{repo}"
-        async with session.get(url, headers=HEADERS) as response:
-            if response.status == 200:
-                return repo, await response.json()
-            else:
-                print(f"Error fetching languages for {repo}: {response.status}")
-                return repo, {}
+        status, body = await github_rest_get(session, f"{GITHUB_API_URL}/repos/{owner}/{repo}")
+        if status == 200:
+            return repo, body
+        else:
+            print(f"Error fetching languages for {repo}: {status}")
+            return repo, {}
     
     tasks = [fetch_languages(repo["name"]) for repo in repos]
     results = await asyncio.gather(*tasks)
@@ -92,13 +165,101 @@ def recency_weight(pushed_at):
     else:
         return 0.5
 
-async def get_user_repos_batched(session, username: str, batch_size=50, max_repos=300):
+def score_repo(repo: dict, username: str = "") -> (float, float):
+    """
+    Scores one repository from collect_github_information_async and splits the points
+    between frontend and backend. Returns (frontend_points, backend_points).
+    """
+    repo_name = repo['name']
+    description = repo.get('description') or ""
+    
+    languages_dict = repo.get('languages', {})
+    
+    commit_count = repo.get('commit_count', 0)
+    pushed_at_str = repo.get('last_pushed')
+    recency = datetime.strptime(pushed_at_str, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc) if pushed_at_str else None
+    weight = recency_weight(recency) if recency else 0.5
+    
+    # Base repository score from commit activity and recency
+    repo_score = commit_count * weight
+    
+    # Incorporate repository popularity (stargazerCount)
+    stars = repo.get('stargazerCount', 0)
+    star_multiplier = 1 + (stars / 50)  # Increase score for every 50 stars
+    repo_score *= star_multiplier
+    
+    # Evaluate language distribution based on byte counts
+    total_bytes = sum(languages_dict.values()) if languages_dict else 0
+    if total_bytes > 0:
+        frontend_bytes = 0
+        backend_bytes = 0
+        for lang, byte_count in languages_dict.items():
+            lang_lower = lang.lower()
+            if lang_lower == "javascript":
+                # Split JavaScript equally between frontend and backend
+                frontend_bytes += byte_count / 2
+                backend_bytes += byte_count / 2
+            elif lang_lower in FRONTEND_LANGUAGES:
+                frontend_bytes += byte_count
+            elif lang_lower in BACKEND_LANGUAGES:
+                backend_bytes += byte_count
+        total_relevant = frontend_bytes + backend_bytes
+        if total_relevant > 0:
+            frontend_ratio = frontend_bytes / total_relevant
+            backend_ratio = backend_bytes / total_relevant
+        else:
+            frontend_ratio = 0.5
+            backend_ratio = 0.5
+    else:
+        # Fallback using description-based classification if no language data is available
+        classification = classify_repo_with_package_json(list(languages_dict.keys()), repo_name, description, username)
+        if classification == "Front End":
+            frontend_ratio = 1.0
+            backend_ratio = 0.0
+        elif classification == "Back End":
+            frontend_ratio = 0.0
+            backend_ratio = 1.0
+        elif classification == "Full Stack":
+            frontend_ratio = 0.5
+            backend_ratio = 0.5
+        else:
+            frontend_ratio = 0.5
+            backend_ratio = 0.5
+    
+    # Return points allocated based on the computed ratios
+    return repo_score * frontend_ratio, repo_score * backend_ratio
+
+async def get_user_repos_batched(session, username: str, batch_size=100, max_repos=300):
     """
-    Fetch repositories in batches using cursors for pagination
+    Fetch repositories in batches using cursors for pagination. The first page also carries the
+    profile fields and contribution total (so no separate REST call is needed), and every page asks
+    only for the repository fields that scoring reads, plus the query's rate limit cost.
+    Returns (repos, contributions, profile, query_stats).
     """
     query = """
-    query($username: String!, $batchSize: Int!, $cursor: String) {
+    query($username: String!, $batchSize: Int!, $cursor: String, $firstPage: Boolean!) {
+      rateLimit {
+        cost
+        limit
+        remaining
+        resetAt
+      }
       user(login: $username) {
+        login @include(if: $firstPage)
+        bio @include(if: $firstPage)
+        location @include(if: $firstPage)
+        company @include(if: $firstPage)
+        followers @include(if: $firstPage) {
+          totalCount
+        }
+        publicRepositories: repositories(privacy: PUBLIC, ownerAffiliations: OWNER) @include(if: $firstPage) {
+          totalCount
+        }
+        contributionsCollection @include(if: $firstPage) {
+          contributionCalendar {
+            totalContributions
+          }
+        }
         repositories(first: $batchSize, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
           pageInfo {
             hasNextPage
@@ -128,63 +289,76 @@ async def get_user_repos_batched(session, username: str, batch_size=50, max_repo
             }
           }
         }
-        contributionsCollection {
-          contributionCalendar {
-            totalContributions
-          }
-        }
       }
     }
     """
     
     all_repos = []
     contributions = None
+    profile = {}
     cursor = None
     repo_count = 0
+    query_stats = {"pages": 0, "cached_pages": 0, "cost": 0, "remaining": None, "reset_at": None}
     
     while repo_count < max_repos:
         variables = {
             "username": username, 
-            "batchSize": batch_size,
-            "cursor": cursor
+            "batchSize": min(batch_size, max_repos - repo_count),
+            "cursor": cursor,
+            "firstPage": cursor is None
         }
         
-        async with session.post(
-            GRAPHQL_URL,
-            headers=HEADERS,
-            json={'query': query, 'variables': variables}
-        ) as response:
-            if response.status != 200:
-                raise Exception(f"GitHub query failed with code {response.status}: {await response.text()}")
-            
-            data = await response.json()
-            
-            if 'errors' in data:
-                raise Exception(f"GraphQL query error: {data['errors']}")
-                
-            user_data = data.get('data', {}).get('user')
-            if not user_data:
-                break
-                
-            repos = user_data.get('repositories', {})
-            nodes = repos.get('nodes', [])
+        data = await github_graphql(session, query, variables)
+        query_stats["pages"] += 1
+        rate_limit = data.get('rateLimit')
+        if rate_limit:
+            query_stats["cost"] += rate_limit.get('cost', 0)
+            query_stats["remaining"] = rate_limit.get('remaining')
+            query_stats["reset_at"] = rate_limit.get('resetAt')
+        else:
+            # Served from github_cache, which stores pages without their rate limit data
+            query_stats["cached_pages"] += 1
             
-            if not contributions and 'contributionsCollection' in user_data:
-                contributions = user_data['contributionsCollection']['contributionCalendar']['totalContributions']
+        user_data = data.get('user')
+        if not user_data:
+            break
             
-            all_repos.extend(nodes)
-            repo_count += len(nodes)
+        repos = user_data.get('repositories', {})
+        nodes = repos.get('nodes', [])
+        
+        if not contributions and 'contributionsCollection' in user_data:
+            contributions = user_data['contributionsCollection']['contributionCalendar']['totalContributions']
+        if cursor is None:
+            profile = {
+                "login": user_data.get('login'),
+                "followers": (user_data.get('followers') or {}).get('totalCount', 0),
+                "public_repos": (user_data.get('publicRepositories') or {}).get('totalCount', 0),
+                "bio": user_data.get('bio'),
+                "location": user_data.get('location'),
+                "company": user_data.get('company')
+            }
+        
+        all_repos.extend(nodes)
+        repo_count += len(nodes)
+        
+        page_info = repos.get('pageInfo', {})
+        if not page_info.get('hasNextPage', False) or not nodes:
+            break
             
-            page_info = repos.get('pageInfo', {})
-            if not page_info.get('hasNextPage', False) or not nodes:
-                break
-                
-            cursor = page_info.get('endCursor')
+        cursor = page_info.get('endCursor')
     
     print(f"Retrieved {len(all_repos)} repositories for {username}")
-    return all_repos, contributions
+    return all_repos, contributions, profile, query_stats
 
-@lru_cache(maxsize=100)
+# Rank data is memoized per username (not per session); a missing rank or an unreachable backend
+# is remembered only briefly
+@async_ttl_cache(
+    "rank-data",
+    key=lambda session, username: username.lower(),
+    ttl=float(os.getenv("RANK_CACHE_TTL", 3600)),
+    negative_ttl=float(os.getenv("RANK_CACHE_NEGATIVE_TTL", 60)),
+    max_size=int(os.getenv("RANK_CACHE_MAX_SIZE", 1024))
+)
 async def get_rank_data_async(session, username):
     url = f"{BACKEND_API_URL}/api/github/rank/{username}"
     async with session.get(url) as response:
@@ -192,22 +366,32 @@ async def get_rank_data_async(session, username):
             return await response.json()
     return None
 
-async def collect_github_information_async(username, max_repos=300):
-    async with aiohttp.ClientSession() as session:
-        repos, contributions = await get_user_repos_batched(session, username, batch_size=50, max_repos=max_repos)
-        rank_data = await get_rank_data_async(session, username)
+async def collect_github_information_async(username, max_repos=300, session=None):
+    """
+    Collects repositories, contributions, rank data and the profile for one user. Pass the
+    app-wide session (http_client) to reuse pooled connections; without one, a short-lived
+    session is opened for the call (e.g. from the CLI).
+    """
+    async with session_scope(session) as session:
+        # Repository pages (which also carry the profile) and rank data are independent round trips
+        start_time = time.perf_counter()
+        timings = {}
+
+        async def timed(coroutine, phase):
+            result = await coroutine
+            timings[phase] = round(time.perf_counter() - start_time, 4)
+            return result
+
+        (repos, contributions, user_profile, query_stats), rank_data = await asyncio.gather(
+            timed(get_user_repos_batched(session, username, batch_size=100, max_repos=max_repos), "graphql_seconds"),
+            timed(get_rank_data_async(session, username), "rank_seconds")
+        )
+        timings["fetch_seconds"] = round(time.perf_counter() - start_time, 4)
         
         if not repos:
             return None
         
-        # Fetch user profile data
-        async with session.get(f"https://api.github.com/users/{username}", headers=HEADERS) as response:
-            if response.status != 200:
-                print(f"Error fetching user profile: {response.status}")
-                user_profile = {}
-            else:
-                user_profile = await response.json()
-        
+        process_start = time.perf_counter()
         # Get language data in parallel for all repos
         languages_batch = {}
         
@@ -253,6 +437,9 @@ async def collect_github_information_async(username, max_repos=300):
             repo_data.append(repo_info)
 
         print("Number of Repos processed: ", len(repo_data))
+        timings["process_seconds"] = round(time.perf_counter() - process_start, 4)
+        fetch_stats = dict(query_stats, **timings)
+        print(f"[DEBUG] GitHub fetch for {username}: {fetch_stats}")
         
         return {
             "github_data": {
@@ -265,10 +452,11 @@ async def collect_github_information_async(username, max_repos=300):
             },
             "repos": repo_data,
             "rank_data": rank_data,
-            "user_profile": user_profile
+            "user_profile": user_profile,
+            "fetch_stats": fetch_stats
         }
 
-async def analyze_github_async(github_link, max_repos=300):
+async def analyze_github_async(github_link, max_repos=300, session=None):
     """
     Improved GitHub analysis that uses:
       - Weighted commit activity (with recency)
@@ -286,13 +474,15 @@ async def analyze_github_async(github_link, max_repos=300):
         print(f"[DEBUG] Extracted username: {username}")
 
         # Collect all GitHub information asynchronously
-        github_information = await collect_github_information_async(username, max_repos=max_repos)
+        github_information = await collect_github_information_async(username, max_repos=max_repos, session=session)
         if not github_information:
             return {"error": "Could not fetch GitHub data."}
+        fetch_stats = github_information.pop('fetch_stats', {})
+        analysis_start = time.perf_counter()
         
-        # Run Gemini analysis in a separate thread to not block async operations
-        with ThreadPoolExecutor() as executor:
-            gemini_future = executor.submit(get_gemini_analysis, github_information)
+        # Run Gemini analysis on the LLM executor; it is awaited after the local scoring below.
+        # It is skipped when too many LLM calls are already pending.
+        gemini_future = submit_llm(get_gemini_analysis, github_information)
         
         # Process repository data while Gemini is running
         repos = github_information['repos']
@@ -306,70 +496,8 @@ async def analyze_github_async(github_link, max_repos=300):
         frontend_points = 0.0
         backend_points = 0.0
         
-        # Process all repositories in parallel using threads
-        def process_repo(repo):
-            repo_name = repo['name']
-            description = repo.get('description') or ""
-            
-            languages_dict = repo.get('languages', {})
-            
-            commit_count = repo.get('commit_count', 0)
-            pushed_at_str = repo.get('last_pushed')
-            recency = datetime.strptime(pushed_at_str, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc) if pushed_at_str else None
-            weight = recency_weight(recency) if recency else 0.5
-            
-            # Base repository score from commit activity and recency
-            repo_score = commit_count * weight
-            
-            # Incorporate repository popularity (stargazerCount)
-            stars = repo.get('stargazerCount', 0)
-            star_multiplier = 1 + (stars / 50)  # Increase score for every 50 stars
-            repo_score *= star_multiplier
-            
-            # Evaluate language distribution based on byte counts
-            total_bytes = sum(languages_dict.values()) if languages_dict else 0
-            if total_bytes > 0:
-                frontend_bytes = 0
-                backend_bytes = 0
-                for lang, byte_count in languages_dict.items():
-                    lang_lower = lang.lower()
-                    if lang_lower == "javascript":
-                        # Split JavaScript equally between frontend and backend
-                        frontend_bytes += byte_count / 2
-                        backend_bytes += byte_count / 2
-                    elif lang_lower in FRONTEND_LANGUAGES:
-                        frontend_bytes += byte_count
-                    elif lang_lower in BACKEND_LANGUAGES:
-                        backend_bytes += byte_count
-                total_relevant = frontend_bytes + backend_bytes
-                if total_relevant > 0:
-                    frontend_ratio = frontend_bytes / total_relevant
-                    backend_ratio = backend_bytes / total_relevant
-                else:
-                    frontend_ratio = 0.5
-                    backend_ratio = 0.5
-            else:
-                # Fallback using description-based classification if no language data is available
-                classification = classify_repo_with_package_json(list(languages_dict.keys()), repo_name, description, username)
-                if classification == "Front End":
-                    frontend_ratio = 1.0
-                    backend_ratio = 0.0
-                elif classification == "Back End":
-                    frontend_ratio = 0.0
-                    backend_ratio = 1.0
-                elif classification == "Full Stack":
-                    frontend_ratio = 0.5
-                    backend_ratio = 0.5
-                else:
-                    frontend_ratio = 0.5
-                    backend_ratio = 0.5
-            
-            # Return points allocated based on the computed ratios
-            return repo_score * frontend_ratio, repo_score * backend_ratio
-        
-        # Process repositories in parallel
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            results = list(executor.map(process_repo, repos))
+        # Score repositories off the event loop (pure CPU work, so one executor task for the batch)
+        results = await run_blocking(PARSE_EXECUTOR, lambda: [score_repo(repo, username) for repo in repos])
         
         # Sum up all points
         for f_points, b_points in results:
@@ -399,7 +527,7 @@ async def analyze_github_async(github_link, max_repos=300):
         print(f"[DEBUG] Final normalized scores - Frontend: {frontend_score}, Backend: {backend_score}")
         
         # Get Gemini analysis results
-        gemini_analysis = gemini_future.result()
+        gemini_analysis = await asyncio.wrap_future(gemini_future) if gemini_future is not None else None
         gemini_frontend, gemini_backend = parse_gemini_github_analysis(gemini_analysis)
         
         if gemini_frontend is not None and gemini_backend is not None:
@@ -410,6 +538,7 @@ async def analyze_github_async(github_link, max_repos=300):
             print(f"[DEBUG] Combined with (fraud) Gemini scores - Frontend: {frontend_score}, Backend: {backend_score}")
         
         print(f"[DEBUG] GitHub Analysis - Frontend: {frontend_score}, Backend: {backend_score}")
+        fetch_stats["analysis_seconds"] = round(time.perf_counter() - analysis_start, 4)
         
         return {
             "backend_score": round(backend_score, 2),
@@ -418,13 +547,28 @@ async def analyze_github_async(github_link, max_repos=300):
             "public_repos": user_profile.get('public_repos', 0),
             "bio": user_profile.get('bio', ''),
             "location": user_profile.get('location', ''),
-            "company": user_profile.get('company', '')
+            "company": user_profile.get('company', ''),
+            "fetch_stats": fetch_stats
         }
         
     except Exception as e:
         print(f"[ERROR] Exception in analyze_github_async: {str(e)}")
         return {"error": str(e)}
 
+async def analyze_github_coalesced(github_link, max_repos=300, session=None):
+    """
+    analyze_github_async, with concurrent calls for the same user merged into one analysis.
+    Usernames are case-insensitive on GitHub, so the key is the lower-cased username and any
+    link form (trailing slash, repo path) for that user shares it.
+    """
+    try:
+        username = extract_username(github_link)
+    except ValueError as e:
+        print(f"[ERROR] Exception in analyze_github_async: {str(e)}")
+        return {"error": str(e)}
+    key = f"{username.lower()}:{max_repos}"
+    return await github_flight.do(key, lambda: analyze_github_async(f"https://github.com/{username}", max_repos, session))
+
 def get_gemini_analysis(github_json):
     prompt = f"""
     Based on the following GitHub profile data and ranking data, analyze the developer's skills in frontend and backend development:
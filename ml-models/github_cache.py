@@ -0,0 +1,157 @@
+# github_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from sqlite_lru import SQLiteLRU
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_cache.sqlite3")
+# GraphQL responses have no validators, so they are reused for a fixed time
+DEFAULT_GRAPHQL_TTL_SECONDS = 6 * 3600
+# REST responses are revalidated with If-None-Match on every use; this only bounds how long an
+# unused validator is kept around
+DEFAULT_REST_MAX_AGE_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+COUNTERS = (
+    "rest_misses", "rest_not_modified", "rest_refreshed", "rest_uncacheable",
+    "graphql_hits", "graphql_misses", "graphql_expired", "evictions"
+)
+
+
+def graphql_key(query: str, variables: dict) -> str:
+    """
+    Stable key for a GraphQL request: whitespace-insensitive query text plus the variables.
+    """
+    normalized = json.dumps({"query": " ".join(query.split()), "variables": variables}, sort_keys=True)
+    return "graphql:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def rest_key(url: str) -> str:
+    return "rest:" + url
+
+
+class GitHubCache:
+    """
+    Persistent SQLite cache of GitHub API responses (JSON bodies).
+      - REST entries store the ETag and are served only after a conditional request comes back
+        304 Not Modified, which GitHub does not count against the rate limit.
+      - GraphQL entries are keyed by graphql_key() and served without a request until graphql_ttl.
+    Past max_entries or max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, graphql_ttl: float = DEFAULT_GRAPHQL_TTL_SECONDS,
+                 rest_max_age: float = DEFAULT_REST_MAX_AGE_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.graphql_ttl = graphql_ttl
+        self.rest_max_age = rest_max_age
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS github_responses_last_access ON github_responses (last_access)")
+        self._lru = SQLiteLRU(self._connection, "github_responses", max_entries, max_bytes, expiry_rules=[
+            ("key LIKE 'graphql:%' AND created_at < ?", graphql_ttl),
+            ("key LIKE 'rest:%' AND last_access < ?", rest_max_age)
+        ])
+
+    def record(self, event: str):
+        with self._lock:
+            self.counts[event] += 1
+
+    def get_rest(self, url: str):
+        """
+        Returns {"etag", "body"} for a stored REST response, or None. The caller must revalidate
+        the ETag before using the body.
+        """
+        key = rest_key(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, body FROM github_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE github_responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        return {"etag": row[0], "body": json.loads(row[1])}
+
+    def put_rest(self, url: str, etag: str, body):
+        self._put(rest_key(url), etag, body)
+
+    def get_graphql(self, key: str):
+        """
+        Returns the stored GraphQL response body for a graphql_key(), or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, created_at FROM github_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counts["graphql_misses"] += 1
+                return None
+            if self.graphql_ttl is not None and now - row[1] > self.graphql_ttl:
+                self._lru.delete(key)
+                self.counts["graphql_expired"] += 1
+                self.counts["graphql_misses"] += 1
+                return None
+            self._connection.execute("UPDATE github_responses SET last_access = ? WHERE key = ?", (now, key))
+            self.counts["graphql_hits"] += 1
+        return json.loads(row[0])
+
+    def put_graphql(self, key: str, body):
+        self._put(key, None, body)
+
+    def _put(self, key: str, etag, body):
+        now = time.time()
+        text = json.dumps(body)
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self.counts["evictions"] += self._lru.insert(
+                "INSERT OR REPLACE INTO github_responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, text, size, now, now),
+                key, size, now
+            )
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT substr(key, 1, instr(key, ':') - 1), COUNT(*), COALESCE(SUM(size), 0) FROM github_responses GROUP BY 1"
+            ).fetchall()
+            counts = dict(self.counts)
+        entries = {kind: count for kind, count, _ in rows}
+        rest_lookups = counts["rest_misses"] + counts["rest_not_modified"] + counts["rest_refreshed"]
+        graphql_lookups = counts["graphql_hits"] + counts["graphql_misses"]
+        return dict(
+            counts,
+            rest_entries=entries.get("rest", 0),
+            graphql_entries=entries.get("graphql", 0),
+            bytes=sum(size for _, _, size in rows),
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+            graphql_ttl_seconds=self.graphql_ttl,
+            rest_not_modified_rate=round(counts["rest_not_modified"] / rest_lookups, 4) if rest_lookups else None,
+            graphql_hit_rate=round(counts["graphql_hits"] / graphql_lookups, 4) if graphql_lookups else None
+        )
@@ -0,0 +1,238 @@
+# github_scheduler.py
+import os
+import time
+import random
+import asyncio
+from datetime import datetime
+from contextlib import asynccontextmanager
+
+# Requests held back per token and resource, so concurrent analyses never drive a budget to zero
+DEFAULT_RESERVE = 20
+# Below this fraction of the limit, requests on a token are spread evenly until its reset
+DEFAULT_PACE_BELOW = 0.1
+# Longest a request may wait for budget before it fails instead
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_BACKOFF_SECONDS = 1.0
+DEFAULT_MAX_BACKOFF_SECONDS = 60.0
+
+
+class GitHubRateLimitError(Exception):
+    """
+    Raised when no token will have budget within the scheduler's max_wait.
+    """
+
+
+def load_tokens() -> list:
+    """
+    Tokens from GITHUB_TOKENS (comma-separated), falling back to GITHUB_TOKEN. Without either,
+    requests are sent unauthenticated.
+    """
+    tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+    return tokens or [None]
+
+
+def remaining_or_full(budget: dict) -> float:
+    return float("inf") if budget["remaining"] is None else budget["remaining"]
+
+
+class TokenState:
+    """
+    What the scheduler knows about one token: the last reported budget per rate limit resource
+    ("core", "graphql", ...), minus requests dispatched since, and when it may be used next.
+    """
+
+    def __init__(self, token, index: int):
+        self.token = token
+        self.name = f"token-{index}" + (f" (...{token[-4:]})" if token else " (anonymous)")
+        self.budgets = {}
+        self.next_slot = {}
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.counts = {"requests": 0, "throttled": 0, "graphql_cost": 0}
+
+    def budget(self, resource: str) -> dict:
+        return self.budgets.setdefault(resource, {"limit": None, "remaining": None, "reset": None})
+
+    def ready_at(self, resource: str, reserve: int, now: float) -> float:
+        ready = max(now, self.blocked_until, self.next_slot.get(resource, 0.0))
+        budget = self.budget(resource)
+        if budget["remaining"] is not None and budget["remaining"] <= reserve and budget["reset"] is not None:
+            ready = max(ready, budget["reset"])
+        return ready
+
+
+class GitHubScheduler:
+    """
+    Sits in front of every GitHub API call. It rotates requests across a pool of tokens, reading
+    X-RateLimit-* headers (and the GraphQL rateLimit object) to track each token's budget per
+    resource. Requests are queued while no token has budget, and spread evenly until the reset once
+    a token runs low. Primary and secondary rate limit responses (403/429, Retry-After) block the
+    token and the request is retried on the next available one with jittered exponential backoff.
+    Budget times are wall-clock epoch seconds, as GitHub reports them.
+    """
+
+    def __init__(self, tokens: list = None, reserve: int = DEFAULT_RESERVE, pace_below: float = DEFAULT_PACE_BELOW,
+                 max_wait: float = DEFAULT_MAX_WAIT_SECONDS, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_backoff: float = DEFAULT_BASE_BACKOFF_SECONDS, max_backoff: float = DEFAULT_MAX_BACKOFF_SECONDS):
+        self.tokens = [TokenState(token, index) for index, token in enumerate(tokens or load_tokens(), start=1)]
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.waiting = 0
+        self.counts = {
+            "requests": 0, "queued": 0, "waited_seconds": 0.0, "retries": 0,
+            "primary_limits": 0, "secondary_limits": 0, "gave_up": 0
+        }
+
+    async def acquire(self, resource: str) -> TokenState:
+        """
+        Waits until some token may send a request for resource and reserves one request on it.
+        """
+        started = time.time()
+        queued = False
+        while True:
+            now = time.time()
+            # Earliest available first, then most remaining budget (unknown counts as full), then least busy
+            token = min(self.tokens, key=lambda state: (state.ready_at(resource, self.reserve, now),
+                                                        -remaining_or_full(state.budget(resource)), state.in_flight))
+            ready = token.ready_at(resource, self.reserve, now)
+            if ready <= now:
+                break
+            if ready - started > self.max_wait:
+                self.counts["gave_up"] += 1
+                raise GitHubRateLimitError(f"GitHub {resource} rate limit exhausted on all {len(self.tokens)} token(s); "
+                                           f"next budget in {round(ready - now)}s")
+            if not queued:
+                queued = True
+                self.counts["queued"] += 1
+                self.waiting += 1
+            try:
+                await asyncio.sleep(ready - now)
+            except asyncio.CancelledError:
+                self.waiting -= 1
+                raise
+        if queued:
+            self.waiting -= 1
+            self.counts["waited_seconds"] += time.time() - started
+
+        budget = token.budget(resource)
+        if budget["remaining"] is not None:
+            budget["remaining"] -= 1
+            # Running low: spread what is left evenly over the time until the reset
+            if budget["limit"] and budget["reset"] and budget["remaining"] < budget["limit"] * self.pace_below:
+                spare = max(budget["remaining"] - self.reserve, 1)
+                token.next_slot[resource] = now + max(budget["reset"] - now, 0) / spare
+        token.in_flight += 1
+        token.counts["requests"] += 1
+        self.counts["requests"] += 1
+        return token
+
+    def record_headers(self, token: TokenState, headers, default_resource: str):
+        """
+        Updates a token's budget from X-RateLimit-* response headers.
+        """
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        budget = token.budget(headers.get("X-RateLimit-Resource", default_resource))
+        try:
+            budget["remaining"] = int(headers["X-RateLimit-Remaining"])
+            budget["limit"] = int(headers.get("X-RateLimit-Limit", budget["limit"] or 0)) or None
+            if "X-RateLimit-Reset" in headers:
+                budget["reset"] = float(headers["X-RateLimit-Reset"])
+        except ValueError:
+            pass
+
+    def record_graphql(self, token: TokenState, rate_limit: dict):
+        """
+        Updates a token's GraphQL budget from a query's rateLimit { cost remaining resetAt } object.
+        """
+        if not rate_limit:
+            return
+        budget = token.budget("graphql")
+        token.counts["graphql_cost"] += rate_limit.get("cost") or 0
+        if rate_limit.get("remaining") is not None:
+            budget["remaining"] = rate_limit["remaining"]
+        if rate_limit.get("limit") is not None:
+            budget["limit"] = rate_limit["limit"]
+        if rate_limit.get("resetAt"):
+            budget["reset"] = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+
+    def throttle_delay(self, token: TokenState, response, attempt: int):
+        """
+        For a rate limited response, blocks the token and returns how long it is blocked;
+        returns None for any other response.
+        """
+        if response.status not in (403, 429):
+            return None
+        now = time.time()
+        retry_after = response.headers.get("Retry-After")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and not retry_after:
+            # Primary limit: the token is unusable until its reset
+            self.counts["primary_limits"] += 1
+            reset = float(response.headers.get("X-RateLimit-Reset", now + self.max_backoff))
+            delay = max(reset - now, 0) + random.uniform(0, 1)
+        elif retry_after or response.status == 429:
+            # Secondary limit: wait as told, or back off exponentially, with jitter either way
+            self.counts["secondary_limits"] += 1
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+            delay = (float(retry_after) if retry_after and retry_after.isdigit() else backoff) + random.uniform(0, backoff)
+        else:
+            # A plain 403 (permissions, blocked resource) is not a rate limit
+            return None
+        token.counts["throttled"] += 1
+        token.blocked_until = max(token.blocked_until, now + delay)
+        return delay
+
+    @asynccontextmanager
+    async def request(self, session, method: str, url: str, resource: str = "core", headers: dict = None, **kwargs):
+        """
+        Sends one GitHub API request through the scheduler and yields (response, token). Rate
+        limited responses are retried up to max_retries times on the next available token; after
+        that the last response is yielded as-is.
+        """
+        attempt = 0
+        while True:
+            token = await self.acquire(resource)
+            request_headers = dict(headers or {})
+            if token.token:
+                request_headers["Authorization"] = f"Bearer {token.token}"
+            try:
+                async with session.request(method, url, headers=request_headers, **kwargs) as response:
+                    self.record_headers(token, response.headers, resource)
+                    delay = self.throttle_delay(token, response, attempt)
+                    if delay is None or attempt >= self.max_retries:
+                        yield response, token
+                        return
+                    print(f"[DEBUG] GitHub rate limited {token.name} ({response.status}); retrying, token blocked for {delay:.1f}s")
+            finally:
+                token.in_flight -= 1
+            attempt += 1
+            self.counts["retries"] += 1
+
+    def stats(self) -> dict:
+        now = time.time()
+        tokens = []
+        for token in self.tokens:
+            tokens.append(dict(
+                token.counts,
+                name=token.name,
+                in_flight=token.in_flight,
+                blocked_for_seconds=round(max(token.blocked_until - now, 0), 1),
+                budgets={
+                    resource: {
+                        "limit": budget["limit"],
+                        "remaining": budget["remaining"],
+                        "resets_in_seconds": round(max(budget["reset"] - now, 0)) if budget["reset"] else None,
+                        "next_slot_in_seconds": round(max(token.next_slot.get(resource, 0) - now, 0), 3)
+                    }
+                    for resource, budget in token.budgets.items()
+                }
+            ))
+        return dict(self.counts, waited_seconds=round(self.counts["waited_seconds"], 3), waiting=self.waiting,
+                    reserve=self.reserve, tokens=tokens)
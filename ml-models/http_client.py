@@ -0,0 +1,131 @@
+# http_client.py
+import os
+import asyncio
+import aiohttp
+from contextlib import asynccontextmanager
+
+# Connection pool and timeout settings for outbound calls (GitHub API, backend rank endpoint)
+POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", 100))
+POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 20))
+KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", 30))
+DNS_CACHE_SECONDS = int(os.getenv("HTTP_DNS_CACHE_SECONDS", 300))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 20))
+TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", 30))
+
+
+class HTTPClient:
+    """
+    Owns one aiohttp.ClientSession for the lifetime of the app, so TCP/TLS connections and DNS
+    lookups are reused across requests instead of being paid per analysis. A TraceConfig counts
+    new versus reused connections per host.
+
+    start()/close() are called from the FastAPI lifespan; session() also creates the session on
+    first use (and again if the event loop changed), for callers running without the lifespan.
+    """
+
+    def __init__(self, limit: int = POOL_LIMIT, limit_per_host: int = POOL_LIMIT_PER_HOST,
+                 keepalive_timeout: float = KEEPALIVE_SECONDS, dns_cache_ttl: int = DNS_CACHE_SECONDS,
+                 connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 total_timeout: float = TOTAL_TIMEOUT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout)
+        self.counts = {
+            "requests": 0, "request_errors": 0, "connections_created": 0, "connections_reused": 0,
+            "dns_resolutions": 0, "dns_cache_hits": 0, "sessions_created": 0
+        }
+        self.hosts = {}
+        self._session = None
+        self._loop = None
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def count(name: str, host: str = None):
+            self.counts[name] += 1
+            if host is not None:
+                host_counts = self.hosts.setdefault(host, {"requests": 0, "connections_created": 0, "connections_reused": 0})
+                host_counts[name] += 1
+
+        async def on_request_start(session, context, params):
+            context.host = params.url.host
+            count("requests", context.host)
+
+        async def on_request_exception(session, context, params):
+            count("request_errors")
+
+        async def on_connection_create_end(session, context, params):
+            count("connections_created", getattr(context, "host", None))
+
+        async def on_connection_reuseconn(session, context, params):
+            count("connections_reused", getattr(context, "host", None))
+
+        async def on_dns_resolvehost_end(session, context, params):
+            count("dns_resolutions")
+
+        async def on_dns_cache_hit(session, context, params):
+            count("dns_cache_hits")
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        return trace_config
+
+    async def start(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[self._trace_config()])
+        self._loop = asyncio.get_running_loop()
+        self.counts["sessions_created"] += 1
+        print(f"[DEBUG] HTTP client started (limit {self.limit}, per host {self.limit_per_host})")
+        return self._session
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed or self._loop is not asyncio.get_running_loop():
+            return await self.start()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        connections = self.counts["connections_created"] + self.counts["connections_reused"]
+        return dict(
+            self.counts,
+            open=self._session is not None and not self._session.closed,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_seconds=self.keepalive_timeout,
+            connection_reuse_rate=round(self.counts["connections_reused"] / connections, 4) if connections else None,
+            hosts={host: dict(counts) for host, counts in self.hosts.items()}
+        )
+
+
+@asynccontextmanager
+async def session_scope(session: aiohttp.ClientSession = None):
+    """
+    Yields the given session untouched, or a short-lived session closed on exit when none is given.
+    """
+    if session is not None:
+        yield session
+        return
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=TOTAL_TIMEOUT)) as session:
+        yield session
+
+
+# Shared by the API; started and closed by the FastAPI lifespan in main.py
+http_client = HTTPClient()
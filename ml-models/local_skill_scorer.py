@@ -0,0 +1,80 @@
+# local_skill_scorer.py
+# Deterministic, network-free frontend/backend scoring of resume text. Used as the fallback tier
+# when Gemini is over its latency budget or its circuit breaker is open.
+import re
+import math
+from skill_vocabulary import FRONTEND_KEYWORDS, BACKEND_KEYWORDS
+
+# Every keyword in the shared vocabularies counts once for its side ...
+SKILL_TERMS = {keyword: (1.0, 0.0) for keyword in FRONTEND_KEYWORDS}
+SKILL_TERMS.update({keyword: (0.0, 1.0) for keyword in BACKEND_KEYWORDS})
+
+# ... and the weighted dictionary adds specific technologies as (frontend weight, backend weight).
+# Concrete frameworks and tools weigh more than generic words like "ui" or "api".
+SKILL_TERMS.update({
+    "react": (3.0, 0.0), "react.js": (3.0, 0.0), "reactjs": (3.0, 0.0), "next.js": (3.0, 1.0), "nextjs": (3.0, 1.0),
+    "vue": (3.0, 0.0), "vue.js": (3.0, 0.0), "nuxt": (2.5, 0.5), "angular": (3.0, 0.0), "svelte": (3.0, 0.0),
+    "redux": (2.0, 0.0), "zustand": (1.5, 0.0), "jquery": (1.0, 0.0), "typescript": (1.5, 1.0), "javascript": (1.5, 1.0),
+    "html": (1.0, 0.0), "html5": (1.0, 0.0), "css": (1.0, 0.0), "css3": (1.0, 0.0), "sass": (1.5, 0.0), "scss": (1.5, 0.0),
+    "tailwind": (2.0, 0.0), "tailwindcss": (2.0, 0.0), "bootstrap": (1.0, 0.0), "material ui": (1.5, 0.0), "mui": (1.5, 0.0),
+    "webpack": (2.0, 0.0), "vite": (1.5, 0.0), "babel": (1.0, 0.0), "figma": (1.0, 0.0), "responsive design": (1.5, 0.0),
+    "accessibility": (1.5, 0.0), "storybook": (1.5, 0.0), "jest": (1.0, 0.5), "cypress": (1.5, 0.0), "react native": (2.5, 0.0),
+    "flutter": (2.0, 0.0), "three.js": (2.0, 0.0), "frontend": (1.5, 0.0), "front-end": (1.5, 0.0), "front end": (1.5, 0.0),
+    "node": (0.0, 2.5), "node.js": (0.0, 3.0), "nodejs": (0.0, 3.0), "express": (0.0, 2.5), "express.js": (0.0, 2.5),
+    "nestjs": (0.0, 3.0), "django": (0.0, 3.0), "flask": (0.0, 2.5), "fastapi": (0.0, 3.0), "spring": (0.0, 2.5),
+    "spring boot": (0.0, 3.0), "rails": (0.0, 2.5), "laravel": (0.0, 2.5), "asp.net": (0.0, 2.5), "graphql": (1.0, 2.0),
+    "rest": (0.0, 1.0), "rest api": (0.0, 2.0), "restful": (0.0, 2.0), "grpc": (0.0, 2.5), "websocket": (1.0, 1.5),
+    "sql": (0.0, 1.5), "mysql": (0.0, 2.0), "postgres": (0.0, 2.0), "postgresql": (0.0, 2.0), "sqlite": (0.0, 1.0),
+    "mongodb": (0.0, 2.0), "redis": (0.0, 2.5), "elasticsearch": (0.0, 2.5), "kafka": (0.0, 3.0), "rabbitmq": (0.0, 2.5),
+    "docker": (0.0, 2.0), "kubernetes": (0.0, 3.0), "aws": (0.0, 2.0), "gcp": (0.0, 2.0), "azure": (0.0, 2.0),
+    "terraform": (0.0, 2.0), "ci/cd": (0.5, 1.5), "microservices": (0.0, 3.0), "microservice": (0.0, 3.0),
+    "python": (0.0, 1.5), "java": (0.0, 1.5), "go": (0.0, 1.0), "golang": (0.0, 2.0), "rust": (0.0, 1.5), "php": (0.0, 1.5),
+    "ruby": (0.0, 1.5), "c#": (0.0, 1.5), "c++": (0.0, 1.0), "authentication": (0.0, 1.5), "oauth": (0.0, 1.5), "jwt": (0.0, 1.5),
+    "backend": (0.0, 1.5), "back-end": (0.0, 1.5), "back end": (0.0, 1.5), "full stack": (1.5, 1.5), "full-stack": (1.5, 1.5),
+})
+
+# One alternation over every term, longest first so "node.js" wins over "node". Terms may contain
+# regex metacharacters ("c++", "ci/cd"), and are matched only between non-alphanumeric boundaries,
+# so "ui" does not fire inside "build" and "go" does not fire inside "google".
+TERM_PATTERN = re.compile(
+    r"(?<![a-z0-9])(" + "|".join(re.escape(term) for term in sorted(SKILL_TERMS, key=len, reverse=True)) + r")(?![a-z0-9])"
+)
+
+# Repeated mentions add log-diminishing evidence; points map to 0-100 as 100 * (1 - exp(-points / SCALE))
+POINTS_SCALE = 25.0
+MAX_SCORE = 95
+
+
+def match_terms(text: str) -> dict:
+    """
+    Counts occurrences of each skill term in the text (case-insensitive).
+    """
+    counts = {}
+    for match in TERM_PATTERN.finditer(text.lower()):
+        term = match.group(1)
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def score_text(text: str) -> dict:
+    """
+    Returns {"frontend_score", "backend_score", "matched_terms"} for resume text.
+    Scores are integers in 0-MAX_SCORE, like the Gemini scores they stand in for.
+    """
+    counts = match_terms(text or "")
+    frontend_points = 0.0
+    backend_points = 0.0
+    for term, count in counts.items():
+        frontend_weight, backend_weight = SKILL_TERMS[term]
+        evidence = math.log2(1 + count)
+        frontend_points += frontend_weight * evidence
+        backend_points += backend_weight * evidence
+
+    def to_score(points):
+        return int(round(min(100 * (1 - math.exp(-points / POINTS_SCALE)), MAX_SCORE)))
+
+    return {
+        "frontend_score": to_score(frontend_points),
+        "backend_score": to_score(backend_points),
+        "matched_terms": counts
+    }
@@ -1,21 +1,180 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import uvicorn
 import os
 import json
+import time
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from Resume_github_score import analyze_resume, analyze_github
-from Eq_score import calculate_eq_score
-from match_score import MatchScoreCalculator
+from resume_analysis import resume_cache, detect_format, analyze_resume_coalesced, resume_flight, llm_breaker, LLM_LATENCY_BUDGET
+from github_analysis import analyze_github_coalesced, github_flight, github_cache, github_scheduler, get_rank_data_async
+from http_client import http_client
+from questionnaire_registry import QuestionnaireRegistry, DEFAULT_QUESTIONNAIRE_DIR
+from calculator_registry import CalculatorRegistry, UnknownProfileError
+from match_matrix import MatchMatrixEngine
+from match_store import MatchStore, DEFAULT_STORE_DIR
+from executors import PARSE_EXECUTOR, run_blocking, llm_stats
+from match_stream import ChunkedMatchScorer, DEFAULT_CHUNK_SIZE
+from team_partition import TeamPartitioner
+from team_fitness import TeamFitnessScorer, teams_to_array
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP session for all GitHub and backend calls, so connections are reused across requests
+    await http_client.start()
+    try:
+        yield
+    finally:
+        await http_client.close()
+        # Checkpoint the match store so the next start has no journal to replay
+        match_store.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# "compiled" (lookup tables, default) or "scalar" (reference implementation)
+MATCH_SCORE_MODE = os.getenv("MATCH_SCORE_MODE", "compiled")
+
+# Calculators are cached per weight vector instead of rebuilt per request
+calculator_registry = CalculatorRegistry(
+    mode=MATCH_SCORE_MODE,
+    max_size=int(os.getenv("CALCULATOR_CACHE_SIZE", "32"))
+)
+
+# Initialize the default calculator once so the first request is already a cache hit
+match_calculator = calculator_registry.get()
+
+# Versioned EQ questionnaires: eq v1 is built from Eq_score, further versions come from files
+# that are picked up without a restart
+questionnaire_registry = QuestionnaireRegistry(
+    directory=os.getenv("QUESTIONNAIRE_DIR", DEFAULT_QUESTIONNAIRE_DIR),
+    auto_reload=os.getenv("QUESTIONNAIRE_AUTO_RELOAD", "true").lower() != "false"
+)
+
+# Persistent match scores (default weights) of candidates analyzed with a candidate_id
+match_store = MatchStore(
+    os.getenv("MATCH_STORE_DIR", DEFAULT_STORE_DIR),
+    calculator=match_calculator,
+    top_k=int(os.getenv("MATCH_STORE_TOP_K", "10"))
+)
+
+
+def get_calculator(weights: dict = None, weight_profile: str = None):
+    """
+    Resolves the calculator for a match request from a weight profile ID or inline weights.
+    """
+    try:
+        return calculator_registry.resolve(weights, weight_profile)
+    except UnknownProfileError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/weight-profiles")
+async def register_weight_profile(
+    profile_id: str = Body(..., example="balanced", description="Profile ID referenced by match requests"),
+    weights: dict = Body(
+        ...,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Weights for each parameter"
+    )
+):
+    try:
+        profile_weights = calculator_registry.register_profile(profile_id, weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Warm the cache so the first match request using the profile is a hit
+    calculator_registry.get(profile_weights)
+    return {"profile_id": profile_id, "weights": profile_weights}
+
+
+@app.get("/weight-profiles")
+async def list_weight_profiles():
+    return {"profiles": calculator_registry.list_profiles()}
 
 
-# Initialize the calculator once as a global variable
-match_calculator = MatchScoreCalculator()
+@app.get("/calculator-cache/stats")
+async def calculator_cache_stats():
+    return calculator_registry.stats()
+
+
+@app.get("/resume-cache/stats")
+async def resume_cache_stats():
+    return resume_cache.stats()
+
+
+@app.get("/github-cache/stats")
+async def github_cache_stats():
+    return github_cache.stats()
+
+
+@app.get("/github-rate-limits")
+async def github_rate_limits():
+    return github_scheduler.stats()
+
+
+@app.get("/http-client/stats")
+async def http_client_stats():
+    return http_client.stats()
+
+
+@app.get("/rank-cache/stats")
+async def rank_cache_stats():
+    return get_rank_data_async.cache.stats()
+
+
+@app.get("/resume-scoring/stats")
+async def resume_scoring_stats():
+    return {"latency_budget_seconds": LLM_LATENCY_BUDGET, "circuit_breaker": llm_breaker.stats(), "llm_executor": llm_stats()}
+
+
+@app.get("/single-flight/stats")
+async def single_flight_stats():
+    return {"resume": resume_flight.stats(), "github": github_flight.stats()}
+
+
+@app.get("/match-store/stats")
+async def match_store_stats():
+    return match_store.stats()
+
+
+@app.get("/match-store/{candidate_id}/top-matches")
+async def get_stored_top_matches(candidate_id: str):
+    """
+    Best partners of an analyzed candidate, read from the persistent match store.
+    """
+    try:
+        matches = match_store.get_top_k(candidate_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} is not in the match store")
+    return {
+        "candidate_id": candidate_id,
+        "matches": [{"candidate_id": partner, "match_score": score} for partner, score in matches],
+        "weights_used": match_store.calculator.weights
+    }
+
+
+@app.delete("/match-store/{candidate_id}")
+async def delete_stored_candidate(candidate_id: str):
+    try:
+        await run_blocking(PARSE_EXECUTOR, match_store.remove, candidate_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Candidate {candidate_id} is not in the match store")
+    return {"candidate_id": candidate_id, "removed": True}
+
 
 @app.post("/calculate-match")
 async def calculate_match(
@@ -45,12 +204,15 @@ async def calculate_match(
             "eq": 0.25
         },
         description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
     )
 ):
+    calculator = get_calculator(weights, weight_profile)
     try:
-        # Create a new calculator with custom weights if provided
-        calculator = MatchScoreCalculator(weights) if weights else match_calculator
-        
         # Calculate the match score
         match_score = calculator.calculate_combined_score(
             candidate1_scores,
@@ -69,6 +231,424 @@ async def calculate_match(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/calculate-match-batch")
+async def calculate_match_batch(
+    anchor_scores: dict = Body(
+        ...,
+        example={
+            "frontend": 90,
+            "backend": 20,
+            "eq": 50
+        },
+        description="Scores of the candidate everyone is matched against"
+    ),
+    candidates_scores: list = Body(
+        ...,
+        example=[
+            {"id": "friend-1", "frontend": 20, "backend": 90, "eq": 50},
+            {"id": "friend-2", "frontend": 60, "backend": 60, "eq": 70}
+        ],
+        description="Scores of the N candidates to match against the anchor"
+    ),
+    weights: dict = Body(
+        None,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
+    )
+):
+    calculator = get_calculator(weights, weight_profile)
+    try:
+        # One vectorized pass instead of N calls to calculate_combined_score
+        match_scores = calculator.calculate_batch_scores(anchor_scores, candidates_scores)
+
+        return {
+            "match_scores": match_scores.tolist(),
+            "candidate_ids": [candidate.get("id") for candidate in candidates_scores],
+            "anchor_scores": anchor_scores,
+            "weights_used": calculator.weights
+        }
+
+    except Exception as e:
+        print(f"Error in calculate_match_batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/calculate-match-batch/stream")
+async def calculate_match_batch_stream(
+    anchor_scores: dict = Body(
+        ...,
+        example={
+            "frontend": 90,
+            "backend": 20,
+            "eq": 50
+        },
+        description="Scores of the candidate everyone is matched against"
+    ),
+    candidates_scores: list = Body(
+        ...,
+        example=[
+            {"id": "friend-1", "frontend": 20, "backend": 90, "eq": 50},
+            {"id": "friend-2", "frontend": 60, "backend": 60, "eq": 70}
+        ],
+        description="Scores of the N candidates to match against the anchor"
+    ),
+    weights: dict = Body(
+        None,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
+    ),
+    output_format: str = Body("ndjson", example="ndjson", description='"ndjson" or "float32" (raw little-endian scores in input order)'),
+    chunk_size: int = Body(DEFAULT_CHUNK_SIZE, example=4096, description="Candidates scored per chunk"),
+    min_score: float = Body(None, example=60, description="Only stream candidates scoring at least this much"),
+    top_k: int = Body(None, example=50, description="Only stream the k best candidates, sent after the last chunk")
+):
+    calculator = get_calculator(weights, weight_profile)
+    if output_format not in ("ndjson", "float32"):
+        raise HTTPException(status_code=400, detail="output_format must be 'ndjson' or 'float32'")
+    if output_format == "float32" and (min_score is not None or top_k is not None):
+        raise HTTPException(status_code=400, detail="min_score and top_k are only supported with ndjson output")
+    try:
+        scorer = ChunkedMatchScorer(calculator, anchor_scores, candidates_scores, chunk_size=chunk_size)
+    except Exception as e:
+        print(f"Error in calculate_match_batch_stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if output_format == "float32":
+        return StreamingResponse(scorer.iter_float32(), media_type="application/octet-stream")
+    return StreamingResponse(scorer.iter_ndjson(min_score=min_score, top_k=top_k), media_type="application/x-ndjson")
+
+
+# The dense matrix response grows with N^2 (about 9 MB of JSON at 1000 candidates); larger pools must use top_k
+MAX_DENSE_MATRIX_CANDIDATES = int(os.getenv("MAX_DENSE_MATRIX_CANDIDATES", 1000))
+
+
+# Plain def: FastAPI runs it in its threadpool, so building the matrix does not block the event loop
+@app.post("/calculate-match-matrix")
+def calculate_match_matrix(
+    candidates_scores: list = Body(
+        ...,
+        example=[
+            {"id": "user-1", "frontend": 90, "backend": 20, "eq": 50},
+            {"id": "user-2", "frontend": 20, "backend": 90, "eq": 50},
+            {"id": "user-3", "frontend": 60, "backend": 60, "eq": 70}
+        ],
+        description="Scores of every candidate in the pool"
+    ),
+    top_k: int = Body(
+        None,
+        example=5,
+        description="If set, return each candidate's top-k partners instead of the full matrix"
+    ),
+    anchor_ids: list = Body(
+        None,
+        example=["user-1"],
+        description="With top_k, only return the top-k partners of these candidates"
+    ),
+    weights: dict = Body(
+        None,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
+    )
+):
+    calculator = get_calculator(weights, weight_profile)
+    if top_k is None and len(candidates_scores) > MAX_DENSE_MATRIX_CANDIDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The full matrix is limited to {MAX_DENSE_MATRIX_CANDIDATES} candidates; pass top_k for larger pools"
+        )
+    candidate_ids = [candidate.get("id") for candidate in candidates_scores]
+    if anchor_ids is not None:
+        if top_k is None:
+            raise HTTPException(status_code=400, detail="anchor_ids requires top_k")
+        positions = {}
+        for position, candidate_id in enumerate(candidate_ids):
+            positions.setdefault(candidate_id, position)
+        unknown = [anchor_id for anchor_id in anchor_ids if anchor_id not in positions]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown anchor_ids: {unknown}")
+        anchor_indices = [positions[anchor_id] for anchor_id in anchor_ids]
+    try:
+        engine = MatchMatrixEngine.from_candidates(candidates_scores, calculator=calculator)
+        if anchor_ids is not None:
+            # A few anchors: only their rows of the matrix are scored
+            indices, scores = engine.top_k_for(anchor_indices, top_k)
+            return {
+                "candidate_ids": candidate_ids,
+                "anchor_indices": anchor_indices,
+                "top_k_indices": indices.tolist(),
+                "top_k_scores": scores.tolist(),
+                "weights_used": calculator.weights
+            }
+
+        if top_k is not None:
+            indices, scores = engine.top_k(top_k)
+            return {
+                "candidate_ids": candidate_ids,
+                "top_k_indices": indices.tolist(),
+                "top_k_scores": scores.tolist(),
+                "weights_used": calculator.weights
+            }
+
+        return {
+            "candidate_ids": candidate_ids,
+            "match_matrix": engine.compute_matrix().tolist(),
+            "weights_used": calculator.weights
+        }
+
+    except Exception as e:
+        print(f"Error in calculate_match_matrix: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Upper bound on the time a single /form-teams request may ask for (matrix build plus local search)
+MAX_TEAM_TIME_BUDGET = float(os.getenv("MAX_TEAM_TIME_BUDGET", 10.0))
+# Team formation works on the dense N x N float32 matrix (about 100 MB at 5000 candidates)
+MAX_TEAM_CANDIDATES = int(os.getenv("MAX_TEAM_CANDIDATES", 5000))
+
+
+# Plain def: the matrix build and local search run in FastAPI's threadpool, off the event loop
+@app.post("/form-teams")
+def form_teams(
+    candidates_scores: list = Body(
+        ...,
+        example=[
+            {"id": "user-1", "frontend": 90, "backend": 20, "eq": 50},
+            {"id": "user-2", "frontend": 20, "backend": 90, "eq": 50},
+            {"id": "user-3", "frontend": 60, "backend": 60, "eq": 70},
+            {"id": "user-4", "frontend": 40, "backend": 75, "eq": 65}
+        ],
+        description="Scores of every candidate registered for the competition"
+    ),
+    team_size: int = Body(..., example=4, description="Target team size"),
+    time_budget: float = Body(2.0, example=2.0, description="Time budget in seconds, matrix build included (capped server-side)"),
+    seed: int = Body(None, example=42, description="Optional random seed for reproducible teams"),
+    weights: dict = Body(
+        None,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
+    )
+):
+    calculator = get_calculator(weights, weight_profile)
+    if team_size < 1:
+        raise HTTPException(status_code=400, detail="team_size must be at least 1")
+    if len(candidates_scores) > MAX_TEAM_CANDIDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Team formation is limited to {MAX_TEAM_CANDIDATES} candidates"
+        )
+    time_budget = min(max(time_budget, 0.0), MAX_TEAM_TIME_BUDGET)
+    try:
+        start_time = time.perf_counter()
+        engine = MatchMatrixEngine.from_candidates(candidates_scores, calculator=calculator)
+        score_matrix = engine.compute_matrix()
+        matrix_seconds = time.perf_counter() - start_time
+
+        # The local search gets whatever the matrix build left of the budget
+        search_budget = max(time_budget - matrix_seconds, 0.0)
+        result = TeamPartitioner(score_matrix, team_size, time_budget=search_budget, seed=seed).solve()
+        result["stats"]["matrix_seconds"] = round(matrix_seconds, 4)
+
+        candidate_ids = [candidate.get("id", index) for index, candidate in enumerate(candidates_scores)]
+        result["teams"] = [[candidate_ids[member] for member in team] for team in result["teams"]]
+        result["weights_used"] = calculator.weights
+        return result
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in form_teams: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/calculate-team-fitness")
+async def calculate_team_fitness(
+    teams: list = Body(
+        ...,
+        example=[
+            [
+                {"frontend": 90, "backend": 20, "eq": 50},
+                {"frontend": 20, "backend": 90, "eq": 60},
+                {"frontend": 60, "backend": 60, "eq": 70}
+            ],
+            [
+                {"frontend": 40, "backend": 40, "eq": 30},
+                {"frontend": 45, "backend": 35, "eq": 90}
+            ]
+        ],
+        description="Teams to score, each a list of member scores"
+    ),
+    fitness_weights: dict = Body(
+        None,
+        example={
+            "pairwise": 0.5,
+            "coverage": 0.3,
+            "eq": 0.2
+        },
+        description="Optional weights of the pairwise, coverage and EQ components"
+    ),
+    weights: dict = Body(
+        None,
+        example={
+            "frontend": 0.375,
+            "backend": 0.375,
+            "eq": 0.25
+        },
+        description="Optional custom weights for each parameter"
+    ),
+    weight_profile: str = Body(
+        None,
+        example="balanced",
+        description="Optional ID of a registered weight profile (overrides weights)"
+    )
+):
+    calculator = get_calculator(weights, weight_profile)
+    try:
+        team_array, member_mask = teams_to_array(teams)
+        result = TeamFitnessScorer(calculator, fitness_weights).score(team_array, member_mask)
+
+        return {
+            "team_fitness": result["fitness"].tolist(),
+            "components": {name: values.tolist() for name, values in result.items() if name != "fitness"},
+            "weights_used": calculator.weights
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in calculate_team_fitness: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/questionnaires")
+async def list_questionnaires():
+    return {"questionnaires": questionnaire_registry.list(), "errors": questionnaire_registry.errors}
+
+
+@app.post("/questionnaires/reload")
+async def reload_questionnaires(
+    force: bool = Body(False, embed=True, description="Reload every file, not only new or modified ones")
+):
+    try:
+        return questionnaire_registry.reload(force=force)
+    except Exception as e:
+        print(f"Error in reload_questionnaires: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def get_questionnaire(name: str, version: str = None):
+    try:
+        return questionnaire_registry.get(name, version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@app.post("/calculate-eq-batch")
+async def calculate_eq_batch(
+    answers: list = Body(
+        ...,
+        example=[
+            {"Q1": 3, "Q2": 2, "Q3": 4, "Q4": 1},
+            [2, 3, 3, 4]
+        ],
+        description="EQ answers per user: a {question: choice} dict or a list of choices in question order"
+    ),
+    questionnaire: str = Body("eq", example="eq", description="Questionnaire name"),
+    version: str = Body(None, example="1", description="Questionnaire version (latest when omitted)")
+):
+    eq_questionnaire = get_questionnaire(questionnaire, version)
+    try:
+        answer_matrix = [
+            [row[q] for q in eq_questionnaire.question_keys] if isinstance(row, dict) else row
+            for row in answers
+        ]
+
+        breakdowns, final_scores = eq_questionnaire.score_batch(answer_matrix)
+
+        return {
+            "questionnaire": eq_questionnaire.name,
+            "version": eq_questionnaire.version,
+            "questions": eq_questionnaire.question_keys,
+            "parameters": eq_questionnaire.parameters,
+            "breakdowns": breakdowns.tolist(),
+            "final_eq_scores": final_scores.tolist()
+        }
+
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in calculate_eq_batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Uploads larger than this are rejected with 413; smaller ones stay in memory up to RESUME_SPOOL_BYTES
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", 10 * 1024 * 1024))
+RESUME_SPOOL_BYTES = int(os.getenv("RESUME_SPOOL_BYTES", 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+async def read_upload(upload: UploadFile, max_bytes: int = MAX_RESUME_BYTES):
+    """
+    Copies an upload in chunks into a per-request SpooledTemporaryFile, enforcing max_bytes.
+    Each request gets its own buffer, so concurrent analyses never share a file.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Resume is larger than {max_bytes} bytes")
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=RESUME_SPOOL_BYTES)
+    size = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            buffer.close()
+            raise HTTPException(status_code=413, detail=f"Resume is larger than {max_bytes} bytes")
+        buffer.write(chunk)
+
+    if size == 0:
+        buffer.close()
+        raise HTTPException(status_code=400, detail="Resume file is empty")
+    buffer.seek(0)
+    return buffer
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Adjust for production
@@ -85,30 +665,42 @@ async def analyze_candidate(
         None,
         example='{ "Q1": 3, "Q2": 2, "Q3": 4, "Q4": 1 }',
         description="JSON string with EQ answers"
+    ),
+    eq_version: str = Form(None, example="1", description="EQ questionnaire version (latest when omitted)"),
+    candidate_id: str = Form(
+        None,
+        example="user-1",
+        description="If set, the final scores are stored in the match store under this ID"
     )
 ):
+    resume_buffer = await read_upload(resume)
+    try:
+        detect_format(resume_buffer)
+    except ValueError as e:
+        resume_buffer.close()
+        raise HTTPException(status_code=415, detail=str(e))
+
     try:
         print("\n[DEBUG] Starting candidate analysis")
         print(f"[DEBUG] Received GitHub link: {github_link}")
         print(f"[DEBUG] Received EQ answers: {eq_answers}")
 
-        # Save the uploaded resume temporarily
-        temp_resume_path = "temp_resume.pdf"
-        print(f"[DEBUG] Saving resume to temporary path: {temp_resume_path}")
-        with open(temp_resume_path, "wb") as buffer:
-            content = await resume.read()
-            buffer.write(content)
-
-        # Analyze resume
+        # Resume (from the in-memory upload buffer) and GitHub analyses run concurrently; neither
+        # blocks the event loop, so other requests keep being served while they wait on upstreams.
+        # Identical analyses already in flight for another request are joined rather than repeated.
         print("[DEBUG] Starting resume analysis")
-        resume_analysis = analyze_resume(temp_resume_path)
+        resume_task = analyze_resume_coalesced(resume_buffer)
+        if github_link:
+            print("[DEBUG] Starting GitHub analysis")
+            github_task = analyze_github_coalesced(github_link, session=await http_client.session())
+            resume_analysis, github_data = await asyncio.gather(resume_task, github_task)
+        else:
+            resume_analysis, github_data = await resume_task, None
         print(f"[DEBUG] Resume analysis results: {resume_analysis}")
         
-        # Analyze GitHub if a link is provided and extract only frontend/backend scores
+        # Extract only frontend/backend scores from the GitHub analysis
         github_analysis = None
-        if github_link:
-            print("[DEBUG] Starting GitHub analysis")
-            github_data = analyze_github(github_link)
+        if github_data is not None:
             print(f"[DEBUG] GitHub analysis results: {github_data}")
             
             if "error" in github_data:
@@ -134,18 +726,14 @@ async def analyze_candidate(
                     formatted_eq_dict[formatted_key] = value
                 
                 print(f"[DEBUG] Formatted EQ answers: {formatted_eq_dict}")
-                # calculate_eq_score returns a tuple: (breakdown, final_score)
-                _, final_eq_score = calculate_eq_score(formatted_eq_dict)
+                # score returns a tuple: (breakdown, final_score)
+                _, final_eq_score = questionnaire_registry.get("eq", eq_version).score(formatted_eq_dict)
                 print(f"[DEBUG] Calculated EQ score: {final_eq_score}")
             except Exception as e:
                 print(f"[ERROR] Failed to process EQ answers: {e}")
                 print(f"[DEBUG] Raw EQ answers: {eq_answers}")
                 final_eq_score = None
 
-        # Clean up temporary resume file
-        print("[DEBUG] Cleaning up temporary resume file")
-        os.remove(temp_resume_path)
-        
         # Compute combined final scores using weight: GitHub = 2, Resume = 1.
         final_frontend = None
         final_backend = None
@@ -185,15 +773,28 @@ async def analyze_candidate(
         response = {
             "final_frontend": round(final_frontend, 2),
             "final_backend": round(final_backend, 2),
-            "final_eq_score": final_eq_score
+            "final_eq_score": final_eq_score,
+            # "llm", "cache" or "local" (Gemini over budget / failing, scored by local_skill_scorer)
+            "resume_score_source": resume_analysis.get("score_source") if resume_analysis else None
         }
         print(f"[DEBUG] Final response: {response}")
 
+        if candidate_id:
+            # Only this candidate's row and column of the stored match matrix are recomputed
+            stored_scores = {"frontend": response["final_frontend"], "backend": response["final_backend"]}
+            # Without EQ answers (a GitHub/resume refresh) the stored EQ score is kept
+            if final_eq_score is not None:
+                stored_scores["eq"] = final_eq_score
+            await run_blocking(PARSE_EXECUTOR, match_store.upsert, candidate_id, stored_scores)
+            print(f"[DEBUG] Stored scores for {candidate_id} in the match store")
+
         return response
 
     except Exception as e:
         print(f"[ERROR] Exception in analyze_candidate: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        resume_buffer.close()
 
 
 if __name__ == "_main_":
@@ -0,0 +1,158 @@
+# match_matrix.py
+import numpy as np
+from match_score import MatchScoreCalculator, scores_to_arrays
+
+# Target number of pairs scored per block
+BLOCK_ELEMENTS = 1 << 17
+
+
+class MatchMatrixEngine:
+    """
+    Computes pairwise match scores for a whole candidate pool in blocked, array-backed passes.
+    Bands are derived once per candidate; each block of rows is then scored against every
+    column with one table gather and a few broadcasted operations, so there are no
+    Python-level loops over pairs.
+    """
+
+    def __init__(self, frontend, backend, eq, calculator: MatchScoreCalculator = None, block_size: int = None):
+        self.frontend = np.asarray(frontend, dtype=np.float64)
+        self.backend = np.asarray(backend, dtype=np.float64)
+        self.eq = np.asarray(eq, dtype=np.float64)
+        if not (self.frontend.shape == self.backend.shape == self.eq.shape) or self.frontend.ndim != 1:
+            raise ValueError("frontend, backend and eq must be 1-D arrays of the same length")
+
+        self.calculator = calculator or MatchScoreCalculator()
+        self.size = len(self.frontend)
+        # Keep each block's temporaries cache-sized; large blocks are several times slower
+        if block_size is None:
+            block_size = BLOCK_ELEMENTS // max(1, self.size)
+        self.block_size = max(1, int(block_size))
+
+        self.frontend_bands = MatchScoreCalculator.get_band_array(self.frontend)
+        self.backend_bands = MatchScoreCalculator.get_band_array(self.backend)
+
+        # The weighted skill base only depends on the two (frontend band, backend band) cells,
+        # so it is computed once for all 16 x 16 cell pairs and gathered per block.
+        self.band_cells = (self.frontend_bands.astype(np.intp) - 1) * 4 + (self.backend_bands - 1)
+        cell_bands = np.arange(1, 5, dtype=np.int8)
+        frontend_cells = np.repeat(cell_bands, 4)
+        backend_cells = np.tile(cell_bands, 4)
+        w_front = self.calculator.weights.get("frontend", 0.5)
+        w_back = self.calculator.weights.get("backend", 0.5)
+        frontend_contrib = MatchScoreCalculator.contribution_from_bands(frontend_cells[:, None], frontend_cells[None, :])
+        backend_contrib = MatchScoreCalculator.contribution_from_bands(backend_cells[:, None], backend_cells[None, :])
+        self.base_table = (frontend_contrib * w_front + backend_contrib * w_back) / (w_front + w_back)
+
+    @classmethod
+    def from_candidates(cls, candidates_scores: list, calculator: MatchScoreCalculator = None, block_size: int = None):
+        """
+        Builds an engine from a list of {"frontend", "backend", "eq"} dicts.
+        """
+        frontend, backend, eq = scores_to_arrays(candidates_scores)
+        return cls(frontend, backend, eq, calculator=calculator, block_size=block_size)
+
+    def score_block(self, start: int, stop: int) -> np.ndarray:
+        """
+        Scores rows [start, stop) against every candidate. Returns a float64 (stop - start, N) block.
+        """
+        return self.score_rows(slice(start, stop))
+
+    def score_rows(self, rows) -> np.ndarray:
+        """
+        Scores the given rows (a slice or an array of indices) against every candidate.
+        Returns a float64 (len(rows), N) block.
+        """
+        overall_fb_base = self.base_table[self.band_cells[rows, None], self.band_cells[None, :]]
+        return self.calculator.finish_scores_array(
+            overall_fb_base,
+            self.frontend[rows, None] - self.frontend[None, :],
+            self.backend[rows, None] - self.backend[None, :],
+            self.eq[rows, None] + self.eq[None, :]
+        )
+
+    def iter_blocks(self):
+        """
+        Yields (start, stop, block) for consecutive row blocks of the match matrix.
+        """
+        for start in range(0, self.size, self.block_size):
+            stop = min(start + self.block_size, self.size)
+            yield start, stop, self.score_block(start, stop)
+
+    def compute_matrix(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the dense N x N float32 match matrix. The diagonal holds each candidate's
+        score against themself, exactly as calculate_combined_score would report it.
+        """
+        if out is None:
+            out = np.empty((self.size, self.size), dtype=np.float32)
+        for start, stop, block in self.iter_blocks():
+            out[start:stop] = block
+        return out
+
+    def top_k(self, k: int, exclude_self: bool = True) -> (np.ndarray, np.ndarray):
+        """
+        Returns each candidate's k best partners as (indices, scores), both shaped (N, k)
+        and sorted by descending score (ties broken by lower index).
+        """
+        limit = self.size - 1 if exclude_self else self.size
+        k = max(0, min(int(k), limit))
+        indices = np.empty((self.size, k), dtype=np.int64)
+        scores = np.empty((self.size, k), dtype=np.float32)
+        if k == 0:
+            return indices, scores
+
+        for start, stop, block in self.iter_blocks():
+            if exclude_self:
+                block_rows = np.arange(stop - start)
+                block[block_rows, block_rows + start] = -np.inf
+            block_indices, block_scores = top_k_rows(block, k)
+            indices[start:stop] = block_indices
+            scores[start:stop] = block_scores
+        return indices, scores
+
+    def top_k_for(self, rows, k: int, exclude_self: bool = True) -> (np.ndarray, np.ndarray):
+        """
+        top_k for a few rows only (e.g. anchor candidates): returns (indices, scores) shaped
+        (len(rows), k), exactly the matching rows of top_k(k, exclude_self).
+        """
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        limit = self.size - 1 if exclude_self else self.size
+        k = max(0, min(int(k), limit))
+        indices = np.empty((len(rows), k), dtype=np.int64)
+        scores = np.empty((len(rows), k), dtype=np.float32)
+        if k == 0:
+            return indices, scores
+
+        for start in range(0, len(rows), self.block_size):
+            block_rows = rows[start:start + self.block_size]
+            block = self.score_rows(block_rows)
+            if exclude_self:
+                block[np.arange(len(block_rows)), block_rows] = -np.inf
+            block_indices, block_scores = top_k_rows(block, k)
+            indices[start:start + len(block_rows)] = block_indices
+            scores[start:start + len(block_rows)] = block_scores
+        return indices, scores
+
+
+def top_k_rows(block: np.ndarray, k: int) -> (np.ndarray, np.ndarray):
+    """
+    Row-wise top-k of a 2-D array, sorted by descending value with ties broken by lower column.
+    """
+    columns = block.shape[1]
+    if k < columns:
+        # argpartition does not respect ties, so widen the candidate set to every column
+        # that reaches the k-th value before the stable sort below picks the winners.
+        kth_value = -np.partition(-block, k - 1, axis=1)[:, k - 1:k]
+        candidate_mask = block >= kth_value
+        width = int(candidate_mask.sum(axis=1).max())
+        if width < columns:
+            candidates = np.argsort(~candidate_mask, axis=1, kind="stable")[:, :width]
+        else:
+            candidates = np.broadcast_to(np.arange(columns), block.shape)
+    else:
+        candidates = np.broadcast_to(np.arange(columns), block.shape)
+
+    candidate_scores = np.take_along_axis(block, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")[:, :k]
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(block, indices, axis=1)
@@ -1,4 +1,6 @@
 # match_score.py
+import math
+import numpy as np
 
 class MatchScoreCalculator:
     def __init__(self, weights=None):
@@ -88,8 +90,284 @@ class MatchScoreCalculator:
         scaled_score = max(10, min(90, scaled_score))
         return scaled_score
 
+    @staticmethod
+    def get_band_array(scores) -> np.ndarray:
+        """
+        Vectorized get_band: maps an array of scores in 0-100 to bands 1-4.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        in_range = (scores >= 0) & (scores <= 100)
+        if not np.all(in_range):
+            print(f"Score: {scores[~in_range].ravel()[0]} is out of range")
+            raise ValueError("Score must be between 0 and 100")
+        # Band upper bounds are inclusive, so searchsorted(side="left") matches the if/elif chain
+        return np.searchsorted(BAND_UPPER_BOUNDS, scores, side="left").astype(np.int8) + 1
+
+    @staticmethod
+    def compute_skill_contribution_array(scores1, scores2) -> np.ndarray:
+        """
+        Vectorized compute_skill_contribution. Inputs broadcast against each other.
+        """
+        scores1 = np.asarray(scores1, dtype=np.float64)
+        scores2 = np.asarray(scores2, dtype=np.float64)
+        band1 = MatchScoreCalculator.get_band_array(scores1)
+        band2 = MatchScoreCalculator.get_band_array(scores2)
+        return MatchScoreCalculator.contribution_from_bands(band1, band2)
+
+    @staticmethod
+    def contribution_from_bands(band1, band2) -> np.ndarray:
+        """
+        Skill contribution for scores whose bands were already computed with get_band_array.
+        """
+        # The scalar 35/36 special case needs no mask here: both scores sit in band 1,
+        # so the band difference is 0 and the adjustment is already 15.
+        abs_band_diff = np.abs(band1.astype(np.int16) - band2)
+        adjustment = BAND_DIFF_ADJUSTMENT[abs_band_diff]
+
+        contribution = np.clip(50 + adjustment, 0, 100)
+        return contribution
+
+    def calculate_combined_scores_array(self, frontend1, backend1, eq1, frontend2, backend2, eq2) -> np.ndarray:
+        """
+        Vectorized calculate_combined_score over broadcastable score arrays.
+        Every step mirrors the scalar method operation for operation (in float64),
+        so results are identical to calling calculate_combined_score pair by pair.
+        """
+        frontend1 = np.asarray(frontend1, dtype=np.float64)
+        frontend2 = np.asarray(frontend2, dtype=np.float64)
+        backend1 = np.asarray(backend1, dtype=np.float64)
+        backend2 = np.asarray(backend2, dtype=np.float64)
+        eq1 = np.asarray(eq1, dtype=np.float64)
+        eq2 = np.asarray(eq2, dtype=np.float64)
+
+        frontend_contrib = self.compute_skill_contribution_array(frontend1, frontend2)
+        backend_contrib = self.compute_skill_contribution_array(backend1, backend2)
+        return self.combine_contributions_array(
+            frontend_contrib, backend_contrib,
+            frontend1 - frontend2, backend1 - backend2,
+            eq1 + eq2
+        )
+
+    def combine_contributions_array(self, frontend_contrib, backend_contrib, diff_frontend, diff_backend, eq_sum) -> np.ndarray:
+        """
+        Turns per-skill contributions, score differences and EQ sums into final match scores
+        (weighting, complementary bonus, EQ mix and scaling).
+        """
+        w_front = self.weights.get("frontend", 0.5)
+        w_back = self.weights.get("backend", 0.5)
+        total_weight = w_front + w_back
+        overall_fb_base = (frontend_contrib * w_front + backend_contrib * w_back) / total_weight
+        return self.finish_scores_array(overall_fb_base, diff_frontend, diff_backend, eq_sum)
+
+    def finish_scores_array(self, overall_fb_base, diff_frontend, diff_backend, eq_sum) -> np.ndarray:
+        """
+        Applies the complementary bonus, EQ mix and final scaling to a weighted skill base.
+        """
+        complementary = diff_frontend * diff_backend < 0
+        avg_diff = (np.abs(diff_frontend) + np.abs(diff_backend)) / 2
+
+        bonus = np.where(complementary & (avg_diff >= 15), np.minimum((avg_diff / 100) * 70, 45), 0.0)
+
+        overall_fb = np.clip(overall_fb_base + bonus, 0, 100)
+
+        eq_avg = eq_sum / 2
+
+        fb_weight = 0.75
+        eq_weight = 0.25
+        final_score = np.clip(overall_fb * fb_weight + eq_avg * eq_weight, 0, 100)
+
+        scaled_score = np.clip(2 * final_score - 60, 10, 90)
+        return scaled_score
+
+    def calculate_batch_scores(self, anchor_scores: dict, candidates_scores: list) -> np.ndarray:
+        """
+        Scores one anchor candidate against a list of N candidates in a single vectorized pass.
+        Returns an array of N match scores, identical to calling calculate_combined_score for each.
+        """
+        frontend, backend, eq = scores_to_arrays(candidates_scores)
+        return self.calculate_combined_scores_array(
+            anchor_scores.get("frontend", 0),
+            anchor_scores.get("backend", 0),
+            anchor_scores.get("eq", 50),
+            frontend,
+            backend,
+            eq
+        )
+
+
+# Inclusive upper bound of bands 1-4 used by get_band_array
+BAND_UPPER_BOUNDS = np.array([36, 66, 86, 100], dtype=np.float64)
+
+# Adjustment indexed by absolute band difference (0, 1, 2, 3)
+BAND_DIFF_ADJUSTMENT = np.array([15, 5, -10, -20], dtype=np.int64)
+
+
+def scores_to_arrays(candidates_scores: list) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Converts a list of {"frontend", "backend", "eq"} dicts into three float64 arrays,
+    applying the same defaults as calculate_combined_score.
+    """
+    frontend = np.fromiter((c.get("frontend", 0) for c in candidates_scores), dtype=np.float64, count=len(candidates_scores))
+    backend = np.fromiter((c.get("backend", 0) for c in candidates_scores), dtype=np.float64, count=len(candidates_scores))
+    eq = np.fromiter((c.get("eq", 50) for c in candidates_scores), dtype=np.float64, count=len(candidates_scores))
+    return frontend, backend, eq
 
 
+
+
+class CompiledMatchScoreCalculator(MatchScoreCalculator):
+    """
+    "Compiled" MatchScoreCalculator: bands and per-skill weighted contributions are precomputed
+    into lookup tables once, so scoring is a handful of table gathers plus the bonus/EQ arithmetic.
+
+    Quantization policy: tables are indexed by ceil(score). Band upper bounds (36, 66, 86, 100)
+    are inclusive integers, so every real score s in [0, 100] has band(s) == band(ceil(s)); e.g.
+    35.71 -> 36 (band 1) and 36.01 -> 37 (band 2). The complementary bonus and EQ mix still use
+    the raw, unquantized scores, so fractional inputs score exactly like the scalar path.
+    """
+
+    def __init__(self, weights=None):
+        super().__init__(weights)
+        integer_scores = np.arange(TABLE_SIZE, dtype=np.float64)
+        self.band_table = MatchScoreCalculator.get_band_array(integer_scores)
+        self.contribution_table = MatchScoreCalculator.contribution_from_bands(
+            self.band_table[:, None], self.band_table[None, :]
+        )
+        w_front = self.weights.get("frontend", 0.5)
+        w_back = self.weights.get("backend", 0.5)
+        self.total_weight = w_front + w_back
+        self.frontend_table = self.contribution_table * w_front
+        self.backend_table = self.contribution_table * w_back
+
+        # Nested lists are faster than ndarray indexing for single-pair lookups
+        self._band_list = self.band_table.tolist()
+        self._contribution_list = self.contribution_table.tolist()
+        self._frontend_list = self.frontend_table.tolist()
+        self._backend_list = self.backend_table.tolist()
+
+    @staticmethod
+    def table_index(score) -> int:
+        if not 0 <= score <= 100:
+            print(f"Score: {score} is out of range")
+            raise ValueError("Score must be between 0 and 100")
+        return math.ceil(score)
+
+    @staticmethod
+    def table_index_array(scores) -> np.ndarray:
+        scores = np.asarray(scores, dtype=np.float64)
+        in_range = (scores >= 0) & (scores <= 100)
+        if not np.all(in_range):
+            print(f"Score: {scores[~in_range].ravel()[0]} is out of range")
+            raise ValueError("Score must be between 0 and 100")
+        return np.ceil(scores).astype(np.intp)
+
+    def compute_skill_contribution(self, score1, score2) -> (float, int, int):
+        index1 = self.table_index(score1)
+        index2 = self.table_index(score2)
+        return self._contribution_list[index1][index2], self._band_list[index1], self._band_list[index2]
+
+    def calculate_combined_score(self, candidate1_scores: dict, candidate2_scores: dict) -> float:
+        frontend_score1 = candidate1_scores.get("frontend", 0)
+        frontend_score2 = candidate2_scores.get("frontend", 0)
+        backend_score1 = candidate1_scores.get("backend", 0)
+        backend_score2 = candidate2_scores.get("backend", 0)
+
+        frontend_part = self._frontend_list[self.table_index(frontend_score1)][self.table_index(frontend_score2)]
+        backend_part = self._backend_list[self.table_index(backend_score1)][self.table_index(backend_score2)]
+        overall_fb_base = (frontend_part + backend_part) / self.total_weight
+
+        diff_frontend = frontend_score1 - frontend_score2
+        diff_backend = backend_score1 - backend_score2
+        avg_diff = (abs(diff_frontend) + abs(diff_backend)) / 2
+
+        bonus = 0
+        if diff_frontend * diff_backend < 0 and avg_diff >= 15:
+            bonus = min((avg_diff / 100) * 70, 45)
+
+        overall_fb = max(0, min(100, overall_fb_base + bonus))
+
+        eq_avg = (candidate1_scores.get("eq", 50) + candidate2_scores.get("eq", 50)) / 2
+        final_score = max(0, min(100, overall_fb * 0.75 + eq_avg * 0.25))
+
+        return max(10, min(90, 2 * final_score - 60))
+
+    def calculate_combined_scores_array(self, frontend1, backend1, eq1, frontend2, backend2, eq2) -> np.ndarray:
+        frontend1 = np.asarray(frontend1, dtype=np.float64)
+        frontend2 = np.asarray(frontend2, dtype=np.float64)
+        backend1 = np.asarray(backend1, dtype=np.float64)
+        backend2 = np.asarray(backend2, dtype=np.float64)
+
+        frontend_part = self.frontend_table[self.table_index_array(frontend1), self.table_index_array(frontend2)]
+        backend_part = self.backend_table[self.table_index_array(backend1), self.table_index_array(backend2)]
+        overall_fb_base = (frontend_part + backend_part) / self.total_weight
+
+        return self.finish_scores_array(
+            overall_fb_base,
+            frontend1 - frontend2,
+            backend1 - backend2,
+            np.asarray(eq1, dtype=np.float64) + np.asarray(eq2, dtype=np.float64)
+        )
+
+
+# Lookup tables cover every integer score 0-100
+TABLE_SIZE = 101
+
+
+def create_calculator(weights=None, mode: str = "compiled") -> MatchScoreCalculator:
+    """
+    Builds a calculator for the given mode: "compiled" (lookup tables) or "scalar" (reference).
+    """
+    if mode == "compiled":
+        return CompiledMatchScoreCalculator(weights)
+    if mode == "scalar":
+        return MatchScoreCalculator(weights)
+    raise ValueError(f"Unknown match score mode: {mode}")
+
+
+def verify_compiled_calculator(compiled: CompiledMatchScoreCalculator, eq_values=(0, 43.75, 50, 100)) -> int:
+    """
+    Checks a compiled calculator against the scalar reference with the same weights:
+    the contribution table on every integer score pair, and combined scores (scalar and array
+    paths) on every integer frontend pair crossed with a grid of backend/EQ values, plus
+    fractional scores around each band boundary. Raises AssertionError on the first mismatch
+    and returns the number of checked combinations.
+    """
+    reference = MatchScoreCalculator(compiled.weights)
+    checked = 0
+
+    for score1 in range(TABLE_SIZE):
+        for score2 in range(TABLE_SIZE):
+            expected = reference.compute_skill_contribution(score1, score2)
+            actual = compiled.compute_skill_contribution(score1, score2)
+            assert actual == expected, f"Contribution mismatch for ({score1}, {score2}): {actual} != {expected}"
+            checked += 1
+
+    integer_scores = np.arange(TABLE_SIZE, dtype=np.float64)
+    boundary_scores = np.array([0, 0.5, 35.71, 36, 36.01, 45.57, 65.99, 66, 66.5, 86, 86.2, 99.9, 100])
+    backend_grid = np.concatenate([integer_scores[::5], boundary_scores])
+    frontend1, frontend2 = np.meshgrid(np.concatenate([integer_scores, boundary_scores]), np.concatenate([integer_scores, boundary_scores]), indexing="ij")
+    frontend1, frontend2 = frontend1.ravel(), frontend2.ravel()
+
+    for backend1 in backend_grid:
+        for backend2 in backend_grid[::3]:
+            for eq in eq_values:
+                actual = compiled.calculate_combined_scores_array(frontend1, backend1, eq, frontend2, backend2, 50)
+                expected = reference.calculate_combined_scores_array(frontend1, backend1, eq, frontend2, backend2, 50)
+                assert np.array_equal(actual, expected), f"Combined score mismatch for backend ({backend1}, {backend2}), eq {eq}"
+                checked += len(frontend1)
+
+    # The array reference mirrors the scalar method exactly; spot check the dict API directly too
+    for score1 in range(0, TABLE_SIZE, 7):
+        for score2 in boundary_scores:
+            candidate1 = {"frontend": score1, "backend": score2, "eq": 70}
+            candidate2 = {"frontend": score2, "backend": score1, "eq": 43.75}
+            expected = reference.calculate_combined_score(candidate1, candidate2)
+            actual = compiled.calculate_combined_score(candidate1, candidate2)
+            assert actual == expected, f"Combined score mismatch for {candidate1}, {candidate2}: {actual} != {expected}"
+            checked += 1
+
+    return checked
+
 if __name__ == "__main__":
     calculator = MatchScoreCalculator()
     
@@ -171,3 +449,7 @@ if __name__ == "__main__":
     person_b = {"frontend": 35.71, "backend": 45.57, "eq": 43.75}
     score = calculator.calculate_combined_score(person_a, person_b)
     print(f"Test 13 - Extreme gap in both skills: {score:.2f}%")
+
+    # Compiled lookup-table mode must agree with the scalar reference
+    checked = verify_compiled_calculator(CompiledMatchScoreCalculator())
+    print(f"Compiled calculator matches the scalar path on {checked} combinations")
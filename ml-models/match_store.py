@@ -0,0 +1,450 @@
+# match_store.py
+import os
+import json
+import threading
+import numpy as np
+from match_score import MatchScoreCalculator
+from match_matrix import top_k_rows
+
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_store")
+META_FILE = "meta.json"
+MATRIX_FILE = "matrix.f32"
+ARRAYS_FILE = "arrays.npz"
+JOURNAL_FILE = "journal.jsonl"
+
+# Journal entries written before the next full save (checkpoint) of the arrays and metadata
+CHECKPOINT_EVERY = 1000
+
+# Rows rescanned per block when repairing top-k caches
+RESCAN_BLOCK_ROWS = 256
+
+
+class MatchStore:
+    """
+    Persistent pairwise match store backed by a memory-mapped float32 matrix plus an ID -> slot map.
+
+    When a candidate's scores change only their row and column are recomputed, and every row's
+    top-k cache is repaired incrementally: a row is rescanned only when the changed candidate
+    falls out of its top-k and something outside the cache might now outrank them. Removed
+    candidates leave free slots that are reused; compact() packs the live slots together again.
+
+    Updates are persisted incrementally: each upsert or removal appends one line to a journal
+    before touching the memory-mapped matrix, and the slot arrays and metadata are only rewritten
+    by save() every checkpoint_every entries (and on resize). On load the journal is replayed on
+    top of the last save, which also repairs matrix cells written after it.
+
+    Resizing writes a new matrix file; meta.json names the matrix file in use and is always
+    replaced last, so a crash mid-resize leaves the previous matrix and metadata in place.
+    Public methods are serialized by a lock, so the store can be shared by worker threads.
+    """
+
+    def __init__(self, directory: str, calculator: MatchScoreCalculator = None, top_k: int = 10,
+                 initial_capacity: int = 1024, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.directory = directory
+        self.calculator = calculator or MatchScoreCalculator()
+        self.checkpoint_every = checkpoint_every
+        self.counts = {"upserts": 0, "removals": 0, "rows_rescanned": 0, "grows": 0, "compactions": 0,
+                       "checkpoints": 0, "journal_replayed": 0}
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_entries = 0
+        self._replaying = False
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(os.path.join(directory, META_FILE)):
+            self._load()
+            self._replay_journal()
+        else:
+            self.k = top_k
+            self.initial_capacity = max(1, initial_capacity)
+            self.generation = 0
+            self.matrix_file = MATRIX_FILE
+            self._allocate(self.initial_capacity)
+            self.slot_ids = []
+            self.slot_of = {}
+            self.free_slots = []
+            # The journal is only meaningful on top of a save, so start from one
+            self.save()
+
+    # Storage
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.matrix = np.memmap(os.path.join(self.directory, self.matrix_file), dtype=np.float32, mode="w+",
+                                shape=(capacity, capacity))
+        self.frontend = np.zeros(capacity, dtype=np.float64)
+        self.backend = np.zeros(capacity, dtype=np.float64)
+        self.eq = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.top_indices = np.full((capacity, self.k), -1, dtype=np.int64)
+        self.top_scores = np.full((capacity, self.k), -np.inf, dtype=np.float32)
+
+    def _load(self):
+        with open(os.path.join(self.directory, META_FILE)) as f:
+            meta = json.load(f)
+        self.k = meta["top_k"]
+        self.initial_capacity = meta["initial_capacity"]
+        self.capacity = meta["capacity"]
+        self.generation = meta.get("generation", 0)
+        self.matrix_file = meta.get("matrix_file", MATRIX_FILE)
+        self.slot_ids = meta["slot_ids"]
+        self.free_slots = meta["free_slots"]
+        self.slot_of = {candidate_id: slot for slot, candidate_id in enumerate(self.slot_ids) if candidate_id is not None}
+        self.matrix = np.memmap(os.path.join(self.directory, self.matrix_file), dtype=np.float32, mode="r+",
+                                shape=(self.capacity, self.capacity))
+        arrays = np.load(os.path.join(self.directory, meta.get("arrays_file", ARRAYS_FILE)))
+        self.frontend = arrays["frontend"]
+        self.backend = arrays["backend"]
+        self.eq = arrays["eq"]
+        self.active = arrays["active"]
+        self.top_indices = arrays["top_indices"]
+        self.top_scores = arrays["top_scores"]
+
+    def save(self):
+        """
+        Checkpoint: flushes the matrix, then writes the slot arrays and top-k caches and finally the
+        metadata, each to a temp file swapped in with os.replace, and empties the journal. Arrays are
+        written per generation, so the metadata on disk always names a matching matrix and arrays file.
+        """
+        with self._lock:
+            self.matrix.flush()
+            arrays_file = f"arrays.{self.generation}.npz" if self.generation else ARRAYS_FILE
+            temp_path = os.path.join(self.directory, arrays_file + ".tmp")
+            with open(temp_path, "wb") as f:
+                np.savez(f, frontend=self.frontend, backend=self.backend, eq=self.eq, active=self.active,
+                         top_indices=self.top_indices, top_scores=self.top_scores)
+            os.replace(temp_path, os.path.join(self.directory, arrays_file))
+
+            meta = {
+                "top_k": self.k,
+                "initial_capacity": self.initial_capacity,
+                "capacity": self.capacity,
+                "generation": self.generation,
+                "matrix_file": self.matrix_file,
+                "arrays_file": arrays_file,
+                "slot_ids": self.slot_ids,
+                "free_slots": self.free_slots
+            }
+            temp_path = os.path.join(self.directory, META_FILE + ".tmp")
+            with open(temp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(temp_path, os.path.join(self.directory, META_FILE))
+            self.counts["checkpoints"] += 1
+
+            # While replaying, the journal is still the only record of the entries not yet applied
+            if not self._replaying:
+                self._close_journal()
+                open(os.path.join(self.directory, JOURNAL_FILE), "w").close()
+                self._journal_entries = 0
+
+    # Journal
+
+    def _append_journal(self, entry: dict):
+        if self._journal is None:
+            self._journal = open(os.path.join(self.directory, JOURNAL_FILE), "a")
+        # Flushed to the OS per entry: survives a process crash, not a power loss
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        self._journal_entries += 1
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _maybe_checkpoint(self):
+        if self._journal_entries >= self.checkpoint_every:
+            self.save()
+
+    def _replay_journal(self):
+        """
+        Re-applies journal entries written after the last save. Matrix cells written after the save
+        are recomputed by the replayed entries; the top-k caches are rebuilt once at the end.
+        """
+        path = os.path.join(self.directory, JOURNAL_FILE)
+        if not os.path.exists(path):
+            return
+        entries = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    break
+        if not entries:
+            return
+
+        self._replaying = True
+        try:
+            for entry in entries:
+                if entry["op"] == "upsert":
+                    self._apply_upsert(entry["id"], entry["frontend"], entry["backend"], entry["eq"])
+                elif entry["id"] in self.slot_of:
+                    self._apply_remove(entry["id"])
+            self._rescan_rows(np.nonzero(self.active[:len(self.slot_ids)])[0])
+        finally:
+            self._replaying = False
+        self.counts["journal_replayed"] += len(entries)
+        print(f"[DEBUG] Match store replayed {len(entries)} journal entries")
+        self.save()
+
+    def close(self):
+        """
+        Saves and closes the journal, so the next load has nothing to replay.
+        """
+        with self._lock:
+            self.save()
+            self._close_journal()
+
+    def _remove_stale_files(self, keep: set):
+        for name in os.listdir(self.directory):
+            if name.startswith(("matrix", "arrays")) and name not in keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def _resize(self, capacity: int, slots: np.ndarray, slot_ids: list):
+        """
+        Rebuilds storage with the given capacity in a new matrix file, moving old slot slots[i] to
+        new slot i, then saves so the metadata switches to the new file in one os.replace.
+        """
+        old_matrix = self.matrix
+        old = (self.frontend, self.backend, self.eq, self.top_indices, self.top_scores)
+        self.generation += 1
+        self.matrix_file = f"matrix.{self.generation}.f32"
+        matrix = np.memmap(os.path.join(self.directory, self.matrix_file), dtype=np.float32, mode="w+",
+                           shape=(capacity, capacity))
+        for start in range(0, len(slots), RESCAN_BLOCK_ROWS):
+            rows = slots[start:start + RESCAN_BLOCK_ROWS]
+            matrix[start:start + len(rows), :len(slots)] = old_matrix[rows][:, slots]
+        del old_matrix
+
+        self.capacity = capacity
+        self.matrix = matrix
+        self.frontend = np.zeros(capacity, dtype=np.float64)
+        self.backend = np.zeros(capacity, dtype=np.float64)
+        self.eq = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.top_indices = np.full((capacity, self.k), -1, dtype=np.int64)
+        self.top_scores = np.full((capacity, self.k), -np.inf, dtype=np.float32)
+
+        old_frontend, old_backend, old_eq, old_top_indices, old_top_scores = old
+        count = len(slots)
+        self.frontend[:count] = old_frontend[slots]
+        self.backend[:count] = old_backend[slots]
+        self.eq[:count] = old_eq[slots]
+        self.active[:count] = [candidate_id is not None for candidate_id in slot_ids]
+
+        # Remap cached partner slots; -1 stays -1
+        remap = np.full(len(old_frontend) + 1, -1, dtype=np.int64)
+        remap[slots] = np.arange(count)
+        self.top_indices[:count] = remap[old_top_indices[slots]]
+        self.top_scores[:count] = old_top_scores[slots]
+
+        self.slot_ids = slot_ids
+        self.slot_of = {candidate_id: slot for slot, candidate_id in enumerate(slot_ids) if candidate_id is not None}
+        self.save()
+        self._remove_stale_files({META_FILE, self.matrix_file, f"arrays.{self.generation}.npz"})
+
+    def _grow(self):
+        # Growing keeps slot numbers, including free ones
+        self._resize(self.capacity * 2, np.arange(len(self.slot_ids)), list(self.slot_ids))
+        self.counts["grows"] += 1
+
+    def compact(self):
+        """
+        Packs live candidates into the lowest slots and shrinks storage to fit them.
+        """
+        with self._lock:
+            live = np.array([slot for slot, candidate_id in enumerate(self.slot_ids) if candidate_id is not None], dtype=np.int64)
+            capacity = self.initial_capacity
+            while capacity < len(live):
+                capacity *= 2
+            self.free_slots = []
+            self._resize(capacity, live, [self.slot_ids[slot] for slot in live])
+            self.counts["compactions"] += 1
+
+    # Updates
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def __contains__(self, candidate_id):
+        with self._lock:
+            return candidate_id in self.slot_of
+
+    def _new_slot(self, candidate_id) -> int:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slot_ids[slot] = candidate_id
+            return slot
+        if len(self.slot_ids) == self.capacity:
+            self._grow()
+        self.slot_ids.append(candidate_id)
+        return len(self.slot_ids) - 1
+
+    def upsert(self, candidate_id, scores: dict):
+        """
+        Adds a candidate or updates their scores, recomputing only their row and column. Components
+        missing from scores keep their stored value; a new candidate starts from frontend 0,
+        backend 0 and eq 50.
+        """
+        with self._lock:
+            slot = self.slot_of.get(candidate_id)
+            if slot is None:
+                current = {"frontend": 0, "backend": 0, "eq": 50}
+            else:
+                current = {"frontend": self.frontend[slot], "backend": self.backend[slot], "eq": self.eq[slot]}
+            values = {name: float(scores.get(name, value)) for name, value in current.items()}
+            # Grow first: the resize saves and empties the journal, which must not drop this entry
+            if slot is None and not self.free_slots and len(self.slot_ids) == self.capacity:
+                self._grow()
+            self._append_journal(dict(op="upsert", id=candidate_id, **values))
+            self._apply_upsert(candidate_id, values["frontend"], values["backend"], values["eq"])
+            self.counts["upserts"] += 1
+            self._maybe_checkpoint()
+
+    def _apply_upsert(self, candidate_id, frontend: float, backend: float, eq: float):
+        slot = self.slot_of.get(candidate_id)
+        is_new = slot is None
+        if is_new:
+            slot = self._new_slot(candidate_id)
+            self.slot_of[candidate_id] = slot
+
+        self.frontend[slot] = frontend
+        self.backend[slot] = backend
+        self.eq[slot] = eq
+        self.active[slot] = True
+
+        used = len(self.slot_ids)
+        column = self.calculator.calculate_combined_scores_array(
+            self.frontend[slot], self.backend[slot], self.eq[slot],
+            self.frontend[:used], self.backend[:used], self.eq[:used]
+        ).astype(np.float32)
+        self.matrix[slot, :used] = column
+        self.matrix[:used, slot] = column
+
+        self._repair_column(slot, column, is_new)
+        self._rescan_rows(np.array([slot]))
+
+    def remove(self, candidate_id):
+        """
+        Removes a candidate; raises KeyError if they are not in the store.
+        """
+        with self._lock:
+            if candidate_id not in self.slot_of:
+                raise KeyError(candidate_id)
+            self._append_journal({"op": "remove", "id": candidate_id})
+            self._apply_remove(candidate_id)
+            self.counts["removals"] += 1
+            self._maybe_checkpoint()
+
+    def _apply_remove(self, candidate_id):
+        slot = self.slot_of.pop(candidate_id)
+        self.slot_ids[slot] = None
+        self.free_slots.append(slot)
+        self.active[slot] = False
+        self.top_indices[slot] = -1
+        self.top_scores[slot] = -np.inf
+
+        # Rows that cached the removed candidate need a rescan; every other cache stays valid
+        dirty = np.nonzero((self.top_indices == slot).any(axis=1))[0]
+        self._rescan_rows(dirty)
+
+    def _worst_entries(self, rows: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Position, score and slot of the worst cached entry per row (lowest score, then highest slot).
+        Empty entries (-inf) are always the worst.
+        """
+        scores = self.top_scores[rows]
+        indices = self.top_indices[rows]
+        lowest = scores.min(axis=1, keepdims=True)
+        tie_slots = np.where(scores == lowest, indices, -2)
+        position = np.argmax(tie_slots, axis=1)
+        return position, scores[np.arange(len(rows)), position], indices[np.arange(len(rows)), position]
+
+    def _repair_column(self, slot: int, column: np.ndarray, is_new: bool):
+        rows = np.nonzero(self.active[:len(self.slot_ids)])[0]
+        rows = rows[rows != slot]
+        if len(rows) == 0 or self.k == 0:
+            return
+        values = column[rows]
+        worst_position, worst_score, worst_slot = self._worst_entries(rows)
+
+        # An entry beats another if its score is higher, or equal with a lower slot
+        beats_worst = (values > worst_score) | ((values == worst_score) & (slot < worst_slot))
+        row_positions = np.arange(len(rows))
+
+        if is_new:
+            present = np.zeros(len(rows), dtype=bool)
+        else:
+            hits = self.top_indices[rows] == slot
+            present = hits.any(axis=1)
+
+        # Cached and still at least as good as the old worst entry: update in place.
+        # Cached but now worse than the old worst: someone outside may outrank it, rescan.
+        if present.any():
+            hit_position = np.argmax(hits, axis=1)
+            still_inside = present & (beats_worst | (worst_slot == slot) & (values >= worst_score))
+            update_rows = row_positions[still_inside]
+            self.top_scores[rows[update_rows], hit_position[update_rows]] = values[update_rows]
+            dirty = rows[present & ~still_inside]
+        else:
+            dirty = rows[:0]
+
+        # Not cached but now better than the worst cached entry: replace it
+        enter = ~present & beats_worst
+        enter_rows = row_positions[enter]
+        self.top_indices[rows[enter_rows], worst_position[enter_rows]] = slot
+        self.top_scores[rows[enter_rows], worst_position[enter_rows]] = values[enter_rows]
+
+        self._rescan_rows(dirty)
+
+    def _rescan_rows(self, rows: np.ndarray):
+        """
+        Rebuilds the top-k cache of the given rows from the stored matrix.
+        """
+        used = len(self.slot_ids)
+        inactive = ~self.active[:used]
+        for start in range(0, len(rows), RESCAN_BLOCK_ROWS):
+            block_rows = rows[start:start + RESCAN_BLOCK_ROWS]
+            block = np.array(self.matrix[block_rows, :used], dtype=np.float64)
+            block[:, inactive] = -np.inf
+            block[np.arange(len(block_rows)), block_rows] = -np.inf
+            k = min(self.k, used)
+            indices, scores = top_k_rows(block, k)
+            indices = np.where(np.isneginf(scores), -1, indices)
+            self.top_indices[block_rows] = -1
+            self.top_scores[block_rows] = -np.inf
+            self.top_indices[block_rows, :k] = indices
+            self.top_scores[block_rows, :k] = scores
+        self.counts["rows_rescanned"] += len(rows)
+
+    # Queries
+
+    def get_score(self, candidate_id1, candidate_id2) -> float:
+        with self._lock:
+            return float(self.matrix[self.slot_of[candidate_id1], self.slot_of[candidate_id2]])
+
+    def get_top_k(self, candidate_id) -> list:
+        """
+        Cached best partners as (candidate_id, score) pairs, best first (ties by lower slot).
+        Raises KeyError if the candidate is not in the store.
+        """
+        with self._lock:
+            slot = self.slot_of[candidate_id]
+            entries = [(float(score), int(index)) for index, score in zip(self.top_indices[slot], self.top_scores[slot]) if index >= 0]
+            entries.sort(key=lambda entry: (-entry[0], entry[1]))
+            return [(self.slot_ids[index], score) for score, index in entries]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self.counts,
+                candidates=len(self.slot_of),
+                capacity=self.capacity,
+                free_slots=len(self.free_slots),
+                top_k=self.k,
+                generation=self.generation,
+                journal_entries=self._journal_entries,
+                matrix_bytes=self.capacity * self.capacity * 4
+            )
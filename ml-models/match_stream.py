@@ -0,0 +1,90 @@
+# match_stream.py
+import json
+import numpy as np
+from match_score import MatchScoreCalculator, scores_to_arrays
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+class ChunkedMatchScorer:
+    """
+    Scores one anchor against a large candidate list chunk by chunk, so responses can be
+    streamed instead of materialized as one JSON document.
+    """
+
+    def __init__(self, calculator: MatchScoreCalculator, anchor_scores: dict, candidates_scores: list,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.calculator = calculator
+        self.anchor = (
+            anchor_scores.get("frontend", 0),
+            anchor_scores.get("backend", 0),
+            anchor_scores.get("eq", 50)
+        )
+        self.ids = [candidate.get("id") for candidate in candidates_scores]
+        self.frontend, self.backend, self.eq = scores_to_arrays(candidates_scores)
+        self.chunk_size = max(1, int(chunk_size))
+
+        # Fail before the first byte is sent rather than halfway through the stream
+        MatchScoreCalculator.get_band_array(np.array([self.anchor[0], self.anchor[1]]))
+        MatchScoreCalculator.get_band_array(self.frontend)
+        MatchScoreCalculator.get_band_array(self.backend)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def iter_chunks(self):
+        """
+        Yields (start, scores) for each chunk of candidates.
+        """
+        frontend, backend, eq = self.anchor
+        for start in range(0, len(self.ids), self.chunk_size):
+            stop = start + self.chunk_size
+            yield start, self.calculator.calculate_combined_scores_array(
+                frontend, backend, eq,
+                self.frontend[start:stop], self.backend[start:stop], self.eq[start:stop]
+            )
+
+    def _record(self, index: int, score: float) -> bytes:
+        return (json.dumps({"index": index, "id": self.ids[index], "match_score": score}) + "\n").encode()
+
+    def iter_ndjson(self, min_score: float = None, top_k: int = None):
+        """
+        Yields newline-delimited JSON records ({"index", "id", "match_score"}) followed by one
+        {"summary": ...} record. Without top_k, records are emitted chunk by chunk as soon as they
+        are scored. With top_k, a running top-k is merged per chunk and emitted (best first,
+        ties by lower index) once the last chunk is scored.
+        """
+        emitted = 0
+        best_indices = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float64)
+
+        for start, scores in self.iter_chunks():
+            indices = np.arange(start, start + len(scores))
+            if min_score is not None:
+                keep = scores >= min_score
+                indices, scores = indices[keep], scores[keep]
+
+            if top_k is not None:
+                merged_indices = np.concatenate([best_indices, indices])
+                merged_scores = np.concatenate([best_scores, scores])
+                order = np.lexsort((merged_indices, -merged_scores))[:max(top_k, 0)]
+                best_indices, best_scores = merged_indices[order], merged_scores[order]
+                continue
+
+            chunk = b"".join(self._record(index, score) for index, score in zip(indices.tolist(), scores.tolist()))
+            if chunk:
+                emitted += len(indices)
+                yield chunk
+
+        if top_k is not None:
+            emitted = len(best_indices)
+            yield b"".join(self._record(index, score) for index, score in zip(best_indices.tolist(), best_scores.tolist()))
+
+        yield (json.dumps({"summary": {"candidates": len(self), "emitted": emitted}}) + "\n").encode()
+
+    def iter_float32(self):
+        """
+        Yields the scores of every candidate, in input order, as little-endian float32 bytes.
+        """
+        for _, scores in self.iter_chunks():
+            yield scores.astype("<f4").tobytes()
@@ -0,0 +1,304 @@
+# questionnaire_registry.py
+import os
+import json
+import time
+import threading
+import numpy as np
+import Eq_score
+from Eq_score import calculate_eq_scores_batch, normalize_parameter_scores, require_whole_answers
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+DEFAULT_QUESTIONNAIRE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questionnaires")
+
+# Questionnaires with at most this many possible answer sets get a fully precomputed score table
+PRECOMPUTE_LIMIT = 100_000
+
+# Minimum seconds between mtime checks when hot reload is enabled
+RELOAD_CHECK_INTERVAL = 2.0
+
+QUESTIONNAIRE_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+def version_key(version: str) -> tuple:
+    """
+    Sort key so "10" > "9" and "1.10" > "1.9"; non-numeric parts compare as text after numbers.
+    """
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in str(version).split("."))
+
+
+class Questionnaire:
+    """
+    One version of a questionnaire: questions, choices and a scoring vector per choice.
+
+    Answers are mapped to a mixed-radix index (question q contributes (choice - 1) * stride[q]).
+    When the answer space is at most precompute_limit, every answer set is scored once at load
+    time and scoring becomes a table lookup; larger questionnaires use the vectorized batch path.
+    """
+
+    def __init__(self, definition: dict, source: str = None, precompute_limit: int = PRECOMPUTE_LIMIT):
+        self.name = str(definition.get("name", "")).strip()
+        self.version = str(definition.get("version", "")).strip()
+        if not self.name or not self.version:
+            raise ValueError("Questionnaire needs a name and a version")
+        self.source = source
+        self.parameters = list(definition.get("parameters") or [])
+        if not self.parameters:
+            raise ValueError(f"{self.name} v{self.version}: parameters must be a non-empty list")
+
+        questions = definition.get("questions") or {}
+        if not isinstance(questions, dict) or not questions:
+            raise ValueError(f"{self.name} v{self.version}: questions must be a non-empty mapping")
+        self.questions = questions
+        self.question_keys = list(questions)
+
+        self.choice_counts = []
+        for key in self.question_keys:
+            scoring = questions[key].get("scoring") or {}
+            choices = sorted(int(choice) for choice in scoring)
+            if choices != list(range(1, len(choices) + 1)):
+                raise ValueError(f"{self.name} v{self.version}: {key} scoring must cover choices 1..n")
+            for choice, vector in scoring.items():
+                if len(vector) != len(self.parameters):
+                    raise ValueError(f"{self.name} v{self.version}: {key} choice {choice} needs "
+                                     f"{len(self.parameters)} parameter weights")
+            self.choice_counts.append(len(choices))
+        self.choice_counts = np.array(self.choice_counts, dtype=np.int64)
+
+        # Dense (questions x max choices x parameters) tensor; questions with fewer choices are
+        # zero-padded, and answers past a question's own choice count are rejected in validation
+        self.scoring_tensor = np.zeros((len(self.question_keys), int(self.choice_counts.max()), len(self.parameters)))
+        for q, key in enumerate(self.question_keys):
+            for choice, vector in questions[key]["scoring"].items():
+                self.scoring_tensor[q, int(choice) - 1] = vector
+
+        # Mixed-radix strides: the last question varies fastest
+        self.strides = np.ones(len(self.question_keys), dtype=np.int64)
+        for q in range(len(self.question_keys) - 2, -1, -1):
+            self.strides[q] = self.strides[q + 1] * self.choice_counts[q + 1]
+        self.answer_space = int(np.prod(self.choice_counts.astype(object)))
+
+        self.breakdown_table = None
+        self.final_table = None
+        if self.answer_space <= precompute_limit:
+            all_answers = np.indices(self.choice_counts).reshape(len(self.question_keys), -1).T + 1
+            self.breakdown_table, self.final_table = calculate_eq_scores_batch(all_answers, self.scoring_tensor)
+
+    @property
+    def precomputed(self) -> bool:
+        return self.final_table is not None
+
+    def validate_answers(self, answers) -> np.ndarray:
+        answers = np.asarray(answers)
+        if answers.ndim != 2 or answers.shape[1] != len(self.question_keys):
+            raise ValueError(f"answers must have shape (N, {len(self.question_keys)})")
+        answers = require_whole_answers(answers)
+        if answers.size and (np.any(answers < 1) or np.any(answers > self.choice_counts)):
+            raise ValueError(f"Answers must be between 1 and each question's choice count {self.choice_counts.tolist()}")
+        return answers
+
+    def answer_index(self, answers) -> np.ndarray:
+        """
+        Mixed-radix table index of each validated answer row.
+        """
+        return (answers - 1) @ self.strides
+
+    def score_batch(self, answers) -> (np.ndarray, np.ndarray):
+        """
+        Scores an (N x questions) answer matrix, columns in question_keys order.
+        Returns (N x parameters) breakdowns and (N,) final scores, rounded to 2 decimals.
+        """
+        answers = self.validate_answers(answers)
+        if self.precomputed:
+            index = self.answer_index(answers)
+            return self.breakdown_table[index], self.final_table[index]
+        return calculate_eq_scores_batch(answers, self.scoring_tensor)
+
+    def score(self, responses: dict) -> (dict, float):
+        """
+        Same result shape as Eq_score.calculate_eq_score. A complete answer set is a table lookup;
+        partial answer sets (unanswered questions contribute nothing) are scored directly.
+        """
+        unknown = [key for key in responses if key not in self.questions]
+        if unknown:
+            raise KeyError(f"Unknown questions for {self.name} v{self.version}: {unknown}")
+
+        if len(responses) == len(self.question_keys):
+            breakdowns, finals = self.score_batch([[responses[key] for key in self.question_keys]])
+            breakdown, final_score = breakdowns[0], finals[0]
+        else:
+            parameter_scores = np.zeros(len(self.parameters))
+            for key, response in responses.items():
+                q = self.question_keys.index(key)
+                response = int(require_whole_answers(response))
+                if not 1 <= response <= self.choice_counts[q]:
+                    raise ValueError(f"{key} answer must be between 1 and {self.choice_counts[q]}")
+                parameter_scores += self.scoring_tensor[q, int(response) - 1]
+            normalized_scores = normalize_parameter_scores(parameter_scores)
+            breakdown, final_score = np.round(normalized_scores, 2), round(float(np.mean(normalized_scores)), 2)
+
+        return {parameter: float(breakdown[i]) for i, parameter in enumerate(self.parameters)}, float(final_score)
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "questions": self.question_keys,
+            "parameters": self.parameters,
+            "answer_space": self.answer_space,
+            "precomputed": self.precomputed,
+            "source": os.path.basename(self.source) if self.source else None
+        }
+
+
+def load_definition(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        if yaml is None:
+            raise ValueError("PyYAML is not installed; cannot load YAML questionnaires")
+        return yaml.safe_load(f)
+
+
+def builtin_definitions() -> list:
+    """
+    Questionnaires defined in code rather than in files. eq v1 is built from Eq_score, so its
+    SCORING_MATRIX and QUESTIONS stay the single source for both calculate_eq_score and the API.
+    """
+    return [{
+        "name": "eq",
+        "version": "1",
+        "parameters": list(Eq_score.PARAMETERS),
+        "questions": {
+            key: dict(Eq_score.QUESTIONS[key], scoring=Eq_score.SCORING_MATRIX[key])
+            for key in Eq_score.QUESTION_KEYS
+        }
+    }]
+
+
+class QuestionnaireRegistry:
+    """
+    Serves the built-in questionnaires (see builtin_definitions) plus every questionnaire file
+    (JSON, or YAML when PyYAML is installed) in a directory, indexed by (name, version). With auto_reload, lookups re-check file mtimes at most every
+    check_interval seconds and reload changed files without a restart; unchanged files keep their
+    already-precomputed tables. A file that fails to load is reported and its previous version,
+    if any, stays in service.
+    """
+
+    def __init__(self, directory: str = DEFAULT_QUESTIONNAIRE_DIR, precompute_limit: int = PRECOMPUTE_LIMIT,
+                 auto_reload: bool = True, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.directory = directory
+        self.precompute_limit = precompute_limit
+        self.auto_reload = auto_reload
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._files = {}           # path -> (mtime_ns, Questionnaire)
+        self._by_version = {}      # (name, version) -> Questionnaire
+        self._failed = {}          # path -> mtime_ns of files that did not load
+        self._last_check = 0.0
+        self.reload_count = 0
+        self.errors = {}
+        self._builtin = {}
+        for definition in builtin_definitions():
+            questionnaire = Questionnaire(definition, source=Eq_score.__file__, precompute_limit=precompute_limit)
+            self._builtin[(questionnaire.name, questionnaire.version)] = questionnaire
+        self.reload()
+
+    def _snapshot(self) -> dict:
+        if not os.path.isdir(self.directory):
+            return {}
+        snapshot = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(QUESTIONNAIRE_EXTENSIONS):
+                path = os.path.join(self.directory, filename)
+                snapshot[path] = os.stat(path).st_mtime_ns
+        return snapshot
+
+    def reload(self, force: bool = False) -> dict:
+        """
+        Re-reads new or modified files (every file when force=True) and swaps in the result.
+        Returns {"loaded": [...], "unchanged": n, "errors": {...}}.
+        """
+        with self._lock:
+            snapshot = self._snapshot()
+            files, failed, loaded, errors = {}, {}, [], {}
+            for path, mtime in snapshot.items():
+                previous = self._files.get(path)
+                if previous and previous[0] == mtime and not force:
+                    files[path] = previous
+                    continue
+                try:
+                    questionnaire = Questionnaire(load_definition(path), source=path, precompute_limit=self.precompute_limit)
+                    files[path] = (mtime, questionnaire)
+                    loaded.append(f"{questionnaire.name} v{questionnaire.version}")
+                except Exception as e:
+                    print(f"[ERROR] Failed to load questionnaire {path}: {e}")
+                    errors[os.path.basename(path)] = str(e)
+                    failed[path] = mtime
+                    if previous:
+                        files[path] = previous
+
+            by_version = dict(self._builtin)
+            for path, (_, questionnaire) in files.items():
+                key = (questionnaire.name, questionnaire.version)
+                if key in by_version:
+                    print(f"[ERROR] Duplicate questionnaire {key[0]} v{key[1]} in {path}; keeping {by_version[key].source}")
+                    continue
+                by_version[key] = questionnaire
+
+            self._files, self._by_version, self._failed = files, by_version, failed
+            self._last_check = time.monotonic()
+            self.errors = errors
+            if loaded:
+                self.reload_count += 1
+                print(f"[DEBUG] Loaded questionnaires: {', '.join(loaded)}")
+            return {"loaded": loaded, "unchanged": len(files) - len(loaded), "errors": errors}
+
+    def _maybe_reload(self):
+        if not self.auto_reload or time.monotonic() - self._last_check < self.check_interval:
+            return
+        known = {path: entry[0] for path, entry in self._files.items() if path not in self._failed}
+        known.update(self._failed)
+        if self._snapshot() != known:
+            self.reload()
+        else:
+            self._last_check = time.monotonic()
+
+    def get(self, name: str = "eq", version: str = None) -> Questionnaire:
+        """
+        Returns the requested version, or the highest version of `name` when version is None.
+        Raises KeyError when nothing matches.
+        """
+        self._maybe_reload()
+        by_version = self._by_version
+        if version is not None:
+            questionnaire = by_version.get((name, str(version)))
+            if questionnaire is None:
+                raise KeyError(f"Unknown questionnaire {name} v{version}")
+            return questionnaire
+        versions = [q for (q_name, _), q in by_version.items() if q_name == name]
+        if not versions:
+            raise KeyError(f"Unknown questionnaire {name}")
+        return max(versions, key=lambda q: version_key(q.version))
+
+    def list(self) -> list:
+        self._maybe_reload()
+        return [q.describe() for _, q in sorted(self._by_version.items(), key=lambda item: (item[0][0], version_key(item[0][1])))]
+
+
+if __name__ == "__main__":
+    from Eq_score import calculate_eq_score
+
+    registry = QuestionnaireRegistry(auto_reload=False)
+    questionnaire = registry.get("eq")
+    print(questionnaire.describe())
+
+    # The precomputed table must reproduce the scalar scorer for every answer set
+    all_answers = np.indices(questionnaire.choice_counts).reshape(len(questionnaire.question_keys), -1).T + 1
+    for row in all_answers.tolist():
+        responses = dict(zip(questionnaire.question_keys, row))
+        assert questionnaire.score(responses) == calculate_eq_score(responses), responses
+    print(f"Verified {len(all_answers)} answer sets against calculate_eq_score")
@@ -3,49 +3,77 @@ import os
 import re
 import string
 import json
-import PyPDF2
-import docx
+import asyncio
+import concurrent.futures
 from dotenv import load_dotenv
 from google import genai
+from google.genai import types
+from executors import PARSE_EXECUTOR, run_blocking, get_process_pool, submit_llm, LLM_CALL_TIMEOUT
+from document_extraction import open_resume, detect_format, extract_document
+from resume_condenser import condense_resume
+from local_skill_scorer import score_text as score_text_locally
+from circuit_breaker import CircuitBreaker
+from single_flight import SingleFlight
+from resume_cache import ResumeCache, content_hash, stream_hash, cache_key, DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
 
 # Load environment variables
 load_dotenv()
 
 # Configure Gemini API
 api_key = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=api_key)
+# The client-side timeout frees the LLM thread of a call whose caller already gave up on it
+client = genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=int(LLM_CALL_TIMEOUT * 1000)))
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    try:
-        with open(pdf_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception as e:
-        print(f"Error reading PDF file: {e}")
-    return text
+GEMINI_MODEL = "gemini-2.0-flash"
+# Bump whenever the prompt changes so cached scores from the old prompt are not reused
+# (2: resume text is condensed by resume_condenser before it is inlined)
+PROMPT_VERSION = "2"
 
-def extract_text_from_docx(docx_path):
-    text = ""
-    try:
-        doc = docx.Document(docx_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-    except Exception as e:
-        print(f"Error reading DOCX file: {e}")
-    return text
+# Seconds Gemini gets per resume before the local scorer answers instead
+LLM_LATENCY_BUDGET = float(os.getenv("LLM_LATENCY_BUDGET", 8.0))
+
+# Consecutive Gemini failures/timeouts open the breaker; while open, resumes are scored locally
+llm_breaker = CircuitBreaker(
+    "gemini-resume",
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", 30))
+)
+
+# Repeat uploads of the same file are served from here without a model call
+resume_cache = ResumeCache(
+    path=os.getenv("RESUME_CACHE_PATH", DEFAULT_CACHE_PATH),
+    ttl=float(os.getenv("RESUME_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+    max_entries=int(os.getenv("RESUME_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    max_bytes=int(os.getenv("RESUME_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+)
+
+# Concurrent uploads of the same file (double submits, client retries) share one analysis
+resume_flight = SingleFlight("resume")
 
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".pdf":
-        return extract_text_from_pdf(file_path)
-    elif ext in [".docx", ".doc"]:
-        return extract_text_from_docx(file_path)
-    else:
-        raise ValueError("Unsupported file format. Please use PDF or DOCX.")
+def extract_text_from_pdf(source):
+    return extract_text_with_stats(source, "pdf")[0]
+
+def extract_text_from_docx(source):
+    return extract_text_with_stats(source, "docx")[0]
+
+def extract_text_with_stats(source, document_format=None):
+    """
+    Extracts budgeted text (see document_extraction) and returns (text, stats), where stats holds
+    the format, pages/characters read, whether the budget cut the document short, and timing.
+    Large PDFs are split by page range across the extraction process pool.
+    """
+    text, stats = extract_document(source, document_format, process_pool=get_process_pool())
+    if stats.get("error"):
+        print(f"Error reading {stats['format'].upper()} file: {stats['error']}")
+    print(f"[DEBUG] Extracted {len(text)} chars from {stats['format'].upper()} in {stats.get('seconds', 0) * 1000:.1f} ms: {stats}")
+    return text, stats
+
+def extract_text(source):
+    """
+    Extracts text from a PDF or DOCX given as a path, bytes or binary file object.
+    The format is detected from the content, so the file name and extension do not matter.
+    """
+    return extract_text_with_stats(source)[0]
 
 def preprocess_text(text):
     text = text.lower()
@@ -70,14 +98,8 @@ def extract_score(result, score_type):
         print(f"[ERROR] Error extracting score: {str(e)}")
         return 0
 
-def analyze_with_gemini(resume_file_path):
-    """
-    Uses Gemini via the available 'generate' method in google-generativeai to analyze the resume text.
-    """
-    try:
-        resume_text = extract_text(resume_file_path)
-
-        prompt = f"""
+def build_prompt(resume_text):
+    return f"""
         Analyze the following resume text and critically assess the candidate's proficiency in both Frontend and Backend development based on their demonstrated experience, technologies, projects, and methodologies. 
 
         ### **Scoring Criteria:**  
@@ -98,41 +120,185 @@ def analyze_with_gemini(resume_file_path):
         {resume_text}
         """
 
+def score_resume_text(resume_text):
+    """
+    Scores extracted resume text with Gemini. The text is condensed first (skill-relevant sections
+    only, deduplicated and capped per section) to keep the prompt small.
+    Returns (frontend_score, backend_score), or None when the call or response failed.
+    """
+    try:
+        condensed_text, report = condense_resume(resume_text, dedupe_key=preprocess_text)
+        print(f"[DEBUG] Condensed resume from {report['original_tokens']} to {report['condensed_tokens']} tokens: {report}")
+
         response = client.models.generate_content(
-            model="gemini-2.0-flash",  
-            contents=prompt
+            model=GEMINI_MODEL,
+            contents=build_prompt(condensed_text)
         )
-        
+
         if response and response.text:
-            gemini_result = response.text  
+            gemini_result = response.text
             print(f"[DEBUG] Gemini Response: {gemini_result}")
-            
+            if not re.search(r"Score\s*:\s*\d+", gemini_result, re.IGNORECASE):
+                print("[ERROR] No scores found in the Gemini response.")
+                return None
+
             gemini_frontend_score = extract_score(gemini_result, "frontend")
             gemini_backend_score = extract_score(gemini_result, "backend")
-            
+
             return gemini_frontend_score, gemini_backend_score
         else:
             print("[ERROR] Failed to get valid response from Gemini.")
-            return 0, 0
+            return None
+    except Exception as e:
+        print(f"[ERROR] Error analyzing with Gemini: {str(e)}")
+        return None
+
+def local_scores(resume_text, reason):
+    result = score_text_locally(resume_text)
+    print(f"[DEBUG] Scored resume locally ({reason}): {result}")
+    return (result["frontend_score"], result["backend_score"]), "local"
+
+def settle_llm_scores(resume_text, scores):
+    if scores is not None:
+        llm_breaker.record_success()
+        return scores, "llm"
+    llm_breaker.record_failure()
+    return local_scores(resume_text, "llm_error")
+
+def score_with_fallback(resume_text):
+    """
+    Scores resume text with Gemini within LLM_LATENCY_BUDGET, falling back to the local scorer.
+    Returns ((frontend_score, backend_score), source) where source is "llm" or "local"
+    (Gemini failed, went over budget, its circuit breaker is open or too many calls are pending).
+    """
+    if not llm_breaker.allow():
+        return local_scores(resume_text, "circuit_open")
+    future = submit_llm(score_resume_text, resume_text)
+    if future is None:
+        # The pool is full of calls still waiting on Gemini, which counts against it like a timeout
+        llm_breaker.record_failure()
+        return local_scores(resume_text, "llm_saturated")
+    try:
+        scores = future.result(timeout=LLM_LATENCY_BUDGET)
+    except concurrent.futures.TimeoutError:
+        llm_breaker.record_failure()
+        return local_scores(resume_text, "timeout")
+    return settle_llm_scores(resume_text, scores)
+
+async def score_with_fallback_async(resume_text):
+    """
+    Non-blocking score_with_fallback.
+    """
+    if not llm_breaker.allow():
+        return local_scores(resume_text, "circuit_open")
+    future = submit_llm(score_resume_text, resume_text)
+    if future is None:
+        # The pool is full of calls still waiting on Gemini, which counts against it like a timeout
+        llm_breaker.record_failure()
+        return local_scores(resume_text, "llm_saturated")
+    try:
+        scores = await asyncio.wait_for(asyncio.wrap_future(future), LLM_LATENCY_BUDGET)
+    except asyncio.TimeoutError:
+        llm_breaker.record_failure()
+        return local_scores(resume_text, "timeout")
+    return settle_llm_scores(resume_text, scores)
+
+def analyze_with_gemini(resume_source):
+    """
+    Uses Gemini via the available 'generate' method in google-generativeai to analyze the resume text.
+    Falls back to the local scorer instead of returning zeros when Gemini is failing or slow.
+    """
+    try:
+        resume_text = extract_text(resume_source)
+        return score_with_fallback(resume_text)[0]
     except Exception as e:
         print(f"[ERROR] Error analyzing with Gemini: {str(e)}")
         return 0, 0
 
-def analyze_resume(file_path):
+def lookup_resume_cache(stream, content_digest=None):
     """
-    Analyzes a resume file and returns frontend and backend scores.
+    Returns (cache key, cached result or None) for a resume stream.
+    The stream is hashed unless its content_digest is already known.
     """
-    print(f"\n[DEBUG] Starting resume analysis for file: {file_path}")
-    
-    gemini_frontend_score, gemini_backend_score = analyze_with_gemini(file_path)
-    
-    final_frontend_score = gemini_frontend_score
-    final_backend_score = gemini_backend_score
-    
-    print(f"[DEBUG] Resume Analysis - Frontend Score: {final_frontend_score}/100")
-    print(f"[DEBUG] Resume Analysis - Backend Score: {final_backend_score}/100")
+    key = cache_key(content_digest or stream_hash(stream), PROMPT_VERSION, GEMINI_MODEL)
+    return key, resume_cache.get(key)
+
+def store_resume_scores(key, resume_text, scores):
+    # Unreadable files and failed model calls are retried on the next upload. Local fallback
+    # scores are never passed in here, so the next upload gets another chance at Gemini.
+    if scores is not None and resume_text.strip():
+        resume_cache.put(key, resume_text, *scores)
+
+def resume_result(frontend_score, backend_score, score_source):
+    print(f"[DEBUG] Resume Analysis - Frontend Score: {frontend_score}/100")
+    print(f"[DEBUG] Resume Analysis - Backend Score: {backend_score}/100 (source: {score_source})")
     
     return {
-        "frontend_score": final_frontend_score, 
-        "backend_score": final_backend_score
-    } 
\ No newline at end of file
+        "frontend_score": frontend_score, 
+        "backend_score": backend_score,
+        "score_source": score_source
+    }
+
+def analyze_resume(source):
+    """
+    Analyzes a resume (file path, bytes or binary file object) and returns frontend and backend scores.
+    Results are cached by file content, prompt version and model; failed analyses are not cached.
+    "score_source" in the result is "cache", "llm" or "local" (see score_with_fallback).
+    """
+    stream = open_resume(source)
+    print(f"\n[DEBUG] Starting resume analysis for: {source if isinstance(source, str) else type(source).__name__}")
+
+    key, cached = lookup_resume_cache(stream)
+    if cached:
+        print("[DEBUG] Resume analysis cache hit")
+        return resume_result(cached["frontend_score"], cached["backend_score"], "cache")
+
+    try:
+        resume_text = extract_text(stream)
+    except Exception as e:
+        print(f"[ERROR] Error analyzing resume: {str(e)}")
+        resume_text = ""
+    scores, source = score_with_fallback(resume_text)
+    store_resume_scores(key, resume_text, scores if source == "llm" else None)
+    return resume_result(*scores, source)
+
+async def analyze_resume_async(source, content_digest=None):
+    """
+    Non-blocking analyze_resume for the API. Hashing, cache I/O and parsing run on PARSE_EXECUTOR
+    and the synchronous Gemini call on LLM_EXECUTOR, so the event loop keeps serving other requests.
+    """
+    stream = await run_blocking(PARSE_EXECUTOR, open_resume, source)
+    print(f"\n[DEBUG] Starting resume analysis for: {source if isinstance(source, str) else type(source).__name__}")
+
+    key, cached = await run_blocking(PARSE_EXECUTOR, lookup_resume_cache, stream, content_digest)
+    if cached:
+        print("[DEBUG] Resume analysis cache hit")
+        return resume_result(cached["frontend_score"], cached["backend_score"], "cache")
+
+    try:
+        resume_text = await run_blocking(PARSE_EXECUTOR, extract_text, stream)
+    except Exception as e:
+        print(f"[ERROR] Error analyzing resume: {str(e)}")
+        resume_text = ""
+    scores, source = await score_with_fallback_async(resume_text)
+    await run_blocking(PARSE_EXECUTOR, store_resume_scores, key, resume_text, scores if source == "llm" else None)
+    return resume_result(*scores, source)
+
+def read_resume(source):
+    """
+    Returns (bytes, content hash) of a resume path, bytes or binary file object.
+    """
+    stream = open_resume(source)
+    data = stream.read()
+    stream.seek(0)
+    return data, content_hash(data)
+
+async def analyze_resume_coalesced(source):
+    """
+    analyze_resume_async, with concurrent calls for the same file content merged into one analysis
+    (see resume_flight.stats()). The shared analysis works on its own copy of the bytes, so it is
+    unaffected by any one caller closing its upload or disconnecting.
+    """
+    data, digest = await run_blocking(PARSE_EXECUTOR, read_resume, source)
+    key = cache_key(digest, PROMPT_VERSION, GEMINI_MODEL)
+    return await resume_flight.do(key, lambda: analyze_resume_async(data, content_digest=digest))
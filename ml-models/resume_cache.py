@@ -0,0 +1,128 @@
+# resume_cache.py
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from sqlite_lru import SQLiteLRU
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def stream_hash(stream, chunk_size: int = 1 << 16) -> str:
+    """
+    content_hash of a seekable binary stream, read in chunks; the stream is rewound afterwards.
+    """
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def cache_key(content_digest: str, prompt_version: str, model: str) -> str:
+    """
+    Results depend on the file bytes and on how they were scored, so a prompt or model change
+    produces new keys instead of serving stale scores.
+    """
+    return f"{model}:{prompt_version}:{content_digest}"
+
+
+class ResumeCache:
+    """
+    Persistent SQLite cache of resume analysis results keyed by cache_key(): extracted text plus
+    the parsed frontend/backend scores. Entries expire after ttl seconds; past max_entries or
+    max_bytes (stored text size) the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resume_results (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                frontend_score NUMERIC NOT NULL,
+                backend_score NUMERIC NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS resume_results_last_access ON resume_results (last_access)")
+        self._lru = SQLiteLRU(self._connection, "resume_results", max_entries, max_bytes,
+                              expiry_rules=[("created_at < ?", ttl)])
+
+    def get(self, key: str):
+        """
+        Returns {"text", "frontend_score", "backend_score"} or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT text, frontend_score, backend_score, created_at FROM resume_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl is not None and now - row[3] > self.ttl:
+                self._lru.delete(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE resume_results SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return {"text": row[0], "frontend_score": row[1], "backend_score": row[2]}
+
+    def put(self, key: str, text: str, frontend_score: float, backend_score: float):
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self.evictions += self._lru.insert(
+                "INSERT OR REPLACE INTO resume_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, text, frontend_score, backend_score, size, now, now),
+                key, size, now
+            )
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._lru.recount()
+            count, total_bytes = self._lru.count, self._lru.bytes
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,188 @@
+# resume_condenser.py
+# Shrinks extracted resume text before it is inlined into the scoring prompt: keeps the sections
+# that carry skill evidence, drops contact details and boilerplate, removes repeated lines and caps
+# each section to a token budget.
+import re
+import math
+import string
+
+# Header phrases (after normalize_line) mapped to the section they start
+SECTION_HEADERS = {
+    "summary": ["summary", "profile", "professional summary", "career summary", "about me", "objective",
+                "career objective", "professional profile"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "skills and tools", "technologies",
+               "tech stack", "technical expertise", "tools and technologies", "competencies", "core competencies"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "internships", "internship", "internship experience", "relevant experience"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects", "project experience",
+                 "side projects", "open source", "open source contributions"],
+    "education": ["education", "academic background", "academics", "qualifications", "educational qualifications"],
+    "certifications": ["certifications", "certificates", "courses", "certifications and courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments", "awards and achievements",
+                     "hackathons", "publications", "positions of responsibility", "leadership"],
+    "contact": ["contact", "contact details", "contact information", "personal details", "personal information"],
+    "references": ["references", "referees"],
+    "interests": ["interests", "hobbies", "hobbies and interests", "extracurricular activities", "extra curricular activities"],
+    "languages": ["languages known", "spoken languages"],
+    "declaration": ["declaration"]
+}
+HEADER_TO_SECTION = {header: section for section, headers in SECTION_HEADERS.items() for header in headers}
+
+# Sections with no skill evidence for the scoring prompt
+DROPPED_SECTIONS = {"contact", "references", "interests", "languages", "declaration"}
+
+# Approximate tokens allowed per kept section; "other" is text before the first recognized header
+SECTION_TOKEN_BUDGETS = {
+    "skills": 400,
+    "experience": 900,
+    "projects": 900,
+    "summary": 150,
+    "education": 150,
+    "certifications": 150,
+    "achievements": 200,
+    "other": 300
+}
+
+# Used for documents without any recognized section headers
+UNSTRUCTURED_TOKEN_BUDGET = 2500
+
+CHARS_PER_TOKEN = 4
+MAX_HEADER_CHARS = 50
+
+CONTACT_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+"                      # email
+    r"|(?:\+?\d[\d\s().-]{7,}\d)"                   # phone number
+    r"|(?:https?://|www\.)?linkedin\.com/\S*",      # LinkedIn URL
+    re.IGNORECASE
+)
+HEADER_PUNCTUATION = str.maketrans("", "", string.punctuation.replace("&", ""))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about four characters per token for English text).
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line.lower().translate(HEADER_PUNCTUATION).replace("&", "and")).strip()
+
+
+def detect_section(line: str):
+    """
+    Returns the section a header line starts, or None for ordinary content lines.
+    """
+    if len(line) > MAX_HEADER_CHARS:
+        return None
+    return HEADER_TO_SECTION.get(normalize_line(line))
+
+
+def split_sections(text: str) -> list:
+    """
+    Splits resume text into [(section, [lines])] in document order. A header is a short line such as
+    "Technical Skills" or an inline "Skills: ..." prefix. Lines before the first recognized header
+    belong to "other"; whitespace inside lines is collapsed and blank lines dropped.
+    """
+    sections = [("other", [])]
+    for raw_line in text.splitlines():
+        line = re.sub(r"\s+", " ", raw_line).strip()
+        if not line:
+            continue
+        section = detect_section(line)
+        if section:
+            sections.append((section, []))
+            continue
+        # Inline headers such as "Skills: React, Node.js" start a section and keep their content
+        prefix, separator, rest = line.partition(":")
+        section = detect_section(prefix) if separator and rest.strip() else None
+        if section:
+            sections.append((section, [rest.strip()]))
+        else:
+            sections[-1][1].append(line)
+    return [(section, lines) for section, lines in sections if lines or section != "other"]
+
+
+def cap_lines(lines: list, token_budget: int) -> (list, bool):
+    """
+    Keeps whole lines until the token budget is reached, cutting the last line at a word boundary.
+    Returns (lines, truncated).
+    """
+    kept = []
+    char_budget = token_budget * CHARS_PER_TOKEN
+    for line in lines:
+        if len(line) + 1 <= char_budget:
+            kept.append(line)
+            char_budget -= len(line) + 1
+            continue
+        if char_budget > 20:
+            kept.append(line[:char_budget].rsplit(" ", 1)[0])
+        return kept, True
+    return kept, False
+
+
+def condense_resume(text: str, dedupe_key=None) -> (str, dict):
+    """
+    Returns (condensed text, report). dedupe_key maps a line to the key used to detect repeats
+    (resume_analysis passes preprocess_text); by default lines are compared case-insensitively.
+    """
+    dedupe_key = dedupe_key or (lambda line: line.lower())
+    sections = split_sections(text)
+    structured = any(section != "other" for section, _ in sections)
+
+    seen = set()
+    duplicate_lines = 0
+    contact_lines = 0
+    kept_sections = []
+    dropped_sections = []
+    truncated_sections = []
+    section_tokens = {}
+
+    for section, lines in sections:
+        if section in DROPPED_SECTIONS:
+            dropped_sections.append(section)
+            continue
+
+        unique_lines = []
+        for line in lines:
+            key = dedupe_key(line)
+            if not key:
+                continue
+            if key in seen:
+                duplicate_lines += 1
+                continue
+            seen.add(key)
+            # Contact details live in the preamble; lines that are nothing but contact info are dropped
+            if section == "other" and CONTACT_PATTERN.search(line) and len(CONTACT_PATTERN.sub("", line).strip(" |,;:-")) < 3:
+                contact_lines += 1
+                continue
+            unique_lines.append(line)
+
+        budget = SECTION_TOKEN_BUDGETS.get(section, SECTION_TOKEN_BUDGETS["other"]) if structured else UNSTRUCTURED_TOKEN_BUDGET
+        capped_lines, truncated = cap_lines(unique_lines, budget)
+        if truncated:
+            truncated_sections.append(section)
+        if not capped_lines:
+            continue
+
+        body = "\n".join(capped_lines)
+        section_tokens[section] = section_tokens.get(section, 0) + estimate_tokens(body)
+        kept_sections.append(body if section == "other" else f"{section.title()}:\n{body}")
+
+    condensed = "\n\n".join(kept_sections)
+    original_tokens = estimate_tokens(text)
+    condensed_tokens = estimate_tokens(condensed)
+    report = {
+        "original_chars": len(text),
+        "condensed_chars": len(condensed),
+        "original_tokens": original_tokens,
+        "condensed_tokens": condensed_tokens,
+        "reduction": round(1 - condensed_tokens / original_tokens, 3) if original_tokens else 0.0,
+        "structured": structured,
+        "section_tokens": section_tokens,
+        "dropped_sections": dropped_sections,
+        "truncated_sections": truncated_sections,
+        "duplicate_lines": duplicate_lines,
+        "contact_lines": contact_lines
+    }
+    return condensed, report
@@ -0,0 +1,75 @@
+# single_flight.py
+import asyncio
+from collections import OrderedDict
+
+# Per-key metrics are kept for this many most recently seen keys
+MAX_TRACKED_KEYS = 1000
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key: the first caller starts the computation,
+    callers arriving while it is in flight await the same result (or exception). Once it finishes
+    the key is released, so later calls compute afresh (caching is left to the layers below).
+
+    The shared task is shielded, so a caller that is cancelled (e.g. a client disconnect) does not
+    cancel the computation for the others.
+    """
+
+    def __init__(self, name: str, max_tracked_keys: int = MAX_TRACKED_KEYS):
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+        self._in_flight = {}
+        self._key_metrics = OrderedDict()
+        self.calls = 0
+        self.executions = 0
+        self.merged = 0
+        self.max_waiters = 0
+
+    async def do(self, key, factory):
+        """
+        Returns the result of factory() (a zero-argument function returning an awaitable),
+        sharing one execution among all concurrent callers with the same key.
+        """
+        metrics = self._track(key)
+        self.calls += 1
+        metrics["calls"] += 1
+
+        entry = self._in_flight.get(key)
+        if entry is None:
+            entry = {"task": asyncio.ensure_future(factory()), "waiters": 1}
+            self._in_flight[key] = entry
+            entry["task"].add_done_callback(lambda _, key=key: self._in_flight.pop(key, None))
+            self.executions += 1
+            metrics["executions"] += 1
+        else:
+            entry["waiters"] += 1
+            self.merged += 1
+            metrics["merged"] += 1
+            self.max_waiters = max(self.max_waiters, entry["waiters"])
+            metrics["max_waiters"] = max(metrics["max_waiters"], entry["waiters"])
+
+        return await asyncio.shield(entry["task"])
+
+    def _track(self, key) -> dict:
+        metrics = self._key_metrics.pop(key, None) or {"calls": 0, "executions": 0, "merged": 0, "max_waiters": 1}
+        self._key_metrics[key] = metrics
+        while len(self._key_metrics) > self.max_tracked_keys:
+            self._key_metrics.popitem(last=False)
+        return metrics
+
+    def stats(self, top: int = 20) -> dict:
+        """
+        Totals plus the `top` keys with the most merged calls.
+        """
+        busiest = sorted(self._key_metrics.items(), key=lambda item: item[1]["merged"], reverse=True)[:top]
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "merged": self.merged,
+            "in_flight": len(self._in_flight),
+            "max_waiters": self.max_waiters,
+            "merge_rate": round(self.merged / self.calls, 4) if self.calls else None,
+            "keys": {str(key): dict(metrics) for key, metrics in busiest if metrics["merged"]}
+        }
@@ -0,0 +1,6 @@
+# skill_vocabulary.py
+# Keyword vocabularies shared by the GitHub repo classifier and the local resume scorer.
+
+# Define keywords lists for repository classification
+FRONTEND_KEYWORDS = ["react", "vue", "angular", "css", "html", "sass", "less", "bootstrap", "tailwind", "webpack", "vite", "ui", "frontend", "jsx"]
+BACKEND_KEYWORDS = ["node", "express", "django", "flask", "spring", "api", "server", "database", "sql", "nosql", "mongodb", "postgres", "mysql", "backend", "microservice"]
@@ -0,0 +1,90 @@
+# sqlite_lru.py
+import time
+
+# Expired entries are swept at most this often; lookups still refuse expired entries in between
+DEFAULT_SWEEP_INTERVAL_SECONDS = 60.0
+
+
+class SQLiteLRU:
+    """
+    Size, TTL and LRU bookkeeping for a SQLite cache table with key, size, created_at and
+    last_access columns. Entry and byte totals are counted once and then kept up to date by
+    insert() and delete(), so a put does not scan the table. Expiry rules are swept every
+    sweep_interval seconds, and the LRU walk only runs once an insert takes the totals past
+    max_entries or max_bytes.
+
+    Other processes may write to the same file (the batch scorer and the API share the resume
+    cache), so the totals are recounted on every sweep; in between they can lag those writes.
+    Callers serialize access with their own lock.
+    """
+
+    def __init__(self, connection, table: str, max_entries: int, max_bytes: int, expiry_rules: list = (),
+                 sweep_interval: float = DEFAULT_SWEEP_INTERVAL_SECONDS):
+        """
+        expiry_rules: (where, max_age) pairs; rows matching `where` with its "?" bound to
+        now - max_age are expired. Rules with max_age None are skipped.
+        """
+        self.connection = connection
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.expiry_rules = [(where, max_age) for where, max_age in expiry_rules if max_age is not None]
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self.recount()
+
+    def recount(self):
+        self.count, self.bytes = self.connection.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+
+    def insert(self, sql: str, params: tuple, key: str, size: int, now: float) -> int:
+        """
+        Runs an INSERT OR REPLACE for key and evicts as needed. Returns the number of rows evicted.
+        """
+        previous = self.connection.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        self.connection.execute(sql, params)
+        if previous is None:
+            self.count += 1
+        self.bytes += size - (previous[0] if previous else 0)
+        return self.evict(now)
+
+    def delete(self, key: str):
+        row = self.connection.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self.connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self.count -= 1
+            self.bytes -= row[0]
+
+    def _sweep(self, now: float) -> int:
+        """
+        Deletes expired entries and recounts the totals. Returns the number of rows deleted.
+        """
+        self._last_sweep = time.monotonic()
+        deleted = 0
+        for where, max_age in self.expiry_rules:
+            deleted += self.connection.execute(f"DELETE FROM {self.table} WHERE {where}", (now - max_age,)).rowcount
+        self.recount()
+        return deleted
+
+    def clear(self):
+        self.connection.execute(f"DELETE FROM {self.table}")
+        self.count = self.bytes = 0
+
+    def evict(self, now: float) -> int:
+        evicted = 0
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            evicted += self._sweep(now)
+        if self.count <= self.max_entries and self.bytes <= self.max_bytes:
+            return evicted
+
+        # Walk entries from least to most recently used until both limits hold again
+        doomed = []
+        for key, size in self.connection.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access"):
+            if self.count <= self.max_entries and self.bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self.count -= 1
+            self.bytes -= size
+        self.connection.executemany(f"DELETE FROM {self.table} WHERE key = ?", doomed)
+        return evicted + len(doomed)
@@ -0,0 +1,110 @@
+# team_fitness.py
+import numpy as np
+from match_score import MatchScoreCalculator
+
+DEFAULT_FITNESS_WEIGHTS = {
+    "pairwise": 0.5,
+    "coverage": 0.3,
+    "eq": 0.2
+}
+
+# Points subtracted per point of EQ standard deviation / frontend-backend coverage gap
+DEFAULT_EQ_VARIANCE_PENALTY = 0.25
+DEFAULT_MISMATCH_PENALTY = 0.1
+
+
+class TeamFitnessScorer:
+    """
+    Scores whole teams rather than pairs. For a batch of B teams of up to M members
+    (a B x M x 3 array of frontend, backend and EQ scores) it combines, in one NumPy pass:
+      - pairwise: mean match score over every member pair (MatchScoreCalculator formula)
+      - coverage: mean of the team's best frontend and best backend score
+      - eq: mean EQ of the members
+    minus a variance penalty on EQ spread and a mismatch penalty on the gap between
+    frontend and backend coverage. Fitness is clipped to 0-100.
+    """
+
+    def __init__(self, calculator: MatchScoreCalculator = None, weights: dict = None,
+                 eq_variance_penalty: float = DEFAULT_EQ_VARIANCE_PENALTY,
+                 mismatch_penalty: float = DEFAULT_MISMATCH_PENALTY):
+        self.calculator = calculator or MatchScoreCalculator()
+        self.weights = dict(DEFAULT_FITNESS_WEIGHTS)
+        if weights:
+            self.weights.update({k: v for k, v in weights.items() if k in DEFAULT_FITNESS_WEIGHTS})
+        for value in self.weights.values():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+                raise ValueError("Fitness weights must be numbers")
+        if any(value < 0 for value in self.weights.values()) or sum(self.weights.values()) <= 0:
+            raise ValueError("Fitness weights must be non-negative and must not sum to zero")
+        self.eq_variance_penalty = eq_variance_penalty
+        self.mismatch_penalty = mismatch_penalty
+
+    def score(self, teams, mask=None) -> dict:
+        """
+        teams: (B, M, 3) array. mask: optional (B, M) bool array marking real members, for
+        batches whose teams have different sizes (padding rows are ignored).
+        Returns a dict of (B,) arrays: fitness and each component.
+        """
+        teams = np.asarray(teams, dtype=np.float64)
+        if teams.ndim != 3 or teams.shape[2] != 3:
+            raise ValueError("teams must have shape (B, M, 3)")
+        if mask is None:
+            mask = np.ones(teams.shape[:2], dtype=bool)
+        else:
+            mask = np.asarray(mask, dtype=bool)
+        member_counts = mask.sum(axis=1)
+        if np.any(member_counts < 2):
+            raise ValueError("Every team needs at least two members")
+
+        # Padding rows get a valid placeholder score so range checks pass; they are masked below
+        teams = np.where(mask[:, :, None], teams, 0.0)
+        frontend, backend, eq = teams[:, :, 0], teams[:, :, 1], teams[:, :, 2]
+
+        pair_scores = self.calculator.calculate_combined_scores_array(
+            frontend[:, :, None], backend[:, :, None], eq[:, :, None],
+            frontend[:, None, :], backend[:, None, :], eq[:, None, :]
+        )
+        upper = np.triu(np.ones(teams.shape[1:2] * 2, dtype=bool), k=1)
+        pair_mask = mask[:, :, None] & mask[:, None, :] & upper
+        pairwise = (pair_scores * pair_mask).sum(axis=(1, 2)) / pair_mask.sum(axis=(1, 2))
+
+        best_frontend = np.where(mask, frontend, -np.inf).max(axis=1)
+        best_backend = np.where(mask, backend, -np.inf).max(axis=1)
+        coverage = (best_frontend + best_backend) / 2
+        coverage_gap = np.abs(best_frontend - best_backend)
+
+        eq_mean = (eq * mask).sum(axis=1) / member_counts
+        eq_std = np.sqrt((((eq - eq_mean[:, None]) ** 2) * mask).sum(axis=1) / member_counts)
+
+        total_weight = sum(self.weights.values())
+        fitness = (
+            self.weights["pairwise"] * pairwise
+            + self.weights["coverage"] * coverage
+            + self.weights["eq"] * eq_mean
+        ) / total_weight
+        fitness = fitness - self.eq_variance_penalty * eq_std - self.mismatch_penalty * coverage_gap
+        fitness = np.clip(fitness, 0, 100)
+
+        return {
+            "fitness": fitness,
+            "pairwise": pairwise,
+            "coverage": coverage,
+            "eq_mean": eq_mean,
+            "eq_std": eq_std,
+            "coverage_gap": coverage_gap
+        }
+
+
+def teams_to_array(teams: list) -> (np.ndarray, np.ndarray):
+    """
+    Converts a list of teams (each a list of {"frontend", "backend", "eq"} dicts) into a padded
+    (B, M, 3) array and its (B, M) member mask, with the same defaults as calculate_combined_score.
+    """
+    width = max((len(team) for team in teams), default=0)
+    array = np.zeros((len(teams), width, 3), dtype=np.float64)
+    mask = np.zeros((len(teams), width), dtype=bool)
+    for team_index, team in enumerate(teams):
+        for member_index, member in enumerate(team):
+            array[team_index, member_index] = (member.get("frontend", 0), member.get("backend", 0), member.get("eq", 50))
+        mask[team_index, :len(team)] = True
+    return array, mask
@@ -0,0 +1,261 @@
+# team_partition.py
+import time
+import numpy as np
+
+# Without an explicit patience, the search stops after this many consecutive non-improving samples
+# per candidate (at least MIN_PATIENCE), so small pools converge long before the time budget
+PATIENCE_PER_CANDIDATE = 8
+MIN_PATIENCE = 500
+
+
+def get_team_sizes(pool_size: int, team_size: int) -> list:
+    """
+    Splits a pool into ceil(pool_size / team_size) teams whose sizes differ by at most one,
+    so an uneven pool gives a few teams of team_size - 1 instead of one tiny leftover team.
+    """
+    if team_size < 1:
+        raise ValueError("team_size must be at least 1")
+    if pool_size == 0:
+        return []
+    team_count = -(-pool_size // team_size)
+    base, extra = divmod(pool_size, team_count)
+    return [base + 1] * extra + [base] * (team_count - extra)
+
+
+def greedy_seed(score_matrix: np.ndarray, team_sizes: list) -> list:
+    """
+    Builds an initial partition. Candidates with the lowest total match score seed the teams
+    (they are the hardest to place), and each team then repeatedly adds the unassigned candidate
+    with the highest summed score against its current members.
+    """
+    pool_size = score_matrix.shape[0]
+    order = np.argsort(score_matrix.sum(axis=1, dtype=np.float64), kind="stable")
+    penalty = np.zeros(pool_size, dtype=np.float64)
+    next_seed = 0
+    teams = []
+
+    for size in team_sizes:
+        while penalty[order[next_seed]] == -np.inf:
+            next_seed += 1
+        seed = int(order[next_seed])
+        penalty[seed] = -np.inf
+        members = [seed]
+        gain = score_matrix[seed].astype(np.float64)
+
+        for _ in range(size - 1):
+            candidate = int(np.argmax(gain + penalty))
+            members.append(candidate)
+            penalty[candidate] = -np.inf
+            gain += score_matrix[candidate]
+
+        teams.append(members)
+    return teams
+
+
+class TeamPartitioner:
+    """
+    Partitions a candidate pool into teams, maximizing the total pairwise match score inside
+    teams. Works from a precomputed symmetric score matrix (see MatchMatrixEngine): a greedy
+    seed is refined by sampled swap/move local search until the time or iteration budget runs out.
+    """
+
+    def __init__(self, score_matrix: np.ndarray, team_size: int, time_budget: float = 2.0,
+                 max_iterations: int = 1_000_000, sample_size: int = 64, patience: int = None,
+                 seed: int = None):
+        score_matrix = np.asarray(score_matrix)
+        if score_matrix.ndim != 2 or score_matrix.shape[0] != score_matrix.shape[1]:
+            raise ValueError("score_matrix must be a square matrix")
+        if team_size < 1:
+            raise ValueError("team_size must be at least 1")
+        self.score_matrix = score_matrix
+        self.pool_size = score_matrix.shape[0]
+        self.team_size = team_size
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.sample_size = sample_size
+        # Stop early after this many consecutive samples without an improving step
+        if patience is None:
+            patience = max(MIN_PATIENCE, PATIENCE_PER_CANDIDATE * self.pool_size)
+        self.patience = patience
+        self.rng = np.random.default_rng(seed)
+
+    def _load_teams(self, teams: list):
+        width = max((len(team) for team in teams), default=0)
+        self.members = np.full((len(teams), width), -1, dtype=np.int64)
+        self.sizes = np.array([len(team) for team in teams], dtype=np.int64)
+        self.team_of = np.empty(self.pool_size, dtype=np.int64)
+        self.slot_of = np.empty(self.pool_size, dtype=np.int64)
+        for team_index, team in enumerate(teams):
+            self.members[team_index, :len(team)] = team
+            self.team_of[team] = team_index
+            self.slot_of[team] = np.arange(len(team))
+        self.inner = self._team_sums()
+
+    def _team_sums(self) -> np.ndarray:
+        """
+        Each candidate's summed score against their own teammates.
+        """
+        inner = np.zeros(self.pool_size, dtype=np.float64)
+        if self.pool_size == 0:
+            return inner
+        mask = self.members >= 0
+        safe = np.where(mask, self.members, 0)
+        block = self.score_matrix[safe[:, :, None], safe[:, None, :]].astype(np.float64)
+        block *= mask[:, :, None] & mask[:, None, :]
+        diagonal = np.einsum("tii->ti", block)
+        row_sums = block.sum(axis=2) - diagonal
+        inner[self.members[mask]] = row_sums[mask]
+        return inner
+
+    def objective(self) -> float:
+        return float(self.inner.sum() / 2)
+
+    def _try_improve(self) -> str:
+        """
+        Samples one candidate and a batch of partners, then applies the best improving swap or move.
+        """
+        matrix = self.score_matrix
+        i = int(self.rng.integers(self.pool_size))
+        team_a = self.team_of[i]
+        others = self.rng.integers(self.pool_size, size=self.sample_size)
+        others = others[self.team_of[others] != team_a]
+        if others.size == 0:
+            return None
+
+        teams_b = self.team_of[others]
+        members_b = self.members[teams_b]
+        mask_b = members_b >= 0
+        members_a = self.members[team_a]
+        mask_a = members_a >= 0
+
+        row_i = matrix[i]
+        score_i_to_b = (row_i[np.where(mask_b, members_b, 0)] * mask_b).sum(axis=1, dtype=np.float64)
+        score_j_to_a = (matrix[others[:, None], np.where(mask_a, members_a, 0)[None, :]] * mask_a).sum(axis=1, dtype=np.float64)
+        score_i_j = row_i[others].astype(np.float64)
+
+        # Swapping i and j: i joins B without j, j joins A without i
+        swap_delta = (score_i_to_b - score_i_j) + (score_j_to_a - score_i_j) - self.inner[i] - self.inner[others]
+        # Moving i into B keeps the size multiset only when A is exactly one larger than B
+        move_allowed = self.sizes[team_a] == self.sizes[teams_b] + 1
+        move_delta = np.where(move_allowed, score_i_to_b - self.inner[i], -np.inf)
+
+        best_swap = int(np.argmax(swap_delta))
+        best_move = int(np.argmax(move_delta))
+        if max(swap_delta[best_swap], move_delta[best_move]) <= 1e-9:
+            return None
+
+        if swap_delta[best_swap] >= move_delta[best_move]:
+            j = int(others[best_swap])
+            self._apply_swap(i, j, score_i_to_b[best_swap] - score_i_j[best_swap], score_j_to_a[best_swap] - score_i_j[best_swap])
+            return "swap"
+        self._apply_move(i, int(teams_b[best_move]), score_i_to_b[best_move])
+        return "move"
+
+    def _apply_swap(self, i: int, j: int, new_inner_i: float, new_inner_j: float):
+        matrix = self.score_matrix
+        team_a, team_b = self.team_of[i], self.team_of[j]
+        rest_a = self.members[team_a, :self.sizes[team_a]]
+        rest_a = rest_a[rest_a != i]
+        rest_b = self.members[team_b, :self.sizes[team_b]]
+        rest_b = rest_b[rest_b != j]
+
+        self.inner[rest_a] += matrix[rest_a, j].astype(np.float64) - matrix[rest_a, i]
+        self.inner[rest_b] += matrix[rest_b, i].astype(np.float64) - matrix[rest_b, j]
+        self.inner[i] = new_inner_i
+        self.inner[j] = new_inner_j
+
+        slot_i, slot_j = self.slot_of[i], self.slot_of[j]
+        self.members[team_a, slot_i] = j
+        self.members[team_b, slot_j] = i
+        self.slot_of[i], self.slot_of[j] = slot_j, slot_i
+        self.team_of[i], self.team_of[j] = team_b, team_a
+
+    def _apply_move(self, i: int, team_b: int, new_inner_i: float):
+        matrix = self.score_matrix
+        team_a = self.team_of[i]
+        rest_a = self.members[team_a, :self.sizes[team_a]]
+        rest_a = rest_a[rest_a != i]
+        current_b = self.members[team_b, :self.sizes[team_b]]
+
+        self.inner[rest_a] -= matrix[rest_a, i]
+        self.inner[current_b] += matrix[current_b, i]
+        self.inner[i] = new_inner_i
+
+        # Fill i's slot in A with A's last member, then append i to B
+        last_slot = self.sizes[team_a] - 1
+        last_member = self.members[team_a, last_slot]
+        self.members[team_a, self.slot_of[i]] = last_member
+        self.slot_of[last_member] = self.slot_of[i]
+        self.members[team_a, last_slot] = -1
+        self.sizes[team_a] -= 1
+
+        self.members[team_b, self.sizes[team_b]] = i
+        self.slot_of[i] = self.sizes[team_b]
+        self.sizes[team_b] += 1
+        self.team_of[i] = team_b
+
+    def solve(self) -> dict:
+        """
+        Runs the greedy seed and local search. Returns the teams (lists of pool indices),
+        per-team fitness (mean pairwise match score), the objective and search statistics.
+        """
+        start = time.perf_counter()
+        team_sizes = get_team_sizes(self.pool_size, self.team_size)
+        self._load_teams(greedy_seed(self.score_matrix, team_sizes))
+        seed_objective = self.objective()
+        seed_seconds = time.perf_counter() - start
+
+        deadline = start + self.time_budget
+        iterations = swaps = moves = idle = 0
+        stopped_by = "max_iterations"
+        if len(team_sizes) < 2:
+            stopped_by = "single_team"
+        else:
+            while iterations < self.max_iterations:
+                # Checking the clock every iteration costs more than the checks it saves
+                if iterations % 64 == 0 and time.perf_counter() >= deadline:
+                    stopped_by = "time_budget"
+                    break
+                if idle >= self.patience:
+                    stopped_by = "converged"
+                    break
+                result = self._try_improve()
+                iterations += 1
+                idle = 0 if result else idle + 1
+                if result == "swap":
+                    swaps += 1
+                elif result == "move":
+                    moves += 1
+
+        # Recompute from scratch so incremental float drift never reaches the report
+        self.inner = self._team_sums()
+        teams = [self.members[t, :self.sizes[t]].tolist() for t in range(len(self.sizes))]
+        team_fitness = []
+        for team in teams:
+            pairs = len(team) * (len(team) - 1) / 2
+            team_fitness.append(float(self.inner[team].sum() / 2 / pairs) if pairs else 0.0)
+
+        return {
+            "teams": teams,
+            "team_fitness": team_fitness,
+            "objective": self.objective(),
+            "mean_team_fitness": float(np.mean(team_fitness)) if team_fitness else 0.0,
+            "stats": {
+                "pool_size": self.pool_size,
+                "team_count": len(teams),
+                "seed_objective": seed_objective,
+                "seed_seconds": round(seed_seconds, 4),
+                "search_seconds": round(time.perf_counter() - start - seed_seconds, 4),
+                "iterations": iterations,
+                "swaps_applied": swaps,
+                "moves_applied": moves,
+                "stopped_by": stopped_by
+            }
+        }
+
+
+def partition_teams(score_matrix: np.ndarray, team_size: int, time_budget: float = 2.0, **kwargs) -> dict:
+    """
+    Convenience wrapper around TeamPartitioner(...).solve().
+    """
+    return TeamPartitioner(score_matrix, team_size, time_budget=time_budget, **kwargs).solve()
@@ -0,0 +1,11 @@
+# conftest.py
+# The app modules live flat in ml-models/ and are imported by name, as main.py does.
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing main builds the Gemini clients and opens the match store; keep both out of the real setup
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("MATCH_STORE_DIR", tempfile.mkdtemp(prefix="match_store_"))
@@ -0,0 +1,91 @@
+# fake_github.py
+# Local stand-in for the GitHub API and the backend rank endpoint, for the github_analysis tests.
+import time
+import random
+from datetime import datetime, timedelta, timezone
+from aiohttp import web
+
+
+def fake_github_app(requests_seen: dict, repos: int = 120, throttled_tokens: set = None):
+    """
+    aiohttp app imitating the parts of the GitHub API (and the backend rank endpoint) that
+    github_analysis uses. GraphQL pages carry the profile fields on the first page and a rateLimit
+    cost of 1; REST responses carry an ETag and answer matching If-None-Match with 304. Responses
+    report X-RateLimit-* headers per token, and the first GraphQL request made with each token in
+    throttled_tokens gets a secondary rate limit (403 with Retry-After).
+    Every request is counted in requests_seen by kind.
+    """
+    rng = random.Random(1)
+    nodes = [
+        {
+            "name": f"repo-{index}",
+            "description": rng.choice(["react dashboard", "django api", "cli tool"]),
+            "stargazerCount": rng.randint(0, 80),
+            "defaultBranchRef": {"target": {"history": {"totalCount": rng.randint(1, 400)}}},
+            "pushedAt": (datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 900))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "languages": {"edges": [{"size": rng.randint(100, 100_000), "node": {"name": rng.choice(["JavaScript", "TypeScript", "Python", "Go", "Java"])}}]}
+        }
+        for index in range(repos)
+    ]
+
+    throttled_tokens = set(throttled_tokens or ())
+    used = {}
+
+    def count(kind: str):
+        requests_seen[kind] = requests_seen.get(kind, 0) + 1
+
+    def rate_limit_headers(request, resource: str) -> dict:
+        token = request.headers.get("Authorization", "anonymous").replace("Bearer ", "")
+        used[token, resource] = used.get((token, resource), 0) + 1
+        return {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": str(5000 - used[token, resource]),
+                "X-RateLimit-Reset": str(int(time.time()) + 3600), "X-RateLimit-Resource": resource}
+
+    async def graphql(request):
+        token = request.headers.get("Authorization", "").replace("Bearer ", "")
+        if token in throttled_tokens:
+            throttled_tokens.discard(token)
+            count("secondary_limit")
+            return web.json_response({"message": "You have exceeded a secondary rate limit."}, status=403,
+                                     headers={"Retry-After": "2"})
+        count("graphql")
+        variables = (await request.json())["variables"]
+        start = int(variables.get("cursor") or 0)
+        stop = start + variables["batchSize"]
+        user = {
+            "repositories": {
+                "pageInfo": {"hasNextPage": stop < len(nodes), "endCursor": str(stop)},
+                "nodes": nodes[start:stop]
+            }
+        }
+        if variables.get("firstPage"):
+            user.update({
+                "login": "octocat", "bio": "", "location": "", "company": "",
+                "followers": {"totalCount": 12}, "publicRepositories": {"totalCount": repos},
+                "contributionsCollection": {"contributionCalendar": {"totalContributions": 321}}
+            })
+        headers = rate_limit_headers(request, "graphql")
+        rate_limit = {"cost": 1, "limit": 5000, "remaining": int(headers["X-RateLimit-Remaining"]),
+                      "resetAt": datetime.fromtimestamp(int(headers["X-RateLimit-Reset"]), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+        return web.json_response({"data": {"rateLimit": rate_limit, "user": user}}, headers=headers)
+
+    async def user(request):
+        etag = f'"{request.match_info["username"]}-v1"'
+        headers = dict(rate_limit_headers(request, "core"), ETag=etag)
+        if request.headers.get("If-None-Match") == etag:
+            count("rest_304")
+            return web.Response(status=304, headers=headers)
+        count("rest_200")
+        return web.json_response(
+            {"login": request.match_info["username"], "followers": 12, "public_repos": repos, "bio": "", "location": "", "company": ""},
+            headers=headers
+        )
+
+    async def rank(request):
+        count("rank")
+        return web.json_response({"rank": "A"})
+
+    app = web.Application()
+    app.router.add_post("/graphql", graphql)
+    app.router.add_get("/users/{username}", user)
+    app.router.add_get("/api/github/rank/{username}", rank)
+    return app
@@ -0,0 +1,155 @@
+# test_analyze_concurrency.py
+# /analyze against stubbed Gemini and GitHub upstreams: requests must overlap instead of queueing
+# behind each other, identical requests must share upstream calls, and a Gemini outage must not
+# pile up LLM calls past the executor's limit.
+import io
+import time
+import types
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+import docx
+import httpx
+import pytest
+import main
+import executors
+import resume_analysis
+import github_analysis
+from resume_cache import ResumeCache
+from circuit_breaker import CircuitBreaker
+
+# Seconds each stubbed upstream (Gemini, GitHub API) takes
+UPSTREAM_LATENCY = 0.5
+REQUESTS = 8
+# One request's critical path: the GitHub fetch, then the GitHub Gemini call (the resume call runs alongside)
+SINGLE_REQUEST_SECONDS = 2 * UPSTREAM_LATENCY
+
+
+def random_repo(rng: random.Random) -> dict:
+    languages = rng.sample(["JavaScript", "TypeScript", "HTML", "CSS", "Python", "Go", "Java"], rng.randint(0, 4))
+    pushed = datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 900))
+    return {
+        "name": rng.choice(["portfolio", "api-server", "react-dashboard", "django-blog"]),
+        "description": rng.choice(["", "A frontend built with react and tailwind", "REST api with express and mongodb", None]),
+        "languages": {language: rng.randint(100, 200000) for language in languages},
+        "commit_count": rng.randint(0, 500),
+        "last_pushed": pushed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "stargazerCount": rng.randint(0, 120)
+    }
+
+
+def make_resume(index: int) -> bytes:
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {index}: React, TypeScript, Node.js and PostgreSQL developer")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    """
+    Stubs Gemini and the GitHub fetch to take UPSTREAM_LATENCY seconds each and counts their calls.
+    """
+    rng = random.Random(0)
+    calls = {"gemini": 0, "github": 0}
+
+    def slow_generate(model, contents):
+        calls["gemini"] += 1
+        time.sleep(UPSTREAM_LATENCY)
+        return types.SimpleNamespace(text="Frontend Score: 60\nBackend Score: 40")
+
+    async def slow_collect(username, max_repos=300, session=None):
+        calls["github"] += 1
+        await asyncio.sleep(UPSTREAM_LATENCY)
+        return {
+            "github_data": {"contributionsCollection": {"contributionCalendar": {"totalContributions": 120}}},
+            "repos": [random_repo(rng) for _ in range(30)],
+            "rank_data": None,
+            "user_profile": {"followers": 12, "public_repos": 20}
+        }
+
+    monkeypatch.setattr(resume_analysis.client.models, "generate_content", slow_generate)
+    monkeypatch.setattr(github_analysis.client.models, "generate_content", slow_generate)
+    monkeypatch.setattr(github_analysis, "collect_github_information_async", slow_collect)
+    # Fresh in-memory cache so every request really goes through the stubbed model
+    monkeypatch.setattr(resume_analysis, "resume_cache", ResumeCache(":memory:"))
+    return calls
+
+
+def send_all(resumes: list, github_links: list) -> float:
+    """
+    Posts one /analyze request per resume concurrently; returns the seconds the batch took.
+    """
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            async def send(resume: bytes, github_link: str):
+                response = await client.post("/analyze", files={"resume": ("resume.docx", resume)},
+                                             data={"github_link": github_link})
+                response.raise_for_status()
+
+            start = time.perf_counter()
+            try:
+                await asyncio.gather(*(send(resume, link) for resume, link in zip(resumes, github_links)))
+            finally:
+                # The transport skips the lifespan, so close the pooled session it opened here
+                await main.http_client.close()
+            return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def test_analyze_requests_run_concurrently(upstream_calls):
+    elapsed = send_all([make_resume(index) for index in range(REQUESTS)],
+                       [f"https://github.com/user{index}" for index in range(REQUESTS)])
+    # A pipeline that blocks the event loop needs about REQUESTS times one request's latency
+    assert elapsed < 2 * SINGLE_REQUEST_SECONDS
+    assert upstream_calls == {"gemini": 2 * REQUESTS, "github": REQUESTS}
+
+
+def test_duplicate_requests_share_upstream_calls(upstream_calls):
+    # A double-submit burst; GitHub usernames are case-insensitive
+    elapsed = send_all([make_resume(0)] * REQUESTS,
+                       [f"https://github.com/{'User' if index % 2 else 'user'}0" for index in range(REQUESTS)])
+    assert elapsed < 2 * SINGLE_REQUEST_SECONDS
+    # One resume Gemini call, one GitHub fetch and one GitHub Gemini call
+    assert upstream_calls == {"gemini": 2, "github": 1}
+
+
+def test_llm_pool_stays_bounded_during_outage(monkeypatch):
+    """
+    Every Gemini call hangs (as a call cut off by the client timeout would) while callers give up
+    after their latency budget. Three times as many resumes as the LLM pool admits are scored at
+    once with the circuit breaker held closed.
+    """
+    hang, budget = 1.0, 0.2
+    limit = executors.LLM_WORKERS + executors.LLM_MAX_QUEUED
+
+    def hung_generate(model, contents):
+        time.sleep(hang)
+        return types.SimpleNamespace(text="Frontend Score: 60\nBackend Score: 40")
+
+    async def score_all():
+        texts = [f"Candidate {index}: React and Node.js developer" for index in range(3 * limit)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(resume_analysis.score_with_fallback_async(text) for text in texts))
+        return results, time.perf_counter() - start
+
+    monkeypatch.setattr(resume_analysis.client.models, "generate_content", hung_generate)
+    monkeypatch.setattr(resume_analysis, "LLM_LATENCY_BUDGET", budget)
+    monkeypatch.setattr(resume_analysis, "llm_breaker", CircuitBreaker("test", failure_threshold=10 ** 9))
+    before = dict(executors.llm_counts)
+    results, elapsed = asyncio.run(score_all())
+    deadline = time.perf_counter() + hang * 3
+    while executors.llm_stats()["pending"] and time.perf_counter() < deadline:
+        time.sleep(0.05)
+
+    stats = executors.llm_stats()
+    # Every caller answered from the local scorer within its budget
+    assert elapsed < budget + hang / 2
+    assert all(source == "local" for _, source in results)
+    # Calls past the limit were refused instead of queued, and the pool drained afterwards
+    assert stats["max_pending"] <= limit
+    assert stats["rejected"] > before["rejected"]
+    assert stats["pending"] == 0
@@ -0,0 +1,37 @@
+# test_band_index.py
+import random
+import pytest
+from band_index import BandIndex
+from match_score import MatchScoreCalculator, CompiledMatchScoreCalculator
+
+
+def random_candidate(rng: random.Random) -> dict:
+    return {
+        "frontend": rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)]),
+        "backend": rng.choice([rng.randint(0, 100), round(rng.uniform(0, 100), 2)]),
+        "eq": round(rng.uniform(0, 100), 2)
+    }
+
+
+@pytest.mark.parametrize("calculator", [MatchScoreCalculator({"frontend": 0.7, "backend": 0.3}),
+                                        CompiledMatchScoreCalculator()], ids=["scalar", "compiled"])
+def test_top_k_matches_brute_force(calculator):
+    """
+    Top-k on a bulk-built index, after a run of inserts, updates and deletes.
+    """
+    pool, queries, updates = 1000, 300, 200
+    rng = random.Random(0)
+    candidates = {f"user-{position}": random_candidate(rng) for position in range(pool)}
+    index = BandIndex.build(candidates.items(), calculator=calculator)
+    for step in range(updates):
+        candidate_id = f"user-{rng.randrange(pool + updates)}"
+        if candidate_id in index and step % 3 == 0:
+            index.delete(candidate_id)
+        else:
+            index.insert(candidate_id, random_candidate(rng))
+
+    for query in range(queries):
+        anchor_id = rng.choice(list(index.cell_of)) if query % 2 else None
+        anchor = random_candidate(rng)
+        k = rng.choice([1, 5, 20])
+        assert index.top_k(anchor, k, exclude_id=anchor_id) == index.brute_force_top_k(anchor, k, exclude_id=anchor_id)
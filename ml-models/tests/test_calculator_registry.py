@@ -0,0 +1,48 @@
+# test_calculator_registry.py
+import pytest
+from calculator_registry import CalculatorRegistry
+from match_score import MatchScoreCalculator
+
+# The /calculate-match example weights and the default weights: the same 1:1 ratio, spelled differently
+EXAMPLE_WEIGHTS = {"frontend": 0.375, "backend": 0.375, "eq": 0.25}
+
+
+def test_equal_ratio_spellings_are_cache_hits():
+    registry = CalculatorRegistry()
+    for _ in range(6):
+        registry.get(EXAMPLE_WEIGHTS)
+        registry.get()
+    stats = registry.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 10
+    assert stats["hit_rate"] > 0
+
+
+def test_calculator_uses_the_callers_weights():
+    registry = CalculatorRegistry()
+    registry.get({"frontend": 1, "backend": 2})
+    calculator = registry.get({"frontend": 0.25, "backend": 0.5})
+    reference = MatchScoreCalculator({"frontend": 0.25, "backend": 0.5})
+    assert calculator.weights == reference.weights
+    for user, other in (({"frontend": 90, "backend": 20, "eq": 50}, {"frontend": 20, "backend": 90, "eq": 50}),
+                        ({"frontend": 33, "backend": 71, "eq": 12}, {"frontend": 64, "backend": 5, "eq": 99})):
+        assert calculator.calculate_combined_score(user, other) == reference.calculate_combined_score(user, other)
+
+
+def test_lru_eviction():
+    registry = CalculatorRegistry(max_size=2)
+    for front in (1, 2, 3):
+        registry.get({"frontend": front, "backend": 1})
+    assert registry.stats()["size"] == 2
+    assert registry.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("weights", [
+    {"frontend": -1, "backend": 1},
+    {"frontend": 0, "backend": 0},
+    {"frontend": "1", "backend": 1},
+    {"frontend": True, "backend": 1}
+])
+def test_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        CalculatorRegistry().get(weights)
@@ -0,0 +1,103 @@
+# test_github_analysis.py
+# GitHub data collection against a local fake GitHub server (see fake_github.py).
+import json
+import time
+import asyncio
+import pytest
+from aiohttp import web
+import github_analysis
+from github_cache import GitHubCache
+from github_scheduler import GitHubScheduler
+from http_client import HTTPClient
+from fake_github import fake_github_app
+
+
+@pytest.fixture
+def fake_github(monkeypatch):
+    """
+    Returns run(scenario, **app_options): serves a fake GitHub app on a free local port, points
+    github_analysis at it with a fresh in-memory GitHubCache, and awaits
+    scenario(session, base_url, requests_seen) on a pooled HTTPClient session.
+    Returns (scenario result, HTTPClient stats).
+    """
+    def run(scenario, **app_options):
+        requests_seen = {}
+
+        async def serve():
+            runner = web.AppRunner(fake_github_app(requests_seen, **app_options))
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+            monkeypatch.setattr(github_analysis, "GITHUB_API_URL", base_url)
+            monkeypatch.setattr(github_analysis, "GRAPHQL_URL", f"{base_url}/graphql")
+            monkeypatch.setattr(github_analysis, "BACKEND_API_URL", base_url)
+            monkeypatch.setattr(github_analysis, "github_cache", GitHubCache(":memory:"))
+            github_analysis.get_rank_data_async.cache.clear()
+            client = HTTPClient()
+            session = await client.start()
+            try:
+                return await scenario(session, base_url, requests_seen), client.stats()
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        return asyncio.run(serve())
+    return run
+
+
+def test_warm_collection_is_served_from_cache(fake_github):
+    """
+    The first collection fetches one GraphQL page per 100 repos plus the rank (no REST profile
+    call); the second makes no requests and returns the same data. A REST resource fetched twice
+    is revalidated with a 304. Both runs reuse the pooled session's connections.
+    """
+    repos = 120
+
+    async def scenario(session, base_url, requests_seen):
+        runs = []
+        for _ in range(2):
+            before = dict(requests_seen)
+            information = await github_analysis.collect_github_information_async("octocat", session=session)
+            information.pop("fetch_stats")
+            requests = {kind: seen - before.get(kind, 0) for kind, seen in requests_seen.items()}
+            runs.append((information, {kind: count for kind, count in requests.items() if count}))
+        for _ in range(2):
+            await github_analysis.github_rest_get(session, f"{base_url}/users/octocat")
+        return runs, dict(requests_seen)
+
+    (runs, requests_seen), client_stats = fake_github(scenario, repos=repos)
+    (cold, cold_requests), (warm, warm_requests) = runs
+    assert cold_requests == {"graphql": -(-repos // 100), "rank": 1}
+    assert warm_requests == {}
+    assert json.dumps(cold, sort_keys=True) == json.dumps(warm, sort_keys=True)
+    assert (requests_seen["rest_200"], requests_seen["rest_304"]) == (1, 1)
+    assert client_stats["connections_reused"] > 0
+
+
+def test_rate_limited_request_moves_to_another_token(fake_github, monkeypatch):
+    """
+    Token A's first GraphQL request gets a secondary rate limit (Retry-After: 2). The request must
+    be retried on token B straight away rather than waiting out the Retry-After, and both tokens'
+    budgets must be tracked from the responses.
+    """
+    repos = 250
+    pages = -(-repos // 100)
+    scheduler = GitHubScheduler(tokens=["fake-token-a", "fake-token-b"])
+    monkeypatch.setattr(github_analysis, "github_scheduler", scheduler)
+
+    async def scenario(session, base_url, requests_seen):
+        start = time.perf_counter()
+        information = await github_analysis.collect_github_information_async("octocat", session=session)
+        await github_analysis.github_rest_get(session, f"{base_url}/users/octocat")
+        return information, time.perf_counter() - start
+
+    (information, elapsed), _ = fake_github(scenario, repos=repos, throttled_tokens={"fake-token-a"})
+    stats = scheduler.stats()
+    token_a, token_b = stats["tokens"]
+    assert len(information["repos"]) == repos
+    assert elapsed < 2
+    assert (stats["secondary_limits"], stats["retries"]) == (1, 1)
+    assert token_a["throttled"] == 1 and token_a["blocked_for_seconds"] > 0
+    assert token_b["budgets"]["graphql"]["remaining"] == 5000 - pages
+    assert token_b["graphql_cost"] == pages
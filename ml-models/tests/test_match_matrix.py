@@ -0,0 +1,36 @@
+# test_match_matrix.py
+import numpy as np
+import pytest
+from match_matrix import MatchMatrixEngine
+from match_score import CompiledMatchScoreCalculator
+
+
+def random_candidates(size: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [{"frontend": int(f), "backend": int(b), "eq": int(e)} for f, b, e in rng.integers(0, 101, (size, 3))]
+
+
+def test_matrix_matches_scalar_scores():
+    candidates = random_candidates(40)
+    calculator = CompiledMatchScoreCalculator()
+    matrix = MatchMatrixEngine.from_candidates(candidates, calculator=calculator).compute_matrix()
+    for i in range(0, 40, 7):
+        for j in range(0, 40, 3):
+            assert matrix[i, j] == np.float32(calculator.calculate_combined_score(candidates[i], candidates[j]))
+
+
+@pytest.mark.parametrize("exclude_self", [True, False])
+def test_top_k_for_matches_top_k_rows(exclude_self):
+    engine = MatchMatrixEngine.from_candidates(random_candidates(500), block_size=16)
+    rows = np.random.default_rng(1).choice(500, 40, replace=False)
+    indices, scores = engine.top_k(7, exclude_self=exclude_self)
+    anchor_indices, anchor_scores = engine.top_k_for(rows, 7, exclude_self=exclude_self)
+    assert np.array_equal(anchor_indices, indices[rows])
+    assert np.array_equal(anchor_scores, scores[rows])
+
+
+def test_top_k_for_clamps_k():
+    engine = MatchMatrixEngine.from_candidates(random_candidates(3))
+    indices, scores = engine.top_k_for([0], 10)
+    assert indices.shape == scores.shape == (1, 2)
+    assert 0 not in indices[0]
@@ -0,0 +1,24 @@
+# test_match_score.py
+import os
+import json
+import pytest
+from match_score import MatchScoreCalculator, CompiledMatchScoreCalculator, verify_compiled_calculator
+
+GOLDEN_CASES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "golden_match_cases.json")
+
+with open(GOLDEN_CASES_FILE) as f:
+    GOLDEN_CASES = json.load(f)
+
+IMPLEMENTATIONS = {"scalar": MatchScoreCalculator, "compiled": CompiledMatchScoreCalculator}
+
+
+@pytest.mark.parametrize("implementation", IMPLEMENTATIONS)
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=[case["name"] for case in GOLDEN_CASES])
+def test_golden_cases(implementation, case):
+    calculator = IMPLEMENTATIONS[implementation]()
+    assert calculator.calculate_combined_score(case["person_a"], case["person_b"]) == case["expected"]
+    assert float(calculator.calculate_batch_scores(case["person_a"], [case["person_b"]])[0]) == case["expected"]
+
+
+def test_compiled_calculator_matches_scalar():
+    assert verify_compiled_calculator(CompiledMatchScoreCalculator()) > 0
@@ -0,0 +1,112 @@
+# test_match_store.py
+import os
+import random
+import numpy as np
+import pytest
+from match_matrix import MatchMatrixEngine
+from match_score import CompiledMatchScoreCalculator
+from match_store import MatchStore, JOURNAL_FILE
+
+TOP_K = 5
+
+
+def random_scores(rng: random.Random) -> dict:
+    return {"frontend": rng.randint(0, 100), "backend": rng.randint(0, 100), "eq": rng.randint(0, 100)}
+
+
+def drive(store: MatchStore, operations: int = 600, pool: int = 300, seed: int = 0, compact_at: int = None) -> dict:
+    """
+    Random upserts, score updates and removals; returns the surviving candidates' scores.
+    """
+    rng = random.Random(seed)
+    candidates = {}
+    for step in range(operations):
+        candidate_id = f"user-{rng.randrange(pool)}"
+        if candidate_id in candidates and rng.random() < 0.3:
+            store.remove(candidate_id)
+            del candidates[candidate_id]
+        else:
+            candidates[candidate_id] = random_scores(rng)
+            store.upsert(candidate_id, candidates[candidate_id])
+        if step == compact_at:
+            store.compact()
+    return candidates
+
+
+def assert_matches_rebuild(store: MatchStore, candidates: dict):
+    # Rebuild in slot order, so ties (broken by lower slot in the store) break the same way
+    ids = sorted(candidates, key=lambda candidate_id: store.slot_of[candidate_id])
+    engine = MatchMatrixEngine.from_candidates([candidates[candidate_id] for candidate_id in ids], calculator=store.calculator)
+    slots = np.array([store.slot_of[candidate_id] for candidate_id in ids], dtype=np.int64)
+    assert np.array_equal(np.asarray(store.matrix)[slots[:, None], slots[None, :]], engine.compute_matrix())
+    indices, scores = engine.top_k(TOP_K)
+    for row, candidate_id in enumerate(ids):
+        expected = [(ids[index], float(score)) for index, score in zip(indices[row].tolist(), scores[row].tolist())]
+        assert store.get_top_k(candidate_id) == expected
+
+
+@pytest.fixture
+def calculator():
+    return CompiledMatchScoreCalculator()
+
+
+def test_incremental_updates_match_rebuild(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator, top_k=TOP_K, initial_capacity=16)
+    candidates = drive(store, compact_at=300)
+    assert_matches_rebuild(store, candidates)
+    store.close()
+    assert_matches_rebuild(MatchStore(str(tmp_path), calculator=calculator), candidates)
+
+
+def test_journal_replay_after_crash(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator, top_k=TOP_K, initial_capacity=16, checkpoint_every=50)
+    candidates = drive(store)
+    # Simulate a crash: flush what the OS would have, skip the final save
+    store.matrix.flush()
+    store._close_journal()
+    assert os.path.getsize(os.path.join(str(tmp_path), JOURNAL_FILE)) > 0
+    reopened = MatchStore(str(tmp_path), calculator=calculator)
+    assert reopened.counts["journal_replayed"] > 0
+    assert_matches_rebuild(reopened, candidates)
+
+
+def test_torn_journal_line_is_ignored(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator, top_k=TOP_K)
+    store.upsert("a", {"frontend": 90, "backend": 20, "eq": 50})
+    store.upsert("b", {"frontend": 20, "backend": 90, "eq": 60})
+    store._close_journal()
+    with open(os.path.join(str(tmp_path), JOURNAL_FILE), "a") as f:
+        f.write('{"op": "upsert", "id": "c", "fron')
+    reopened = MatchStore(str(tmp_path), calculator=calculator)
+    assert len(reopened) == 2
+    assert reopened.get_top_k("a") == [("b", reopened.get_score("a", "b"))]
+
+
+def test_upserts_do_not_rewrite_the_store(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator, top_k=TOP_K, initial_capacity=256, checkpoint_every=100)
+    for index in range(250):
+        store.upsert(f"user-{index}", {"frontend": index % 101, "backend": (index * 7) % 101, "eq": 50})
+    # One save on creation, then one per checkpoint_every journal entries
+    assert store.counts["checkpoints"] == 3
+    assert store.stats()["journal_entries"] == 50
+
+
+def test_missing_components_keep_stored_scores(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator, top_k=TOP_K)
+    store.upsert("a", {"frontend": 90, "backend": 20, "eq": 80})
+    store.upsert("b", {"frontend": 20, "backend": 90})
+    store.upsert("a", {"frontend": 70, "backend": 40})
+    slot_a, slot_b = store.slot_of["a"], store.slot_of["b"]
+    assert (store.frontend[slot_a], store.backend[slot_a], store.eq[slot_a]) == (70, 40, 80)
+    assert store.eq[slot_b] == 50
+    expected = calculator.calculate_combined_score({"frontend": 70, "backend": 40, "eq": 80},
+                                                   {"frontend": 20, "backend": 90, "eq": 50})
+    assert store.get_score("a", "b") == np.float32(expected)
+
+
+def test_unknown_candidates_raise_key_error(tmp_path, calculator):
+    store = MatchStore(str(tmp_path), calculator=calculator)
+    with pytest.raises(KeyError):
+        store.get_top_k("missing")
+    with pytest.raises(KeyError):
+        store.remove("missing")
@@ -0,0 +1,25 @@
+# test_questionnaire_registry.py
+import numpy as np
+import pytest
+from Eq_score import calculate_eq_score, QUESTIONS, QUESTION_KEYS, PARAMETERS
+from questionnaire_registry import QuestionnaireRegistry
+
+
+@pytest.fixture(scope="module")
+def questionnaire():
+    return QuestionnaireRegistry(auto_reload=False).get("eq", "1")
+
+
+def test_eq_v1_shows_eq_score_questions(questionnaire):
+    assert questionnaire.parameters == PARAMETERS
+    assert questionnaire.question_keys == QUESTION_KEYS
+    for key in QUESTION_KEYS:
+        assert questionnaire.questions[key]["text"] == QUESTIONS[key]["text"]
+        assert questionnaire.questions[key]["choices"] == QUESTIONS[key]["choices"]
+
+
+def test_eq_v1_scores_every_answer_set_like_eq_score(questionnaire):
+    all_answers = np.indices(questionnaire.choice_counts).reshape(len(QUESTION_KEYS), -1).T + 1
+    for row in all_answers.tolist():
+        responses = dict(zip(QUESTION_KEYS, row))
+        assert questionnaire.score(responses) == calculate_eq_score(responses), responses
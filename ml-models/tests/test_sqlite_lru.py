@@ -0,0 +1,64 @@
+# test_sqlite_lru.py
+import time
+from resume_cache import ResumeCache
+from github_cache import GitHubCache
+
+
+def table_totals(cache: ResumeCache) -> tuple:
+    return cache._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM resume_results").fetchone()
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResumeCache(":memory:", max_entries=3)
+    for key in "abc":
+        cache.put(key, key * 10, 50, 50)
+    cache.get("a")
+    cache.put("d", "d" * 10, 50, 50)
+    assert cache.get("b") is None
+    assert all(cache.get(key) for key in "acd")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_and_replaced_entries_keep_totals_exact():
+    cache = ResumeCache(":memory:", max_bytes=100)
+    cache.put("a", "x" * 40, 50, 50)
+    cache.put("a", "x" * 10, 50, 50)
+    cache.put("b", "x" * 40, 50, 50)
+    assert (cache._lru.count, cache._lru.bytes) == table_totals(cache) == (2, 50)
+    cache.put("c", "x" * 60, 50, 50)
+    assert cache.get("a") is None
+    assert (cache._lru.count, cache._lru.bytes) == table_totals(cache) == (2, 100)
+
+
+def test_puts_below_the_limits_do_not_scan_the_table():
+    cache = ResumeCache(":memory:", max_entries=1000)
+    cache.put("warm-up", "text", 50, 50)
+    statements = []
+    cache._connection.set_trace_callback(statements.append)
+    for index in range(50):
+        cache.put(f"key-{index}", "text", 50, 50)
+    assert not [statement for statement in statements if "COUNT(*)" in statement or "ORDER BY" in statement]
+
+
+def test_expired_entries_are_swept():
+    cache = ResumeCache(":memory:", ttl=60)
+    cache._connection.execute("INSERT INTO resume_results VALUES ('old', 'text', 50, 50, 4, ?, ?)",
+                              (time.time() - 120, time.time() - 120))
+    cache._lru.recount()
+    cache._lru._last_sweep = 0.0
+    cache.put("new", "text", 50, 50)
+    assert table_totals(cache) == (1, 4)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_github_cache_expires_graphql_but_keeps_rest_entries():
+    cache = GitHubCache(":memory:", graphql_ttl=60)
+    cache.put_rest("https://api.github.com/users/octocat", '"etag"', {"login": "octocat"})
+    cache._connection.execute("UPDATE github_responses SET created_at = ?", (time.time() - 120,))
+    cache.put_graphql("graphql:stale", {"data": 1})
+    cache._connection.execute("UPDATE github_responses SET created_at = ? WHERE key = 'graphql:stale'", (time.time() - 120,))
+    cache._lru._last_sweep = 0.0
+    cache.put_graphql("graphql:fresh", {"data": 2})
+    stats = cache.stats()
+    assert (stats["rest_entries"], stats["graphql_entries"]) == (1, 1)
+    assert cache.get_graphql("graphql:fresh") == {"data": 2}